@@ -1,90 +1,60 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import io
-from scipy.signal import find_peaks
-import re
-import warnings
-import tkinter as tk
-from tkinter import filedialog, messagebox
-from tkinter import ttk  # Para usar Treeview y mejorar la estética de la tabla
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib
-matplotlib.use('TkAgg')  # Usar TkAgg como backend de Matplotlib
-import pywt  # Para la Transformada Wavelet
-import xlsxwriter  # Para exportar a Excel
-
-warnings.filterwarnings("ignore")
-
-# Funciones para el procesamiento de datos
-def leer_csv_especial(ruta_archivo):
-    """
-    Función para cargar archivo CSV
-    """
-    with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
-        contenido = archivo.read()
-
-    # Dividir el contenido en las tres secciones
-    secciones = contenido.split('\n\n')
-
-    # Función para reemplazar comas por puntos en valores numéricos
-    def reemplazar_comas(valor):
-        try:
-            return valor.replace(',', '.')
-        except AttributeError:
-            return valor
+import queue
+import threading
+import time
+from astroviarfa import perfil
+from astroviarfa.almacen import AlmacenResultados
+from astroviarfa import (EstadisticasEspectro, MonitorArchivo, ParametrosCFAR, PlanBandas, SeguidorSenales,
+                        analizar_captura, asignar_satelites, dibujar_espectro, eliminar_ruido_wavelet,
+                        estimar_nivel_ruido, estimar_piso_local, extraer_caracteristicas, guardar_tabla,
+                        indices_en_rango, leer_csv_con_cache, umbral_cfar)
+from astroviarfa.filtrado import WAVELET
+from astroviarfa.ocupacion import UMBRAL_SNR_INTERFERENCIA_DB
+
+# tkinter, matplotlib y pandas se importan en crear_interfaz(), así el módulo se puede importar sin
+# pantalla y sin cargar pandas (todo lo que los usa corre después, desde la ventana)
+tk = ttk = filedialog = messagebox = plt = pd = None
 
-    # Procesar la primera sección
-    df1 = pd.read_csv(io.StringIO(secciones[0]), sep=';', header=None)
+# Milisegundos entre consultas del monitoreo en vivo
+INTERVALO_MONITOREO_MS = 1000
 
-    # Procesar la segunda sección
-    df2 = pd.read_csv(io.StringIO(secciones[1]), sep=';')
-    df2 = df2.applymap(reemplazar_comas)
-    for columna in df2.columns:
-        df2[columna] = pd.to_numeric(df2[columna], errors='ignore')
+# Milisegundos entre revisiones del progreso de una tarea en segundo plano
+INTERVALO_PROGRESO_MS = 50
 
-    # Procesar la tercera sección
-    df3 = pd.read_csv(io.StringIO(secciones[2]), sep=';')
-    df3 = df3.applymap(reemplazar_comas)
-    for columna in df3.columns:
-        df3[columna] = pd.to_numeric(df3[columna], errors='ignore')
+# Valores (barridos x bins) que se analizan entre dos avisos de progreso al recorrer
+# toda la captura: bloques más chicos que los del motor para que Cancelar responda enseguida
+VALORES_POR_PASO = 2 ** 20
 
-    return df1, df2, df3
+# Filas que se desplazan con cada paso de la rueda del ratón en las tablas
+FILAS_POR_RUEDA = 3
 
-def normalizar_columna(columna):
-    # Eliminar espacios adicionales y convertir a minúsculas
-    columna = columna.strip().lower()
-    # Reemplazar múltiples espacios por uno solo
-    columna = re.sub(r'\s+', ' ', columna)
-    return columna
+# Plan de bandas para asignar satélites (se recarga solo si el archivo cambia)
+plan_bandas = PlanBandas()
 
-def dBm_to_mW(dBm):
-    return 10 ** (dBm / 10)
+# Ocupación acumulada de las capturas analizadas (se reinicia si cambia el eje de frecuencias)
+estadisticas_espectro = None
+archivos_ocupacion = set()
+
+# Base SQLite de resultados usada por última vez en la búsqueda
+ruta_almacen = 'resultados.sqlite'
 
 # Funciones de procesamiento y análisis
 def detectar_interferencias():
     """
-    Detecta y clasifica posibles interferencias en la señal.
+    Detecta y clasifica posibles interferencias en la señal: las señales del barrido
+    procesado con SNR menor que UMBRAL_SNR_INTERFERENCIA_DB.
     """
     global interferencias
-    interferencias = []
 
-    # Umbral para detección de interferencias (por ejemplo, señales con SNR < 10 dB)
-    umbral_snr = 10
+    # Utilizar los picos ya detectados, seleccionados todos a la vez
+    snr = df_caracteristicas['Relación señal-ruido (SNR) [dB]']
+    interferencias = pd.DataFrame({
+        'Señal': df_caracteristicas['Señal'],
+        'Tipo': 'Interferencia',
+        'Frecuencia central [Hz]': df_caracteristicas['Frecuencia central [Hz]'],
+        'SNR [dB]': snr,
+    })[snr < UMBRAL_SNR_INTERFERENCIA_DB]
 
-    # Utilizar los picos ya detectados
-    for idx, señal in df_caracteristicas.iterrows():
-        SNR = señal['Relación señal-ruido (SNR) [dB]']
-        if SNR < umbral_snr:
-            interferencia = {
-                'Señal': señal['Señal'],
-                'Tipo': 'Interferencia',
-                'Frecuencia central [Hz]': señal['Frecuencia central [Hz]'],
-                'SNR [dB]': SNR
-            }
-            interferencias.append(interferencia)
-
-    if interferencias:
+    if len(interferencias):
         plot_interferencias()
     else:
         messagebox.showinfo("Resultado", "No se detectaron interferencias significativas.")
@@ -94,11 +64,11 @@ def plot_interferencias():
     Grafica las interferencias detectadas en la señal.
     """
     plt.figure(figsize=(12, 6))
-    plt.plot(frec_mag['Frequency [Hz]'], frec_mag['Magnitude [dBm]'], label='Espectro de frecuencia')
+    dibujar_espectro(plt.gca(), frec_mag['Frequency [Hz]'].to_numpy(), frec_mag['Magnitude [dBm]'].to_numpy(),
+                     label='Espectro de frecuencia')
 
     # Marcar las interferencias
-    for interferencia in interferencias:
-        frec_central = interferencia['Frecuencia central [Hz]']
+    for frec_central in interferencias['Frecuencia central [Hz]']:
         plt.axvline(frec_central, color='r', linestyle='--', label=f"Interferencia en {frec_central/1e6:.2f} MHz")
 
     plt.xlabel('Frecuencia [Hz]')
@@ -146,59 +116,241 @@ def asignar_satellite():
     """
     Asigna cada señal detectada a un satélite basado en su frecuencia central.
     """
-    # Rangos de frecuencia de los satélites en Hz
-    rango_misc = (400e6, 450e6)
-    rango_facsat = (430e6, 440e6)
-
-    satelites = []
-    for idx, señal in df_caracteristicas.iterrows():
-        frec_central = señal['Frecuencia central [Hz]']
-        if rango_misc[0] <= frec_central <= rango_misc[1]:
-            if rango_facsat[0] <= frec_central <= rango_facsat[1]:
-                satelite = 'EM MISC & EM FACSAT'
-            else:
-                satelite = 'EM MISC'
-        elif rango_facsat[0] <= frec_central <= rango_facsat[1]:
-            satelite = 'EM FACSAT'
-        else:
-            satelite = 'Desconocido'
-        satelites.append(satelite)
-
+    frecuencias_centrales = df_caracteristicas['Frecuencia central [Hz]']
+    try:
+        satelites = asignar_satelites(frecuencias_centrales, plan_bandas)
+    except (OSError, ValueError) as e:
+        # El archivo del plan se editó con errores: se sigue usando la última versión válida
+        messagebox.showerror("Error", f"Error al recargar el plan de bandas: {e}")
+        satelites = plan_bandas.indice.asignar(frecuencias_centrales)
     df_caracteristicas['Satélite'] = satelites
 
+def cargar_plan_bandas():
+    """
+    Carga un plan de bandas (CSV con ';': nombre;inicio_hz;fin_hz;prioridad).
+    """
+    global plan_bandas
+    ruta_plan = filedialog.askopenfilename(title="Seleccionar plan de bandas", filetypes=[("CSV files", "*.csv")])
+    if ruta_plan:
+        try:
+            plan_bandas = PlanBandas(ruta_plan)
+            messagebox.showinfo("Éxito", f"Plan de bandas cargado con {len(plan_bandas.indice.bandas)} bandas")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al cargar el plan de bandas: {e}")
+
 def exportar_a_excel():
     """
-    Exporta la tabla de características a un archivo Excel.
+    Exporta la tabla de características a un archivo Excel (o Parquet/CSV, según la extensión).
     """
     # Obtener la ruta y nombre del archivo a guardar
     archivo_excel = filedialog.asksaveasfilename(
         defaultextension=".xlsx",
-        filetypes=[("Excel files", "*.xlsx")],
+        filetypes=[("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"), ("CSV files", "*.csv")],
         title="Guardar tabla de características como Excel"
     )
     if not archivo_excel:
         return  # El usuario canceló la operación
 
-    try:
-        df_caracteristicas.to_excel(archivo_excel, index=False)
-        messagebox.showinfo("Exportar Excel", f"Tabla exportada a Excel:\n{archivo_excel}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Error al exportar a Excel: {e}")
+    def exportar(progreso):
+        progreso(None, "Escribiendo el archivo...")
+        # Se escribe por bloques; el avance permite cancelar entre un bloque y el siguiente
+        guardar_tabla(df_caracteristicas, archivo_excel,
+                      progreso=lambda filas, total: progreso(filas / max(total, 1), f"{filas} de {total} filas"))
+
+    ejecutar_en_segundo_plano(
+        "Exportando a Excel", exportar,
+        lambda _: messagebox.showinfo("Exportar Excel", f"Tabla exportada a Excel:\n{archivo_excel}"),
+        "Error al exportar a Excel")
 
 # Funciones para la interfaz gráfica
-def load_csv():
-    global df1, df2, df3, ruta_archivo
-    ruta_archivo = filedialog.askopenfilename(title="Seleccionar archivo CSV", filetypes=[("CSV files", "*.csv")])
-    if ruta_archivo:
+class OperacionCancelada(Exception):
+    """
+    Se lanza en el hilo de trabajo cuando el usuario cancela la tarea.
+    """
+
+def ejecutar_en_segundo_plano(titulo, tarea, al_terminar, mensaje_error="Error"):
+    """
+    Ejecuta `tarea(progreso)` en un hilo de trabajo mientras una ventana muestra una
+    barra de progreso y un botón Cancelar. La tarea informa su avance con
+    `progreso(fraccion, texto)` (fraccion None si no se conoce), que además lanza
+    OperacionCancelada si se pidió cancelar. El hilo nunca toca los widgets: los
+    mensajes pasan por una cola que se revisa con `root.after`, y `al_terminar(resultado)`
+    se llama en el hilo de Tk.
+    """
+    cola = queue.Queue()
+    cancelar = threading.Event()
+
+    ventana = tk.Toplevel(root)
+    ventana.title(titulo)
+    ventana.resizable(False, False)
+    ventana.transient(root)
+    estado_label = tk.Label(ventana, text=f"{titulo}...", font=("Helvetica", 12))
+    estado_label.pack(pady=10, padx=20)
+    barra = ttk.Progressbar(ventana, length=320, maximum=1.0, mode='indeterminate')
+    barra.pack(pady=5, padx=20)
+    barra.start()
+
+    def pedir_cancelacion():
+        cancelar.set()
+        estado_label.config(text="Cancelando...")
+        cancel_button.config(state='disabled')
+
+    cancel_button = tk.Button(ventana, text="Cancelar", command=pedir_cancelacion)
+    cancel_button.pack(pady=10)
+    ventana.protocol("WM_DELETE_WINDOW", pedir_cancelacion)
+    # Evita lanzar otra operación sobre los mismos datos mientras esta sigue en curso
+    ventana.wait_visibility()
+    ventana.grab_set()
+
+    def progreso(fraccion=None, texto=None):
+        if cancelar.is_set():
+            raise OperacionCancelada()
+        cola.put(('progreso', fraccion, texto))
+
+    def trabajar():
         try:
-            df1, df2, df3 = leer_csv_especial(ruta_archivo)
-            messagebox.showinfo("Éxito", "Archivo CSV cargado con éxito")
+            resultado = tarea(progreso)
+            if cancelar.is_set():
+                raise OperacionCancelada()
+            cola.put(('fin', resultado, None))
+        except OperacionCancelada:
+            cola.put(('cancelado', None, None))
         except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar el archivo: {e}")
+            cola.put(('error', e, None))
+
+    def revisar():
+        while True:
+            try:
+                tipo, valor, texto = cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == 'progreso':
+                if texto and not cancelar.is_set():
+                    estado_label.config(text=texto)
+                if valor is None and str(barra['mode']) != 'indeterminate':
+                    barra.config(mode='indeterminate')
+                    barra.start()
+                elif valor is not None:
+                    if str(barra['mode']) != 'determinate':
+                        barra.stop()
+                        barra.config(mode='determinate')
+                    barra['value'] = valor
+                continue
+            ventana.grab_release()
+            ventana.destroy()
+            if tipo == 'fin':
+                al_terminar(valor)
+            elif tipo == 'error':
+                messagebox.showerror("Error", f"{mensaje_error}: {valor}")
+            return
+        root.after(INTERVALO_PROGRESO_MS, revisar)
+
+    threading.Thread(target=trabajar, daemon=True).start()
+    revisar()
+
+def avance_por_barridos(progreso, texto):
+    """
+    Opciones para recorrer la captura cargada por bloques de barridos informando
+    `texto` y la fracción analizada a `progreso` (y revisando el botón Cancelar)
+    después de cada bloque; se pasan a `analizar_captura` o `agregar_captura`.
+    """
+    def avance(hechos, total):
+        progreso(hechos / max(total, 1), f"{texto} ({hechos}/{total} barridos)")
+
+    return {'barridos_por_bloque': max(1, VALORES_POR_PASO // max(captura.n_bins, 1)), 'progreso': avance}
+
+def crear_tabla_virtual(contenedor, tabla, ancho_columna=120, height=15):
+    """
+    Muestra un DataFrame en un Treeview que solo contiene las filas visibles: al
+    desplazarse se reescriben sus valores con el tramo correspondiente de `tabla`,
+    así que abrir una tabla de cientos de miles de filas cuesta lo mismo que una de
+    quince. Devuelve el Frame que contiene la tabla y su barra de desplazamiento.
+    """
+    marco = tk.Frame(contenedor)
+    columns = list(tabla.columns)
+    tree = ttk.Treeview(marco, columns=columns, show='headings', height=height)
+    barra = ttk.Scrollbar(marco, orient='vertical')
+    barra.pack(side='right', fill='y')
+    tree.pack(side='left', fill='both', expand=True)
+
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, anchor='center', width=ancho_columna)
+
+    estado = {'inicio': 0, 'filas': height}
+
+    def dibujar():
+        n_filas = len(tabla)
+        inicio = min(max(estado['inicio'], 0), max(n_filas - estado['filas'], 0))
+        estado['inicio'] = inicio
+        visibles = list(tabla.iloc[inicio:inicio + estado['filas']].itertuples(index=False))
+
+        # Se reutilizan las filas del Treeview; solo se crean o borran las que sobran o faltan
+        items = tree.get_children()
+        if len(items) > len(visibles):
+            tree.delete(*items[len(visibles):])
+        for posicion, fila in enumerate(visibles):
+            if posicion < len(items):
+                tree.item(items[posicion], values=list(fila))
+            else:
+                tree.insert("", "end", values=list(fila))
+        if n_filas:
+            barra.set(inicio / n_filas, (inicio + len(visibles)) / n_filas)
+        else:
+            barra.set(0, 1)
+
+    def desplazar(accion, cantidad, unidad=None):
+        # Protocolo del comando de ttk.Scrollbar: ('moveto', fraccion) o ('scroll', n, 'units'/'pages')
+        if accion == 'moveto':
+            estado['inicio'] = int(float(cantidad) * len(tabla))
+        else:
+            paso = estado['filas'] if unidad == 'pages' else 1
+            estado['inicio'] += int(cantidad) * paso
+        dibujar()
+
+    def rueda(evento):
+        # <MouseWheel> en Windows/macOS (delta) y <Button-4>/<Button-5> en Linux
+        arriba = evento.num == 4 or getattr(evento, 'delta', 0) > 0
+        desplazar('scroll', -FILAS_POR_RUEDA if arriba else FILAS_POR_RUEDA)
+        return 'break'
+
+    def redimensionar(evento):
+        # Filas que caben en el alto disponible (una se reserva para los encabezados)
+        alto_fila = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        filas = max(evento.height // alto_fila - 1, 1)
+        if filas != estado['filas']:
+            estado['filas'] = filas
+            dibujar()
+
+    barra.config(command=desplazar)
+    for secuencia in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+        tree.bind(secuencia, rueda)
+    tree.bind('<Prior>', lambda evento: (desplazar('scroll', -1, 'pages'), 'break')[1])
+    tree.bind('<Next>', lambda evento: (desplazar('scroll', 1, 'pages'), 'break')[1])
+    tree.bind('<Configure>', redimensionar)
+
+    dibujar()
+    return marco
+
+def load_csv():
+    ruta = filedialog.askopenfilename(title="Seleccionar archivo CSV", filetypes=[("CSV files", "*.csv")])
+    if not ruta:
+        return
+
+    def leer(progreso):
+        progreso(None, "Leyendo el archivo CSV...")
+        return leer_csv_con_cache(ruta, progreso=lambda hechos, total: progreso(hechos / max(total, 1)))
+
+    def al_terminar(resultado):
+        global captura, df1, df2, ruta_archivo
+        captura, ruta_archivo = resultado, ruta
+        df1, df2 = captura.df1, captura.df2
+        messagebox.showinfo("Éxito", "Archivo CSV cargado con éxito")
+
+    ejecutar_en_segundo_plano("Cargando archivo CSV", leer, al_terminar, "Error al cargar el archivo")
 
 def procesar_datos():
-    global frec_mag, df_caracteristicas
-    if 'df3' not in globals():
+    if 'captura' not in globals():
         messagebox.showwarning("Advertencia", "Primero debes cargar un archivo CSV.")
         return
 
@@ -208,115 +360,205 @@ def procesar_datos():
         messagebox.showwarning("Advertencia", "Por favor, ingresa el parámetro de fecha y hora.")
         return
 
-    # Normalizar el parámetro de hora
-    hora_parametro_normalizada = normalizar_columna(hora_parametro)
+    # Buscar el barrido en el índice de fechas y horas que armó el lector
+    indice = captura.indice
+    indice_barrido = indice.posicion(hora_parametro)
+    if indice_barrido is None:
+        try:
+            indice_barrido = indice.mas_cercano(hora_parametro)
+        except ValueError:
+            indice_barrido = None
+        if indice_barrido is None:
+            messagebox.showerror("Error", f"La hora '{hora_parametro}' no coincide con ningún barrido.")
+            return
+        messagebox.showinfo("Barrido más cercano", f"No hay un barrido '{hora_parametro}'; se usa el más cercano, "
+                                                   f"'{indice.nombres[indice_barrido]}'.")
+
+    # Los widgets solo se leen desde el hilo de Tk; el análisis corre en segundo plano
+    piso_local = piso_local_var.get()
+    wavelet = WAVELET if wavelet_var.get() else None
+    cfar = ParametrosCFAR() if cfar_var.get() else None
+
+    def al_terminar(resultado):
+        global frec_mag, df_caracteristicas
+        frec_mag, df_caracteristicas = resultado
+
+        # Asignar satélites a las señales
+        asignar_satellite()
+
+        messagebox.showinfo("Éxito", "Procesamiento de datos completado.")
+        # Mostrar tabla de características
+        mostrar_caracteristicas()
+
+    ejecutar_en_segundo_plano("Procesando datos",
+                              lambda progreso: analizar_barrido(captura, indice_barrido, piso_local, progreso,
+                                                                wavelet, cfar),
+                              al_terminar, "Error al procesar los datos")
+
+def analizar_barrido(captura, indice_barrido, piso_local, progreso, wavelet=None, cfar=None):
+    """
+    Detecta las señales de un barrido y calcula sus características. Se ejecuta en
+    segundo plano, así que no toca la interfaz: devuelve (frec_mag, df_caracteristicas).
+    Con `wavelet` la altura mínima y los picos se buscan en el barrido sin ruido
+    (columna 'Magnitud sin ruido [dBm]' de frec_mag), pero las características,
+    incluido el nivel de ruido del SNR, se miden sobre el barrido original. Con `cfar`
+    (ParametrosCFAR) la altura mínima de los picos es el umbral CFAR de cada bin.
+    """
+    # Frecuencia y magnitud del barrido seleccionado, ya convertidas por el lector
+    frec_mag = pd.DataFrame({
+        'Frequency [Hz]': captura.frecuencias,
+        'Magnitude [dBm]': captura.barrido(indice_barrido),
+    })
+    if wavelet:
+        progreso(None, "Eliminando el ruido (wavelet)...")
+        frec_mag['Magnitud sin ruido [dBm]'] = eliminar_ruido_wavelet(frec_mag['Magnitude [dBm]'].values, wavelet)
+    progreso(None, "Estimando el nivel de ruido...")
 
-    # Aplicar la función de normalización a los nombres de las columnas
-    df3.columns = [normalizar_columna(col) for col in df3.columns]
+    # Procesar los datos (aplicar filtrado, detección de picos, etc.)
+    # Calcular el percentil 20 de las magnitudes
+    magnitudes = frec_mag['Magnitude [dBm]'].values
+    frecuencias = frec_mag['Frequency [Hz]'].values
+    # Barrido en el que se buscan el nivel de ruido y los picos
+    filtradas = frec_mag['Magnitud sin ruido [dBm]'].values if wavelet else magnitudes
 
-    # Buscar la columna que coincida con la hora normalizada
-    if hora_parametro_normalizada in df3.columns:
-        columnas_seleccionadas = [df3.columns[0], hora_parametro_normalizada]
-        frec_mag = df3[columnas_seleccionadas]
+    if cfar is not None:
+        # Umbral adaptativo CFAR: altura mínima y nivel de ruido de cada bin
+        with perfil.etapa('cfar', metodo=cfar.metodo, barridos=1, bins=len(magnitudes)):
+            min_peak_height, noise_level = umbral_cfar(filtradas, *cfar)
     else:
-        messagebox.showerror("Error", f"La hora '{hora_parametro}' no coincide con ningún nombre de columna después de normalizar.")
-        return
+        with perfil.etapa('nivel_ruido', piso_local=piso_local, barridos=1, bins=len(magnitudes)):
+            if piso_local:
+                # Piso de ruido local (ventana deslizante), para espectros con el piso inclinado
+                noise_level = estimar_piso_local(filtradas)
+            else:
+                # Estimar el nivel de ruido como la mediana de las magnitudes por debajo del percentil 20
+                noise_level = estimar_nivel_ruido(filtradas)
 
-    # Renombrar las columnas con los valores de la fila con índice 1
-    frec_mag.columns = frec_mag.iloc[1]
+        # Establecer una altura mínima para los picos (por ejemplo, 6 dB por encima del nivel de ruido)
+        min_peak_height = noise_level + 60  # Puedes ajustar este valor según sea necesario
 
-    # Eliminar las dos primeras filas y reiniciar el índice
-    frec_mag = frec_mag.iloc[2:].reset_index(drop=True)
+    # Encontrar los índices de los picos
+    progreso(None, "Detectando señales...")
+    from scipy.signal import find_peaks
+
+    with perfil.etapa('find_peaks', barridos=1, bins=len(magnitudes)) as medicion:
+        indices_picos, properties = find_peaks(filtradas, height=min_peak_height)
+        medicion.salida(picos=len(indices_picos))
+
+    if wavelet:
+        # El SNR se mide contra el ruido del barrido original, no contra el piso suavizado
+        if cfar is not None:
+            _, noise_level = umbral_cfar(magnitudes, *cfar)
+        elif piso_local:
+            noise_level = estimar_piso_local(magnitudes)
+        else:
+            noise_level = estimar_nivel_ruido(magnitudes)
 
-    # Asegurando formato de columnas Frecuencia y Magnitud
-    frec_mag['Frequency [Hz]'] = frec_mag['Frequency [Hz]'].astype(float)
-    frec_mag['Magnitude [dBm]'] = frec_mag['Magnitude [dBm]'].astype(float)
+    # Calcular las características de cada señal (frecuencias -3 dB, BW, SNR, potencia de canal)
+    with perfil.etapa('caracteristicas', picos=len(indices_picos), bins=len(magnitudes)):
+        caracteristicas = extraer_caracteristicas(frecuencias, magnitudes, indices_picos, noise_level)
 
-    # Procesar los datos (aplicar filtrado, detección de picos, etc.)
-    # Calcular el percentil 20 de las magnitudes
-    magnitudes = frec_mag['Magnitude [dBm]'].values
-    frecuencias = frec_mag['Frequency [Hz]'].values
+    return frec_mag, pd.DataFrame(caracteristicas)
+
+def seguir_senales():
+    """
+    Analiza todos los barridos de la captura cargada y agrupa en pistas las señales
+    que persisten entre barridos (deriva de frecuencia, potencia, ancho de banda y duración).
+    """
+    if 'captura' not in globals():
+        messagebox.showwarning("Advertencia", "Primero debes cargar un archivo CSV.")
+        return
+    piso_local = piso_local_var.get()
+    wavelet = WAVELET if wavelet_var.get() else None
+    cfar = ParametrosCFAR() if cfar_var.get() else None
 
-    percentile_20 = np.percentile(magnitudes, 20)
+    def seguir(progreso):
+        tabla = analizar_captura(captura, piso_local=piso_local, wavelet=wavelet, cfar=cfar,
+                                 **avance_por_barridos(progreso, "Analizando los barridos"))
+        progreso(None, "Siguiendo las señales entre barridos...")
+        seguidor = SeguidorSenales()
+        seguidor.procesar_tabla(tabla, captura.indice.segundos())
+        return seguidor.tabla()
 
-    # Seleccionar las magnitudes por debajo del percentil 20
-    noise_magnitudes = magnitudes[magnitudes <= percentile_20]
+    ejecutar_en_segundo_plano("Seguimiento de señales", seguir, mostrar_pistas, "Error al seguir las señales")
 
-    # Estimar el nivel de ruido como la mediana de estas magnitudes
-    noise_level = np.median(noise_magnitudes)
+def mostrar_pistas(pistas):
+    ventana = tk.Toplevel(root)
+    ventana.title(f"Seguimiento de señales ({len(pistas)} pistas)")
+    ventana.geometry("1000x500")
 
-    # Establecer una altura mínima para los picos (por ejemplo, 6 dB por encima del nivel de ruido)
-    min_peak_height = noise_level + 60  # Puedes ajustar este valor según sea necesario
+    tabla = crear_tabla_virtual(ventana, pistas, ancho_columna=140, height=15)
+    tabla.pack(pady=20, padx=20, fill='both', expand=True)
 
-    # Encontrar los índices de los picos
-    indices_picos, properties = find_peaks(magnitudes, height=min_peak_height)
-
-    # Obtener las frecuencias y magnitudes de los picos
-    frecuencias_picos = frecuencias[indices_picos]
-    magnitudes_picos = magnitudes[indices_picos]
-
-    # Lista para almacenar las características de cada señal
-    caracteristicas = []
-
-    for i, indice_pico in enumerate(indices_picos):
-        frec_peak = frecuencias_picos[i]
-        mag_peak = magnitudes_picos[i]
-        threshold = mag_peak - 3  # Umbral de -3 dB desde el pico
-
-        # Buscar la frecuencia menor (izquierda del pico)
-        idx_left = indice_pico
-        while idx_left > 0 and magnitudes[idx_left] > threshold:
-            idx_left -= 1
-        frec_lower = frecuencias[idx_left]
-
-        # Buscar la frecuencia mayor (derecha del pico)
-        idx_right = indice_pico
-        while idx_right < len(magnitudes) - 1 and magnitudes[idx_right] > threshold:
-            idx_right += 1
-        frec_upper = frecuencias[idx_right]
-
-        # Calcular la frecuencia central y el ancho de banda
-        frec_central = (frec_upper + frec_lower) / 2
-        bandwidth = frec_upper - frec_lower
+    def exportar():
+        ruta = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"), ("CSV files", "*.csv")],
+            title="Guardar pistas")
+        if ruta:
+            ejecutar_en_segundo_plano("Exportando pistas", lambda progreso: guardar_tabla(pistas, ruta),
+                                      lambda _: messagebox.showinfo("Exportar", f"Pistas exportadas a:\n{ruta}"),
+                                      "Error al exportar las pistas")
 
-        # Calcular la relación señal-ruido (SNR)
-        SNR = mag_peak - noise_level
-
-        # Calcular la potencia de canal
-        # Obtener los índices dentro del ancho de banda
-        idx_bandwidth = np.where((frecuencias >= frec_lower) & (frecuencias <= frec_upper))[0]
-
-        # Obtener las magnitudes en dBm dentro del ancho de banda
-        mags_in_band = magnitudes[idx_bandwidth]
-
-        # Convertir magnitudes de dBm a mW
-        powers_mW = dBm_to_mW(mags_in_band)
-
-        # Calcular la potencia total en mW y convertir a dBm
-        total_power_mW = np.sum(powers_mW)
-        total_power_dBm = 10 * np.log10(total_power_mW)
-
-        # Almacenar las características en un diccionario
-        caracteristicas.append({
-            'Señal': i + 1,
-            'Frecuencia menor [Hz]': frec_lower,
-            'Frecuencia mayor [Hz]': frec_upper,
-            'Frecuencia central [Hz]': frec_central,
-            'Ancho de banda (BW) [Hz]': bandwidth,
-            'Amplitud/ Potencia [dBm]': mag_peak,
-            'Nivel de ruido [dBm]': noise_level,
-            'Relación señal-ruido (SNR) [dB]': SNR,
-            'Potencia de canal [dBm]': total_power_dBm
-        })
+    tk.Button(ventana, text="Exportar", command=exportar).pack(pady=10)
 
-    df_caracteristicas = pd.DataFrame(caracteristicas)
+def calcular_ocupacion():
+    """
+    Acumula la ocupación del espectro, el max-hold y las interferencias por banda de
+    todos los barridos de la captura cargada, junto con los de las capturas
+    analizadas antes que tengan el mismo eje de frecuencias.
+    """
+    if 'captura' not in globals():
+        messagebox.showwarning("Advertencia", "Primero debes cargar un archivo CSV.")
+        return
+    if ruta_archivo in archivos_ocupacion:
+        mostrar_ocupacion(estadisticas_espectro)
+        return
+    piso_local = piso_local_var.get()
+
+    def acumular(progreso):
+        ocupacion = EstadisticasEspectro(captura.frecuencias, plan_bandas)
+        ocupacion.agregar_captura(captura, piso_local=piso_local,
+                                  **avance_por_barridos(progreso, "Acumulando la ocupación"))
+        ocupacion.agregar_senales(analizar_captura(captura, piso_local=piso_local,
+                                                   **avance_por_barridos(progreso, "Contando señales")))
+        return ocupacion
+
+    def al_terminar(ocupacion):
+        global estadisticas_espectro
+        try:
+            estadisticas_espectro = estadisticas_espectro.combinar(ocupacion)
+        except (AttributeError, ValueError):
+            # Primera captura, u otro eje de frecuencias o plan: se empieza de nuevo
+            estadisticas_espectro = ocupacion
+            archivos_ocupacion.clear()
+        archivos_ocupacion.add(ruta_archivo)
+        mostrar_ocupacion(estadisticas_espectro)
 
-    # Asignar satélites a las señales
-    asignar_satellite()
+    ejecutar_en_segundo_plano("Ocupación del espectro", acumular, al_terminar, "Error al calcular la ocupación")
 
-    messagebox.showinfo("Éxito", "Procesamiento de datos completado.")
-    # Mostrar tabla de características
-    mostrar_caracteristicas()
+def mostrar_ocupacion(ocupacion):
+    ventana = tk.Toplevel(root)
+    ventana.title("Ocupación e interferencias por banda")
+    ventana.geometry("1000x300")
+    tabla = crear_tabla_virtual(ventana, ocupacion.bandas(), ancho_columna=140, height=6)
+    tabla.pack(pady=20, padx=20, fill='both', expand=True)
+
+    mapa = ocupacion.ocupacion()
+    frecuencias = mapa['Frecuencia [Hz]'].to_numpy()
+    _, (ax_potencia, ax_ocupacion) = plt.subplots(2, 1, sharex=True, figsize=(12, 8))
+    dibujar_espectro(ax_potencia, frecuencias, mapa['Máximo [dBm]'].to_numpy(), color='r', label='Máximo (max-hold)')
+    dibujar_espectro(ax_potencia, frecuencias, mapa['Media [dBm]'].to_numpy(), color='b', label='Media')
+    ax_potencia.set_ylabel('Magnitud [dBm]')
+    ax_potencia.set_title(f"Ocupación del espectro ({ocupacion.n_barridos} barridos, "
+                          f"{len(archivos_ocupacion)} capturas)")
+    ax_potencia.legend()
+    ax_potencia.grid(True)
+    dibujar_espectro(ax_ocupacion, frecuencias, mapa['Ocupación [%]'].to_numpy(), color='g')
+    ax_ocupacion.set_xlabel('Frecuencia [Hz]')
+    ax_ocupacion.set_ylabel('Ocupación [%]')
+    ax_ocupacion.grid(True)
+    plt.show()
 
 def mostrar_caracteristicas():
     # Crear una nueva ventana para mostrar la tabla
@@ -324,19 +566,9 @@ def mostrar_caracteristicas():
     ventana.title("Características de las señales")
     ventana.geometry("900x500")
 
-    # Crear Treeview para mostrar el DataFrame
-    columns = list(df_caracteristicas.columns)
-    tree = ttk.Treeview(ventana, columns=columns, show='headings', height=15)
-    tree.pack(pady=20, padx=20, fill='both', expand=True)
-
-    # Definir las columnas
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, anchor='center', width=120)
-
-    # Insertar los datos
-    for index, row in df_caracteristicas.iterrows():
-        tree.insert("", "end", values=list(row))
+    # Tabla que solo crea las filas visibles, para abrir al instante tablas grandes
+    tabla = crear_tabla_virtual(ventana, df_caracteristicas, height=15)
+    tabla.pack(pady=20, padx=20, fill='both', expand=True)
 
     # Añadir botones para funcionalidades adicionales
     btn_frame = tk.Frame(ventana)
@@ -367,17 +599,9 @@ def mostrar_parametros_canal():
     label_atenuacion = tk.Label(ventana, text="Estimación de Atenuación", font=("Helvetica", 14, "bold"))
     label_atenuacion.pack(pady=10)
 
-    # Crear Treeview para mostrar el DataFrame de atenuaciones
-    columns = list(df_atenuacion.columns)
-    tree = ttk.Treeview(ventana, columns=columns, show='headings', height=5)
-    tree.pack(pady=10, padx=20, fill='both', expand=True)
-
-    for col in columns:
-        tree.heading(col, text=col)
-        tree.column(col, anchor='center', width=150)
-
-    for index, row in df_atenuacion.iterrows():
-        tree.insert("", "end", values=list(row))
+    # Tabla con las atenuaciones (solo se crean las filas visibles)
+    tabla = crear_tabla_virtual(ventana, df_atenuacion, ancho_columna=150, height=5)
+    tabla.pack(pady=10, padx=20, fill='both', expand=True)
 
     # Mostrar retardo
     retardo = estimar_retardo()
@@ -386,9 +610,14 @@ def mostrar_parametros_canal():
 
 def plot_detected_signals_global():
     plt.figure(figsize=(12, 6))
+    frecuencias = frec_mag['Frequency [Hz]'].to_numpy()
+    magnitudes = frec_mag['Magnitude [dBm]'].to_numpy()
 
     # Graficar el espectro completo en gris claro para referencia
-    plt.plot(frec_mag['Frequency [Hz]'], frec_mag['Magnitude [dBm]'], color='lightgray', label='Espectro completo')
+    dibujar_espectro(plt.gca(), frecuencias, magnitudes, color='lightgray', label='Espectro completo')
+    if 'Magnitud sin ruido [dBm]' in frec_mag:
+        dibujar_espectro(plt.gca(), frecuencias, frec_mag['Magnitud sin ruido [dBm]'].to_numpy(), color='darkgray',
+                         label='Espectro sin ruido (wavelet)')
 
     # Colores para diferenciar cada señal
     colores = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
@@ -399,16 +628,15 @@ def plot_detected_signals_global():
         frec_upper = señal['Frecuencia mayor [Hz]']
         señal_num = señal['Señal']
 
-        # Extraer los datos dentro del rango de frecuencia de la señal
-        mask = (frec_mag['Frequency [Hz]'] >= frec_lower) & (frec_mag['Frequency [Hz]'] <= frec_upper)
-        freqs_signal = frec_mag['Frequency [Hz]'][mask]
-        mags_signal = frec_mag['Magnitude [dBm]'][mask]
+        # Extraer los datos dentro del rango de frecuencia de la señal (vistas, sin copiar)
+        tramo = indices_en_rango(frecuencias, frec_lower, frec_upper)
 
         # Seleccionar un color para la señal
         color = colores[idx % len(colores)]
 
         # Graficar la señal
-        plt.plot(freqs_signal, mags_signal, color=color, label=f'Señal {señal_num} ({señal["Satélite"]})')
+        dibujar_espectro(plt.gca(), frecuencias[tramo], magnitudes[tramo], color=color,
+                         label=f'Señal {señal_num} ({señal["Satélite"]})')
 
         # Marcar el pico de la señal
         frec_peak = señal['Frecuencia central [Hz]']
@@ -424,6 +652,8 @@ def plot_detected_signals_global():
 
 def plot_detected_signals_local():
     plt.figure(figsize=(12, 6))
+    frecuencias = frec_mag['Frequency [Hz]'].to_numpy()
+    magnitudes = frec_mag['Magnitude [dBm]'].to_numpy()
 
     # Colores para diferenciar cada señal
     colores = ['b', 'g', 'r', 'c', 'm', 'y', 'k']
@@ -446,8 +676,8 @@ def plot_detected_signals_local():
         frec_upper_expanded = frec_upper + delta_freq
 
         # Asegurarse de que las frecuencias no salgan del rango de datos
-        frec_lower_expanded = max(frec_lower_expanded, frec_mag['Frequency [Hz]'].min())
-        frec_upper_expanded = min(frec_upper_expanded, frec_mag['Frequency [Hz]'].max())
+        frec_lower_expanded = max(frec_lower_expanded, frecuencias[0])
+        frec_upper_expanded = min(frec_upper_expanded, frecuencias[-1])
 
         # Actualizar el rango total de frecuencias a mostrar
         if frec_min_total is None or frec_lower_expanded < frec_min_total:
@@ -455,16 +685,15 @@ def plot_detected_signals_local():
         if frec_max_total is None or frec_upper_expanded > frec_max_total:
             frec_max_total = frec_upper_expanded
 
-        # Extraer los datos dentro del rango de frecuencia expandido
-        mask = (frec_mag['Frequency [Hz]'] >= frec_lower_expanded) & (frec_mag['Frequency [Hz]'] <= frec_upper_expanded)
-        freqs_signal = frec_mag['Frequency [Hz]'][mask]
-        mags_signal = frec_mag['Magnitude [dBm]'][mask]
+        # Extraer los datos dentro del rango de frecuencia expandido (vistas, sin copiar)
+        tramo = indices_en_rango(frecuencias, frec_lower_expanded, frec_upper_expanded)
 
         # Seleccionar un color para la señal
         color = colores[idx % len(colores)]
 
         # Graficar la señal
-        plt.plot(freqs_signal, mags_signal, color=color, label=f'Señal {señal_num} ({señal["Satélite"]})')
+        dibujar_espectro(plt.gca(), frecuencias[tramo], magnitudes[tramo], color=color,
+                         label=f'Señal {señal_num} ({señal["Satélite"]})')
 
         # Marcar el pico de la señal
         frec_peak = señal['Frecuencia central [Hz]']
@@ -487,9 +716,287 @@ def plot_global():
 def plot_local():
     plot_detected_signals_local()
 
+def iniciar_monitoreo():
+    """
+    Vigila una captura en curso y agrega a una tabla las señales de cada barrido nuevo.
+    """
+    ruta = filedialog.askopenfilename(title="Seleccionar captura en curso", filetypes=[("CSV files", "*.csv")])
+    if not ruta:
+        return
+    # Las señales de cada barrido nuevo se asocian a las pistas de los anteriores
+    monitor = MonitorArchivo(ruta, plan_bandas=plan_bandas, seguidor=SeguidorSenales(),
+                             wavelet=WAVELET if wavelet_var.get() else None,
+                             cfar=ParametrosCFAR() if cfar_var.get() else None)
+
+    ventana = tk.Toplevel(root)
+    ventana.title(f"Monitoreo en vivo - {ruta}")
+    ventana.geometry("900x500")
+
+    columns = ['Barrido', 'Señal', 'Frecuencia central [Hz]', 'Ancho de banda (BW) [Hz]',
+               'Amplitud/ Potencia [dBm]', 'Relación señal-ruido (SNR) [dB]', 'Satélite', 'Pista']
+    tree = ttk.Treeview(ventana, columns=columns, show='headings', height=15)
+    tree.pack(pady=20, padx=20, fill='both', expand=True)
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, anchor='center', width=120)
+
+    estado_label = tk.Label(ventana, text="Esperando barridos...", font=("Helvetica", 12))
+    estado_label.pack(pady=10)
+
+    # La lectura y el análisis van en un hilo de trabajo; los resultados pasan por una
+    # cola que se revisa con `after`, como en `ejecutar_en_segundo_plano`
+    cola = queue.Queue()
+    detener = threading.Event()
+
+    def vigilar():
+        while not detener.is_set():
+            try:
+                cola.put(('tabla', monitor.actualizar(), monitor.n_barridos))
+            except Exception as e:
+                cola.put(('error', e, monitor.n_barridos))
+            detener.wait(INTERVALO_MONITOREO_MS / 1000)
+
+    def revisar():
+        if not ventana.winfo_exists():
+            detener.set()  # La ventana se cerró: termina el monitoreo
+            return
+        while True:
+            try:
+                tipo, valor, n_barridos = cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == 'error':
+                estado_label.config(text=f"Error al leer la captura: {valor}")
+                continue
+            if valor is not None:
+                for fila in valor[columns].itertuples(index=False):
+                    tree.insert("", "end", values=list(fila))
+                if tree.get_children():
+                    tree.see(tree.get_children()[-1])
+            estado_label.config(text=f"{n_barridos} barridos analizados")
+        ventana.after(INTERVALO_PROGRESO_MS, revisar)
+
+    ventana.bind('<Destroy>', lambda evento: detener.set() if evento.widget is ventana else None)
+    threading.Thread(target=vigilar, daemon=True).start()
+    revisar()
+
+def alternar_diagnostico():
+    """
+    Activa o desactiva la medición de tiempo y memoria de cada etapa.
+    """
+    if diagnostico_var.get():
+        perfil.activar()
+    else:
+        perfil.desactivar()
+
+def mostrar_diagnostico():
+    """
+    Panel con las mediciones de cada etapa: resumen por etapa y registros individuales.
+    """
+    ventana = tk.Toplevel(root)
+    ventana.title("Diagnóstico de rendimiento")
+    ventana.geometry("1000x600")
+
+    contenido = tk.Frame(ventana)
+    contenido.pack(fill='both', expand=True)
+
+    def tablas_diagnostico():
+        registros = list(perfil.registros)
+        resumen = perfil.resumen(registros)
+        resumen['memoria_pico_MB'] = (resumen.pop('memoria_pico_bytes') / 1e6).round(2)
+        detalle = pd.DataFrame({
+            'Etapa': [r['etapa'] for r in registros],
+            'Tiempo [ms]': [round(r['segundos'] * 1e3, 3) for r in registros],
+            'CPU [ms]': [round(r['cpu_s'] * 1e3, 3) for r in registros],
+            'Memoria pico [MB]': [round(r['memoria_pico_bytes'] / 1e6, 2) for r in registros],
+            'Entrada': [', '.join(f"{k}={v}" for k, v in r['entrada'].items()) for r in registros],
+            'Salida': [', '.join(f"{k}={v}" for k, v in r['salida'].items()) for r in registros],
+        })
+        return resumen, detalle
+
+    def actualizar():
+        for widget in contenido.winfo_children():
+            widget.destroy()
+        resumen, detalle = tablas_diagnostico()
+        tk.Label(contenido, text="Total por etapa", font=("Helvetica", 12, "bold")).pack(pady=5)
+        crear_tabla_virtual(contenido, resumen, height=6).pack(padx=20, fill='x')
+        tk.Label(contenido, text=f"Registros ({len(detalle)})", font=("Helvetica", 12, "bold")).pack(pady=5)
+        crear_tabla_virtual(contenido, detalle, ancho_columna=140).pack(padx=20, fill='both', expand=True)
+
+    def limpiar():
+        perfil.limpiar()
+        actualizar()
+
+    def exportar():
+        ruta = filedialog.asksaveasfilename(defaultextension=".jsonl", filetypes=[("JSON lines", "*.jsonl")],
+                                            title="Guardar registros de diagnóstico")
+        if ruta:
+            try:
+                perfil.exportar_jsonl(ruta)
+                messagebox.showinfo("Diagnóstico", f"Registros exportados a:\n{ruta}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al exportar los registros: {e}")
+
+    btn_frame = tk.Frame(ventana)
+    btn_frame.pack(pady=10)
+    tk.Button(btn_frame, text="Actualizar", command=actualizar).pack(side='left', padx=10)
+    tk.Button(btn_frame, text="Limpiar", command=limpiar).pack(side='left', padx=10)
+    tk.Button(btn_frame, text="Exportar JSONL", command=exportar).pack(side='left', padx=10)
+
+    if not perfil.activo():
+        tk.Label(ventana, text="El diagnóstico está desactivado: actívalo en la ventana principal para medir.",
+                 font=("Helvetica", 10)).pack(pady=5)
+    actualizar()
+
+def abrir_resultados():
+    """
+    Ventana de la base de resultados: guarda en ella las señales de todos los
+    barridos de la captura cargada y busca señales de análisis anteriores por
+    frecuencia, SNR, satélite e intervalo de tiempo, sin volver a leer las capturas.
+    """
+    ventana = tk.Toplevel(root)
+    ventana.title("Base de resultados")
+    ventana.geometry("1100x650")
+
+    base_frame = tk.Frame(ventana)
+    base_frame.pack(pady=10, padx=20, fill='x')
+    tk.Label(base_frame, text="Base:").pack(side='left')
+    base_entry = tk.Entry(base_frame, width=70)
+    base_entry.pack(side='left', padx=5, fill='x', expand=True)
+    base_entry.insert(0, ruta_almacen)
+
+    def elegir_base():
+        ruta = filedialog.asksaveasfilename(defaultextension=".sqlite", confirmoverwrite=False,
+                                            filetypes=[("SQLite", "*.sqlite *.db")], title="Base de resultados")
+        if ruta:
+            base_entry.delete(0, 'end')
+            base_entry.insert(0, ruta)
+
+    def base():
+        global ruta_almacen
+        ruta_almacen = base_entry.get().strip()
+        return ruta_almacen
+
+    tk.Button(base_frame, text="Elegir...", command=elegir_base).pack(side='left', padx=5)
+    tk.Button(base_frame, text="Guardar captura cargada", command=lambda: guardar_en_almacen(base())).pack(
+        side='left', padx=5)
+
+    # Filtros: los campos vacíos no filtran
+    filtros_frame = tk.Frame(ventana)
+    filtros_frame.pack(pady=5, padx=20)
+    campos = {}
+    for i, (clave, etiqueta, valor) in enumerate([
+            ('frecuencia', "Frecuencia central [MHz]", ''), ('tolerancia', "Tolerancia [MHz]", '0.1'),
+            ('snr_min', "SNR mínimo [dB]", ''), ('snr_max', "SNR máximo [dB]", ''),
+            ('satelite', "Satélite", ''), ('limite', "Máximo de señales", '100000'),
+            ('desde', "Desde (fecha y hora)", ''), ('hasta', "Hasta (fecha y hora)", '')]):
+        tk.Label(filtros_frame, text=etiqueta).grid(row=i // 2, column=2 * (i % 2), sticky='e', padx=5, pady=2)
+        campos[clave] = tk.Entry(filtros_frame, width=30)
+        campos[clave].grid(row=i // 2, column=2 * (i % 2) + 1, padx=5, pady=2)
+        campos[clave].insert(0, valor)
+
+    estado_label = tk.Label(ventana, text="", font=("Helvetica", 11))
+    resultados_frame = tk.Frame(ventana)
+    resultado = {'tabla': None}
+
+    def leer_filtros():
+        texto = {clave: campo.get().strip() for clave, campo in campos.items()}
+        numero = {clave: float(texto[clave].replace(',', '.')) if texto[clave] else None
+                  for clave in ('frecuencia', 'tolerancia', 'snr_min', 'snr_max', 'limite')}
+        filtros = dict(snr_min=numero['snr_min'], snr_max=numero['snr_max'], satelite=texto['satelite'] or None,
+                       desde=texto['desde'] or None, hasta=texto['hasta'] or None)
+        if numero['frecuencia'] is not None:
+            tolerancia = (numero['tolerancia'] or 0.0) * 1e6
+            filtros.update(frecuencia_min=numero['frecuencia'] * 1e6 - tolerancia,
+                           frecuencia_max=numero['frecuencia'] * 1e6 + tolerancia)
+        limite = None if numero['limite'] is None else int(numero['limite'])
+        return filtros, limite
+
+    def buscar():
+        try:
+            filtros, limite = leer_filtros()
+        except ValueError as e:
+            messagebox.showerror("Error", f"Filtro no válido: {e}")
+            return
+        ruta = base()
+
+        def consultar(progreso):
+            progreso(None, "Buscando en la base de resultados...")
+            # La conexión se abre en el hilo de trabajo, que es el único que la usa
+            with AlmacenResultados(ruta) as almacen:
+                inicio = time.perf_counter()
+                tabla = almacen.consultar(limite=limite, **filtros)
+                return tabla, time.perf_counter() - inicio
+
+        def mostrar(respuesta):
+            tabla, segundos = respuesta
+            resultado['tabla'] = tabla
+            for widget in resultados_frame.winfo_children():
+                widget.destroy()
+            estado_label.config(text=f"{len(tabla)} señales en {segundos * 1e3:.1f} ms")
+            crear_tabla_virtual(resultados_frame, tabla, ancho_columna=140).pack(fill='both', expand=True)
+
+        ejecutar_en_segundo_plano("Buscando señales", consultar, mostrar, "Error al consultar la base de resultados")
+
+    def exportar():
+        if resultado['tabla'] is None:
+            messagebox.showwarning("Advertencia", "Primero realiza una búsqueda.")
+            return
+        ruta = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            filetypes=[("Excel files", "*.xlsx"), ("Parquet files", "*.parquet"), ("CSV files", "*.csv")],
+            title="Guardar señales encontradas")
+        if ruta:
+            ejecutar_en_segundo_plano("Exportando señales", lambda progreso: guardar_tabla(resultado['tabla'], ruta),
+                                      lambda _: messagebox.showinfo("Exportar", f"Señales exportadas a:\n{ruta}"),
+                                      "Error al exportar las señales")
+
+    btn_frame = tk.Frame(ventana)
+    btn_frame.pack(pady=5)
+    tk.Button(btn_frame, text="Buscar", command=buscar).pack(side='left', padx=10)
+    tk.Button(btn_frame, text="Exportar", command=exportar).pack(side='left', padx=10)
+    estado_label.pack(pady=5)
+    resultados_frame.pack(pady=5, padx=20, fill='both', expand=True)
+
+def guardar_en_almacen(ruta):
+    """
+    Analiza todos los barridos de la captura cargada y guarda sus señales en la base
+    `ruta`, reemplazando las de un análisis anterior del mismo archivo.
+    """
+    if 'captura' not in globals():
+        messagebox.showwarning("Advertencia", "Primero debes cargar un archivo CSV.")
+        return
+    piso_local = piso_local_var.get()
+    wavelet = WAVELET if wavelet_var.get() else None
+    cfar = ParametrosCFAR() if cfar_var.get() else None
+
+    def guardar(progreso):
+        tabla = analizar_captura(captura, piso_local=piso_local, wavelet=wavelet, cfar=cfar,
+                                 **avance_por_barridos(progreso, "Analizando los barridos"))
+        tabla.insert(0, 'Archivo', ruta_archivo)
+        tabla['Satélite'] = asignar_satelites(tabla['Frecuencia central [Hz]'], plan_bandas)
+        progreso(None, "Guardando en la base de resultados...")
+        with AlmacenResultados(ruta) as almacen:
+            almacen.agregar(tabla, reemplazar=True)
+            almacen.optimizar()
+        return len(tabla)
+
+    ejecutar_en_segundo_plano(
+        "Guardando resultados", guardar,
+        lambda n: messagebox.showinfo("Base de resultados", f"{n} señales guardadas en:\n{ruta}"),
+        "Error al guardar en la base de resultados")
+
 # Función principal para crear la interfaz gráfica
 def crear_interfaz():
-    global root, hora_entry
+    global root, hora_entry, piso_local_var, wavelet_var, cfar_var, diagnostico_var
+    global tk, ttk, filedialog, messagebox, plt, pd
+    import pandas as pd
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+    from tkinter import ttk  # Para usar Treeview y mejorar la estética de la tabla
+    import matplotlib
+    matplotlib.use('TkAgg')  # Usar TkAgg como backend de Matplotlib
+    import matplotlib.pyplot as plt
 
     # Creación de la ventana principal
     root = tk.Tk()
@@ -507,6 +1014,11 @@ def crear_interfaz():
                             bg="#1ABC9C", fg="white", padx=10, pady=5)
     load_button.pack(pady=10)
 
+    # Botón para cargar el plan de bandas
+    plan_button = tk.Button(root, text="Cargar Plan de Bandas", font=("Helvetica", 12), command=cargar_plan_bandas,
+                            bg="#16A085", fg="white", padx=10, pady=5)
+    plan_button.pack(pady=10)
+
     # Entrada para el parámetro de hora
     hora_frame = tk.Frame(root, bg="#34495E")
     hora_frame.pack(pady=10)
@@ -518,11 +1030,64 @@ def crear_interfaz():
     hora_entry.pack(side='left', padx=5)
     hora_entry.insert(0, '11:29:31 p. m. 27/09/2024.2')  # Valor por defecto
 
+    # Opción de piso de ruido local
+    piso_local_var = tk.BooleanVar(value=False)
+    piso_local_check = tk.Checkbutton(root, text="Piso de ruido local (dependiente de la frecuencia)",
+                                      variable=piso_local_var, font=("Helvetica", 12), bg="#34495E", fg="white",
+                                      selectcolor="#34495E", activebackground="#34495E")
+    piso_local_check.pack(pady=5)
+
+    # Opción de eliminar el ruido con wavelets antes de detectar los picos (requiere PyWavelets)
+    wavelet_var = tk.BooleanVar(value=False)
+    wavelet_check = tk.Checkbutton(root, text="Eliminar ruido (wavelet)", variable=wavelet_var,
+                                   font=("Helvetica", 12), bg="#34495E", fg="white",
+                                   selectcolor="#34495E", activebackground="#34495E")
+    wavelet_check.pack(pady=5)
+
+    # Opción de detectar con un umbral adaptativo CFAR en lugar del nivel de ruido + 60 dB
+    cfar_var = tk.BooleanVar(value=False)
+    cfar_check = tk.Checkbutton(root, text="Detector CFAR (umbral adaptativo)", variable=cfar_var,
+                                font=("Helvetica", 12), bg="#34495E", fg="white",
+                                selectcolor="#34495E", activebackground="#34495E")
+    cfar_check.pack(pady=5)
+
     # Botón para procesar datos
     process_button = tk.Button(root, text="Procesar Datos", font=("Helvetica", 12), command=procesar_datos,
                                bg="#E67E22", fg="white", padx=10, pady=5)
     process_button.pack(pady=10)
 
+    # Botón para vigilar una captura en curso
+    monitor_button = tk.Button(root, text="Monitoreo en Vivo", font=("Helvetica", 12), command=iniciar_monitoreo,
+                               bg="#2980B9", fg="white", padx=10, pady=5)
+    monitor_button.pack(pady=10)
+
+    # Botón para acumular la ocupación del espectro de todos los barridos
+    ocupacion_button = tk.Button(root, text="Ocupación del Espectro", font=("Helvetica", 12),
+                                 command=calcular_ocupacion, bg="#C0392B", fg="white", padx=10, pady=5)
+    ocupacion_button.pack(pady=10)
+
+    # Botón para seguir las señales a lo largo de todos los barridos de la captura
+    seguimiento_button = tk.Button(root, text="Seguimiento de Señales", font=("Helvetica", 12),
+                                   command=seguir_senales, bg="#8E44AD", fg="white", padx=10, pady=5)
+    seguimiento_button.pack(pady=10)
+
+    # Botón para guardar resultados y buscar señales de análisis anteriores
+    resultados_button = tk.Button(root, text="Base de Resultados", font=("Helvetica", 12),
+                                  command=abrir_resultados, bg="#27AE60", fg="white", padx=10, pady=5)
+    resultados_button.pack(pady=10)
+
+    # Diagnóstico de rendimiento: medición por etapas (desactivada por defecto)
+    diagnostico_frame = tk.Frame(root, bg="#34495E")
+    diagnostico_frame.pack(pady=5)
+    diagnostico_var = tk.BooleanVar(value=perfil.activo())
+    diagnostico_check = tk.Checkbutton(diagnostico_frame, text="Medir etapas", variable=diagnostico_var,
+                                       command=alternar_diagnostico, font=("Helvetica", 12), bg="#34495E",
+                                       fg="white", selectcolor="#34495E", activebackground="#34495E")
+    diagnostico_check.pack(side='left', padx=5)
+    diagnostico_button = tk.Button(diagnostico_frame, text="Diagnóstico", font=("Helvetica", 12),
+                                   command=mostrar_diagnostico, bg="#7F8C8D", fg="white", padx=10, pady=5)
+    diagnostico_button.pack(side='left', padx=5)
+
     # Iniciar la aplicación
     root.mainloop()
 
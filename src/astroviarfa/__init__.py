@@ -0,0 +1,69 @@
+"""
+Núcleo de análisis para la caracterización de señales de RF de enlaces satelitales.
+"""
+from .cache import leer_csv_con_cache
+from .caracteristicas import COLUMNAS_CARACTERISTICAS, extraer_caracteristicas
+from .deteccion import (ParametrosCFAR, dBm_to_mW, detectar_picos, estimar_nivel_ruido, estimar_piso_local,
+                        umbral_cfar)
+from .exportacion import (EscritorArrow, EscritorCSV, EscritorExcel, abrir_escritor, exportar_bloques,
+                          exportar_tabla)
+from .filtrado import eliminar_ruido_wavelet
+from .graficas import EspectroLOD, PiramideMinMax, dibujar_espectro, indices_en_rango
+from .lector import CapturaCSV, leer_csv_especial, normalizar_columna
+from .lote import (ResultadoLote, agregar_a_csv, expandir_rutas, guardar_tabla, procesar_archivo,
+                   procesar_lote)
+from .monitor import MonitorArchivo, MonitorCapturas, vigilar
+from .motor import analizar_captura
+from .ocupacion import AcumuladorLectura, EstadisticasEspectro, estadisticas_csv
+from .satelites import Banda, IndiceBandas, PlanBandas, asignar_satelites, leer_plan_bandas
+from .seguimiento import SeguidorSenales
+from .sintetico import generar_captura
+from .tiempos import IndiceBarridos, interpretar_nombre_barrido
+
+__all__ = [
+    'AcumuladorLectura',
+    'Banda',
+    'COLUMNAS_CARACTERISTICAS',
+    'CapturaCSV',
+    'EscritorArrow',
+    'EscritorCSV',
+    'EscritorExcel',
+    'EspectroLOD',
+    'EstadisticasEspectro',
+    'IndiceBarridos',
+    'IndiceBandas',
+    'MonitorArchivo',
+    'MonitorCapturas',
+    'ParametrosCFAR',
+    'PiramideMinMax',
+    'PlanBandas',
+    'ResultadoLote',
+    'SeguidorSenales',
+    'abrir_escritor',
+    'agregar_a_csv',
+    'analizar_captura',
+    'asignar_satelites',
+    'dBm_to_mW',
+    'detectar_picos',
+    'dibujar_espectro',
+    'eliminar_ruido_wavelet',
+    'estadisticas_csv',
+    'estimar_nivel_ruido',
+    'estimar_piso_local',
+    'expandir_rutas',
+    'exportar_bloques',
+    'exportar_tabla',
+    'extraer_caracteristicas',
+    'generar_captura',
+    'guardar_tabla',
+    'indices_en_rango',
+    'interpretar_nombre_barrido',
+    'leer_csv_con_cache',
+    'leer_csv_especial',
+    'leer_plan_bandas',
+    'normalizar_columna',
+    'procesar_archivo',
+    'procesar_lote',
+    'umbral_cfar',
+    'vigilar',
+]
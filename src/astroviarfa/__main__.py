@@ -0,0 +1,236 @@
+"""
+Línea de comandos para analizar capturas por lotes:
+
+    python -m astroviarfa capturas/*.csv -o caracteristicas.csv -j 8
+
+o para vigilar capturas en curso y agregar al CSV de salida las señales de cada
+barrido nuevo:
+
+    python -m astroviarfa --vigilar capturas/ -o en_vivo.csv
+
+Con `--seguimiento pistas.csv` las señales de barridos sucesivos de cada archivo
+se agrupan en pistas (columna 'Pista') y el resumen de las pistas se guarda aparte.
+Con `--ocupacion ocupacion.csv` se guardan además el mapa de ocupación por bin de
+todos los barridos y, en ocupacion_bandas.csv, la ocupación y las interferencias por banda.
+Con `--almacen resultados.sqlite` las señales se agregan también a una base de
+resultados que se consulta con `python -m astroviarfa.almacen`.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from . import perfil
+from .almacen import AlmacenResultados
+from .deteccion import (ANCHO_PISO_BINS, ENTRENAMIENTO_CFAR, GUARDA_CFAR, MARGEN_PICO_DB, METODOS_CFAR, PFA_CFAR,
+                        ParametrosCFAR)
+from .exportacion import abrir_escritor
+from .lote import agregar_a_csv, expandir_rutas, guardar_tabla, iterar_lote
+from .monitor import INTERVALO_S, MonitorCapturas
+from .ocupacion import MARGEN_OCUPACION_DB, UMBRAL_SNR_INTERFERENCIA_DB
+from .seguimiento import TOLERANCIA_HZ, SeguidorSenales
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='astroviarfa',
+        description="Caracterización de señales de RF: analiza todos los barridos de varias capturas CSV.",
+    )
+    parser.add_argument('entradas', nargs='+', help="Archivos CSV, patrones glob o directorios.")
+    parser.add_argument('-o', '--salida', default='caracteristicas.csv',
+                        help="Archivo de resultados combinados (.csv, .xlsx, .parquet o .arrow).")
+    parser.add_argument('-j', '--trabajadores', type=int, default=None,
+                        help="Número de procesos (por defecto, uno por núcleo).")
+    parser.add_argument('--chunksize', type=int, default=1,
+                        help="Archivos enviados a cada proceso por tarea.")
+    parser.add_argument('--margen', type=float, default=MARGEN_PICO_DB,
+                        help="Altura mínima de los picos sobre el nivel de ruido, en dB.")
+    parser.add_argument('--piso-local', action='store_true',
+                        help="Usar un piso de ruido deslizante (dependiente de la frecuencia) en lugar de uno global.")
+    parser.add_argument('--ancho-piso', type=int, default=ANCHO_PISO_BINS,
+                        help="Ancho en bins de la ventana del piso de ruido local.")
+    parser.add_argument('--cfar', choices=METODOS_CFAR, default=None,
+                        help="Detectar con un umbral adaptativo CFAR (ca: promedio de celdas, os: estadístico de "
+                             "orden) en lugar del nivel de ruido más el margen.")
+    parser.add_argument('--guarda', type=int, default=GUARDA_CFAR,
+                        help="Celdas de guarda del CFAR a cada lado del bin (más que la mitad del ancho de las señales).")
+    parser.add_argument('--entrenamiento', type=int, default=ENTRENAMIENTO_CFAR,
+                        help="Celdas de entrenamiento del CFAR a cada lado del bin.")
+    parser.add_argument('--pfa', type=float, default=PFA_CFAR, help="Probabilidad de falsa alarma del CFAR.")
+    parser.add_argument('--wavelet', default=None,
+                        help="Eliminar el ruido de los barridos con esta wavelet (p. ej. db4) antes de detectar "
+                             "los picos; requiere PyWavelets.")
+    parser.add_argument('--int16', action='store_true',
+                        help="Guardar en memoria las magnitudes cuantizadas en int16 (pasos de 0,01 dB): la mitad "
+                             "de memoria por captura. En el modo en vivo, los barridos nuevos se analizan igual.")
+    parser.add_argument('--plan-bandas', default=None,
+                        help="Plan de bandas (CSV con ';': nombre;inicio_hz;fin_hz;prioridad) para asignar satélites.")
+    parser.add_argument('--vigilar', action='store_true',
+                        help="Modo en vivo: analiza solo los barridos nuevos a medida que llegan (salida CSV).")
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_S,
+                        help="Segundos entre consultas en el modo en vivo.")
+    parser.add_argument('--seguimiento', default=None,
+                        help="Archivo donde guardar el resumen de las pistas (deriva, potencia, duración) "
+                             "de las señales seguidas entre barridos.")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_HZ,
+                        help="Distancia máxima en Hz para asociar una señal a una pista del barrido anterior.")
+    parser.add_argument('--ocupacion', default=None,
+                        help="Archivo donde guardar la ocupación por bin (porcentaje, máximo, media y desvío) de "
+                             "todos los barridos; el resumen por banda va a <nombre>_bandas.")
+    parser.add_argument('--margen-ocupacion', type=float, default=MARGEN_OCUPACION_DB,
+                        help="DB sobre el nivel de ruido a partir de los cuales un bin se considera ocupado.")
+    parser.add_argument('--umbral-interferencia', type=float, default=UMBRAL_SNR_INTERFERENCIA_DB,
+                        help="SNR en dB por debajo del cual una señal se cuenta como interferencia.")
+    parser.add_argument('--almacen', default=None,
+                        help="Base SQLite de resultados donde agregar las señales (las de un archivo ya guardado "
+                             "se reemplazan), para consultarlas después sin volver a analizar las capturas.")
+    parser.add_argument('--perfil', default=None,
+                        help="Archivo JSON lines donde agregar el tiempo, la CPU y la memoria de cada etapa.")
+    return parser
+
+
+def guardar_pistas(seguidores, ruta_salida):
+    """
+    Guarda en un solo archivo el resumen de las pistas de cada archivo ({ruta: SeguidorSenales}).
+    """
+    import pandas as pd
+
+    tablas = []
+    for ruta, seguidor in seguidores.items():
+        tabla = seguidor.tabla()
+        tabla.insert(0, 'Archivo', ruta)
+        tablas.append(tabla)
+    if tablas:
+        guardar_tabla(pd.concat(tablas, ignore_index=True), ruta_salida)
+        print(f"Pistas guardadas en {ruta_salida}", file=sys.stderr)
+
+
+def guardar_ocupacion(estadisticas, ruta_salida):
+    """
+    Combina las estadísticas de ocupación de cada archivo ({ruta: EstadisticasEspectro})
+    y guarda el mapa por bin y el resumen por banda. Los archivos con otro eje de
+    frecuencias que el primero se informan y se omiten.
+    """
+    combinadas = None
+    for ruta, ocupacion in estadisticas.items():
+        if ocupacion is None:
+            continue
+        try:
+            combinadas = ocupacion if combinadas is None else combinadas.combinar(ocupacion)
+        except ValueError as e:
+            print(f"{ruta}: no se incluye en la ocupación ({e})", file=sys.stderr)
+    if combinadas is None:
+        return
+    raiz, extension = os.path.splitext(ruta_salida)
+    guardar_tabla(combinadas.ocupacion(), ruta_salida)
+    guardar_tabla(combinadas.bandas(), f"{raiz}_bandas{extension}")
+    print(f"Ocupación de {combinadas.n_barridos} barridos guardada en {ruta_salida}", file=sys.stderr)
+
+
+def monitorear(args):
+    almacen = AlmacenResultados(args.almacen) if args.almacen else None
+
+    def al_recibir(tabla):
+        agregar_a_csv(tabla, args.salida)
+        if almacen is not None:
+            almacen.agregar(tabla)
+        barridos = tabla['Índice de barrido']
+        if len(tabla):
+            print(f"{tabla['Archivo'].iloc[0]}: barridos {barridos.min()}-{barridos.max()}, "
+                  f"{len(tabla)} señales", file=sys.stderr)
+
+    monitor = MonitorCapturas(args.entradas, seguimiento=bool(args.seguimiento), tolerancia_hz=args.tolerancia,
+                              estadisticas=bool(args.ocupacion), margen_ocupacion=args.margen_ocupacion,
+                              umbral_interferencia=args.umbral_interferencia,
+                              dtype=np.int16 if args.int16 else np.float32, **args.opciones)
+    print(f"Vigilando {', '.join(args.entradas)} (Ctrl+C para terminar)", file=sys.stderr)
+    try:
+        while True:
+            for tabla in monitor.actualizar():
+                al_recibir(tabla)
+            time.sleep(args.intervalo)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if almacen is not None:
+            almacen.optimizar()
+            almacen.cerrar()
+    if args.seguimiento:
+        guardar_pistas({ruta: archivo.seguidor for ruta, archivo in monitor.monitores.items()}, args.seguimiento)
+    if args.ocupacion:
+        guardar_ocupacion({ruta: archivo.estadisticas for ruta, archivo in monitor.monitores.items()},
+                          args.ocupacion)
+    return 0
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    args.opciones = dict(margen_pico=args.margen, piso_local=args.piso_local, ancho_piso=args.ancho_piso,
+                        wavelet=args.wavelet, plan_bandas=args.plan_bandas,
+                        cfar=ParametrosCFAR(args.guarda, args.entrenamiento, args.pfa, args.cfar) if args.cfar else None)
+    if args.perfil:
+        # La ruta pasa a los procesos del lote por la variable de entorno
+        perfil.activar(args.perfil)
+    if args.vigilar:
+        if not args.salida.lower().endswith('.csv'):
+            parser.error("el modo en vivo solo escribe archivos .csv")
+        return monitorear(args)
+
+    rutas = expandir_rutas(args.entradas)
+    if not rutas:
+        print("No se encontraron archivos para procesar.", file=sys.stderr)
+        return 2
+
+    inicio = time.perf_counter()
+    fallidos = 0
+    # El seguimiento es secuencial por archivo: se hace en este proceso a medida que llegan las tablas
+    seguidores = {}
+    estadisticas = {}
+    # La tabla de cada archivo se escribe apenas llega, sin acumular el resultado combinado
+    escritor = None
+    almacen = AlmacenResultados(args.almacen) if args.almacen else None
+    try:
+        for n, (ruta, tabla, error) in enumerate(
+                iterar_lote(rutas, args.trabajadores, args.chunksize, estadisticas=bool(args.ocupacion),
+                            margen_ocupacion=args.margen_ocupacion, umbral_interferencia=args.umbral_interferencia,
+                            dtype=np.int16 if args.int16 else np.float32, **args.opciones), start=1):
+            if error is None:
+                if args.ocupacion:
+                    tabla, estadisticas[ruta] = tabla
+                if args.seguimiento:
+                    seguidores[ruta] = SeguidorSenales(args.tolerancia)
+                    tabla['Pista'] = seguidores[ruta].procesar_tabla(tabla) + 1
+                if escritor is None:
+                    escritor = abrir_escritor(args.salida)
+                escritor.escribir(tabla)
+                if almacen is not None:
+                    almacen.agregar(tabla, reemplazar=True)
+                print(f"[{n}/{len(rutas)}] {ruta}: {len(tabla)} señales", file=sys.stderr)
+            else:
+                fallidos += 1
+                print(f"[{n}/{len(rutas)}] {ruta}: ERROR {error}", file=sys.stderr)
+    finally:
+        if escritor is not None:
+            escritor.cerrar()
+        if almacen is not None:
+            almacen.optimizar()
+            almacen.cerrar()
+
+    if escritor is not None:
+        print(f"Resultados guardados en {args.salida}", file=sys.stderr)
+    if almacen is not None:
+        print(f"Señales agregadas a {args.almacen}", file=sys.stderr)
+    if args.seguimiento:
+        guardar_pistas(seguidores, args.seguimiento)
+    if args.ocupacion:
+        guardar_ocupacion(estadisticas, args.ocupacion)
+    print(f"{len(rutas) - fallidos} archivos procesados, {fallidos} con error, "
+          f"{time.perf_counter() - inicio:.1f} s", file=sys.stderr)
+    return 1 if fallidos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Base de resultados en disco para consultar señales de análisis anteriores.
+
+Las tablas de características se guardan en una base SQLite (en modo WAL, así
+que se puede consultar mientras otro proceso agrega resultados) con inserciones
+por lotes dentro de una transacción. La base tiene índices por instante del
+barrido, frecuencia central, satélite, SNR y archivo, de modo que una consulta
+como "las señales cerca de 437 MHz con SNR menor que 10 dB del último mes" se
+responde sin volver a leer ni analizar las capturas:
+
+    with AlmacenResultados('resultados.sqlite') as almacen:
+        tabla = almacen.consultar(frecuencia_min=436.9e6, frecuencia_max=437.1e6, snr_max=10,
+                                  desde='2024-09-01', hasta='2024-09-30T23:59:59')
+
+También desde la línea de comandos:
+
+    python -m astroviarfa.almacen resultados.sqlite --frecuencia 437e6 --tolerancia 100e3 --snr-max 10 -o cerca.csv
+"""
+import argparse
+import sqlite3
+import sys
+
+import numpy as np
+
+from . import perfil
+from .tiempos import a_segundos, como_instante, segundos_barridos
+
+# Filas por `executemany` al guardar una tabla
+FILAS_POR_LOTE = 50_000
+
+# Caché de páginas de la conexión, en KiB: con los índices en memoria las inserciones por lotes son más rápidas
+CACHE_KIB = 64 * 1024
+
+# Columna de la tabla de características -> (columna de la base, tipo)
+COLUMNAS_ALMACEN = {
+    'Archivo': ('archivo', 'TEXT'),
+    'Barrido': ('barrido', 'TEXT'),
+    'Índice de barrido': ('indice_barrido', 'INTEGER'),
+    'Instante': ('instante', 'REAL'),
+    'Señal': ('senal', 'INTEGER'),
+    'Frecuencia menor [Hz]': ('frecuencia_menor', 'REAL'),
+    'Frecuencia mayor [Hz]': ('frecuencia_mayor', 'REAL'),
+    'Frecuencia central [Hz]': ('frecuencia_central', 'REAL'),
+    'Ancho de banda (BW) [Hz]': ('ancho_banda', 'REAL'),
+    'Amplitud/ Potencia [dBm]': ('potencia', 'REAL'),
+    'Nivel de ruido [dBm]': ('nivel_ruido', 'REAL'),
+    'Relación señal-ruido (SNR) [dB]': ('snr', 'REAL'),
+    'Potencia de canal [dBm]': ('potencia_canal', 'REAL'),
+    'Satélite': ('satelite', 'TEXT'),
+    'Pista': ('pista', 'INTEGER'),
+}
+
+INDICES = ('instante', 'frecuencia_central', 'satelite', 'snr', 'archivo')
+
+_TABLA = 'senales'
+
+
+def _segundos(valor):
+    # Instante de una consulta como segundos desde 1970 (hora local del analizador, sin zona)
+    return float(a_segundos(como_instante(valor)))
+
+
+class AlmacenResultados:
+    """
+    Base SQLite de tablas de características. Una conexión solo se usa desde el
+    hilo que la abrió; la interfaz abre una en cada tarea de segundo plano.
+    """
+    __slots__ = ('ruta', '_conexion')
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.execute('PRAGMA journal_mode=WAL')
+        # Con WAL, NORMAL no pierde la consistencia de la base ante un corte, solo las últimas transacciones
+        self._conexion.execute('PRAGMA synchronous=NORMAL')
+        self._conexion.execute(f'PRAGMA cache_size=-{CACHE_KIB}')
+        columnas = ', '.join(f"{nombre} {tipo}" for nombre, tipo in COLUMNAS_ALMACEN.values())
+        with self._conexion:
+            self._conexion.execute(f"CREATE TABLE IF NOT EXISTS {_TABLA} (id INTEGER PRIMARY KEY, {columnas})")
+            for columna in INDICES:
+                self._conexion.execute(f"CREATE INDEX IF NOT EXISTS {_TABLA}_{columna} ON {_TABLA} ({columna})")
+
+    def cerrar(self):
+        self._conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+    def __len__(self):
+        return self._conexion.execute(f"SELECT COUNT(*) FROM {_TABLA}").fetchone()[0]
+
+    def agregar(self, tabla, reemplazar=False):
+        """
+        Guarda una tabla de características (la de `analizar_captura`,
+        `procesar_archivo` o la interfaz) y devuelve el número de filas guardadas.
+        Las columnas que falten quedan vacías; el instante se toma del nombre de
+        cada barrido. Con `reemplazar`, antes se borran las filas ya guardadas de
+        los archivos de la tabla, para volver a analizar una captura sin duplicarla.
+        """
+        n_filas = len(tabla)
+        nombres = ', '.join(nombre for nombre, _ in COLUMNAS_ALMACEN.values())
+        marcadores = ', '.join('?' * len(COLUMNAS_ALMACEN))
+        consulta = f"INSERT INTO {_TABLA} ({nombres}) VALUES ({marcadores})"
+
+        # Todos los lotes van en una sola transacción; solo un lote a la vez se convierte a objetos de Python
+        with perfil.etapa('almacen_agregar', filas=n_filas), self._conexion:
+            if reemplazar and 'Archivo' in tabla:
+                self._conexion.executemany(f"DELETE FROM {_TABLA} WHERE archivo = ?",
+                                           [(archivo,) for archivo in tabla['Archivo'].unique()])
+            for inicio in range(0, n_filas, FILAS_POR_LOTE):
+                self._conexion.executemany(consulta, zip(*self._valores(tabla.iloc[inicio:inicio + FILAS_POR_LOTE])))
+        return n_filas
+
+    @staticmethod
+    def _valores(bloque):
+        # Una lista por columna de la base, con None en lugar de NaN
+        valores = []
+        for columna in COLUMNAS_ALMACEN:
+            if columna == 'Instante':
+                valores.append(segundos_barridos(bloque['Barrido'].to_numpy()).tolist() if 'Barrido' in bloque
+                               else [None] * len(bloque))
+            elif columna in bloque:
+                serie = bloque[columna]
+                valores.append(serie.astype(object).where(serie.notna(), None).tolist())
+            else:
+                valores.append([None] * len(bloque))
+        return valores
+
+    def optimizar(self):
+        """
+        Actualiza las estadísticas de los índices (ANALYZE) para que SQLite elija el
+        índice más selectivo de cada consulta; p. ej. el del instante y no el del
+        satélite al filtrar por los dos. Conviene después de guardar muchas filas.
+        """
+        with perfil.etapa('almacen_optimizar'):
+            self._conexion.execute('ANALYZE')
+
+    def eliminar_archivo(self, archivo):
+        with self._conexion:
+            return self._conexion.execute(f"DELETE FROM {_TABLA} WHERE archivo = ?", (archivo,)).rowcount
+
+    def archivos(self):
+        return [fila[0] for fila in self._conexion.execute(f"SELECT DISTINCT archivo FROM {_TABLA} ORDER BY archivo")]
+
+    @staticmethod
+    def _condiciones(frecuencia_min=None, frecuencia_max=None, desde=None, hasta=None, satelite=None,
+                     snr_min=None, snr_max=None, archivo=None):
+        filtros = [
+            ('frecuencia_central >= ?', frecuencia_min),
+            ('frecuencia_central <= ?', frecuencia_max),
+            ('instante >= ?', None if desde is None else _segundos(desde)),
+            ('instante <= ?', None if hasta is None else _segundos(hasta)),
+            ('satelite = ?', satelite),
+            ('snr >= ?', snr_min),
+            ('snr <= ?', snr_max),
+            ('archivo = ?', archivo),
+        ]
+        condiciones = [condicion for condicion, valor in filtros if valor is not None]
+        parametros = [float(valor) if isinstance(valor, np.floating) else valor
+                      for _, valor in filtros if valor is not None]
+        return (' WHERE ' + ' AND '.join(condiciones) if condiciones else ''), parametros
+
+    def contar(self, **filtros):
+        """
+        Número de señales que cumplen los filtros (los mismos que `consultar`).
+        """
+        donde, parametros = self._condiciones(**filtros)
+        return self._conexion.execute(f"SELECT COUNT(*) FROM {_TABLA}{donde}", parametros).fetchone()[0]
+
+    def consultar(self, frecuencia_min=None, frecuencia_max=None, desde=None, hasta=None, satelite=None,
+                  snr_min=None, snr_max=None, archivo=None, limite=None):
+        """
+        Señales guardadas que cumplen todos los filtros indicados, como una tabla con
+        las columnas de la tabla de características y 'Instante' (datetime), ordenada
+        por instante (primero las que no tienen) y frecuencia central. Las frecuencias van en Hz y el SNR en dB;
+        `desde` y `hasta` (incluidos) aceptan nombres de barrido, texto ISO o datetime.
+        Con `limite` se devuelven como mucho esas filas, las primeras en ese orden.
+        """
+        import pandas as pd
+
+        donde, parametros = self._condiciones(frecuencia_min, frecuencia_max, desde, hasta, satelite, snr_min,
+                                              snr_max, archivo)
+        nombres = ', '.join(nombre for nombre, _ in COLUMNAS_ALMACEN.values())
+        # A igual instante y frecuencia, el orden de inserción
+        consulta = f"SELECT {nombres} FROM {_TABLA}{donde} ORDER BY instante, frecuencia_central, id"
+        if limite is not None:
+            consulta += ' LIMIT ?'
+            parametros.append(int(limite))
+        with perfil.etapa('almacen_consultar') as medicion:
+            filas = self._conexion.execute(consulta, parametros).fetchall()
+            tabla = pd.DataFrame.from_records(filas, columns=list(COLUMNAS_ALMACEN))
+            tabla['Instante'] = pd.to_datetime(tabla['Instante'].astype(np.float64), unit='s')
+            # Enteros con huecos (p. ej. 'Pista' de archivos sin seguimiento) sin pasar a float
+            for columna, (_, tipo) in COLUMNAS_ALMACEN.items():
+                if tipo == 'INTEGER':
+                    tabla[columna] = tabla[columna].astype('Int64')
+            medicion.salida(filas=len(tabla))
+        return tabla
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='astroviarfa.almacen',
+        description="Consulta las señales guardadas en una base de resultados (ver --almacen en astroviarfa).",
+    )
+    parser.add_argument('base', help="Archivo SQLite de resultados.")
+    parser.add_argument('--frecuencia', type=float, default=None, help="Frecuencia central buscada, en Hz.")
+    parser.add_argument('--tolerancia', type=float, default=100e3,
+                        help="Distancia máxima a --frecuencia, en Hz (100 kHz por defecto).")
+    parser.add_argument('--satelite', default=None, help="Satélite asignado a la señal.")
+    parser.add_argument('--snr-min', type=float, default=None, help="SNR mínimo, en dB.")
+    parser.add_argument('--snr-max', type=float, default=None, help="SNR máximo, en dB.")
+    parser.add_argument('--desde', default=None, help="Instante inicial (p. ej. 2024-09-01 o un nombre de barrido).")
+    parser.add_argument('--hasta', default=None, help="Instante final, incluido.")
+    parser.add_argument('--archivo', default=None, help="Captura de origen.")
+    parser.add_argument('--limite', type=int, default=None, help="Número máximo de señales.")
+    parser.add_argument('-o', '--salida', default=None,
+                        help="Archivo de salida (.csv, .xlsx, .parquet, ...); sin él solo se cuentan las señales.")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    filtros = dict(satelite=args.satelite, snr_min=args.snr_min, snr_max=args.snr_max, desde=args.desde,
+                   hasta=args.hasta, archivo=args.archivo)
+    if args.frecuencia is not None:
+        filtros.update(frecuencia_min=args.frecuencia - args.tolerancia,
+                       frecuencia_max=args.frecuencia + args.tolerancia)
+    with AlmacenResultados(args.base) as almacen:
+        if args.salida is None:
+            print(almacen.contar(**filtros))
+            return 0
+        tabla = almacen.consultar(limite=args.limite, **filtros)
+    from .lote import guardar_tabla
+
+    guardar_tabla(tabla, args.salida)
+    print(f"{len(tabla)} señales guardadas en {args.salida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
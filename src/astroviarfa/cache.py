@@ -0,0 +1,180 @@
+"""
+Caché persistente de capturas ya convertidas.
+
+Cada entrada es un directorio con el eje de frecuencias y la matriz de magnitudes
+en formato .npy (se reabren con memory-mapping, sin copiar) y un JSON con los
+nombres de los barridos, sus metadatos y las secciones df1/df2. La clave sale de
+la ruta + tamaño + fecha de modificación del archivo, o de un hash de su contenido.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from . import perfil
+from .lector import DESPLAZAMIENTO_CUANTIZACION_DBM, CapturaCSV, leer_csv_especial
+from .tiempos import IndiceBarridos
+
+# Cambiar al modificar el formato de las entradas para invalidar las anteriores
+VERSION_CACHE = 1
+
+# Tamaño máximo del caché en disco antes de eliminar las entradas menos usadas
+LIMITE_BYTES = 2 * 1024 ** 3
+
+BYTES_POR_LECTURA = 1024 ** 2
+
+_ARCHIVO_META = 'meta.json'
+_ARCHIVO_FRECUENCIAS = 'frecuencias.npy'
+_ARCHIVO_MAGNITUDES = 'magnitudes.npy'
+
+
+def directorio_cache():
+    """
+    Directorio del caché: $ASTROVIARFA_CACHE o, por defecto, una carpeta
+    'astroviarfa' en el caché del usuario.
+    """
+    if os.environ.get('ASTROVIARFA_CACHE'):
+        return os.environ['ASTROVIARFA_CACHE']
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'astroviarfa')
+
+
+def clave_captura(ruta_archivo, por_contenido=False, dtype=np.float32):
+    """
+    Clave de caché del archivo. Por defecto usa ruta + tamaño + fecha de modificación;
+    con `por_contenido` lee el archivo y usa un hash de su contenido, que sigue siendo
+    válido si el archivo se copia o se mueve. Cada tipo de la matriz (`dtype`) tiene
+    su propia entrada.
+    """
+    estado = os.stat(ruta_archivo)
+    resumen = hashlib.blake2b(f"v{VERSION_CACHE}|{estado.st_size}|".encode(), digest_size=16)
+    if np.dtype(dtype) != np.float32:
+        resumen.update(f"{np.dtype(dtype).name}|".encode())
+    if por_contenido:
+        with open(ruta_archivo, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(BYTES_POR_LECTURA), b''):
+                resumen.update(bloque)
+    else:
+        resumen.update(f"{os.path.abspath(ruta_archivo)}|{estado.st_mtime_ns}".encode())
+    return resumen.hexdigest()
+
+
+def _tabla_a_json(tabla):
+    return json.loads(tabla.to_json(orient='split', index=False))
+
+
+def _tabla_desde_json(datos):
+    import pandas as pd
+
+    return pd.DataFrame(datos['data'], columns=datos['columns'])
+
+
+def guardar_en_cache(clave, captura, directorio=None, limite_bytes=LIMITE_BYTES):
+    """
+    Guarda la captura bajo `clave`. La entrada se escribe en un directorio temporal
+    y se renombra al final, para que un lector nunca vea una entrada a medias.
+    """
+    directorio = directorio or directorio_cache()
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, clave)
+    temporal = tempfile.mkdtemp(prefix=f".{clave}-", dir=directorio)
+    try:
+        np.save(os.path.join(temporal, _ARCHIVO_FRECUENCIAS), np.ascontiguousarray(captura.frecuencias))
+        np.save(os.path.join(temporal, _ARCHIVO_MAGNITUDES), np.ascontiguousarray(captura.datos))
+        meta = {
+            'version': VERSION_CACHE,
+            'df1': _tabla_a_json(captura.df1),
+            'df2': _tabla_a_json(captura.df2),
+            'columnas': captura.columnas,
+            'metadatos': captura.metadatos,
+            'paso': captura.paso,
+            'desplazamiento': captura.desplazamiento,
+        }
+        with open(os.path.join(temporal, _ARCHIVO_META), 'w', encoding='utf-8') as archivo:
+            json.dump(meta, archivo, ensure_ascii=False)
+        # Una entrada previa con el mismo nombre está desactualizada o dañada
+        shutil.rmtree(destino, ignore_errors=True)
+        os.replace(temporal, destino)
+    except OSError:
+        # Otra instancia reemplazó la entrada al mismo tiempo (o el disco no lo permite): no es un error
+        shutil.rmtree(temporal, ignore_errors=True)
+    recortar_cache(directorio, limite_bytes)
+
+
+def cargar_de_cache(clave, directorio=None):
+    """
+    Devuelve la captura guardada bajo `clave`, con los arreglos abiertos con
+    memory-mapping de solo lectura, o None si no está en el caché.
+    """
+    entrada = os.path.join(directorio or directorio_cache(), clave)
+    ruta_meta = os.path.join(entrada, _ARCHIVO_META)
+    try:
+        with open(ruta_meta, encoding='utf-8') as archivo:
+            meta = json.load(archivo)
+        frecuencias = np.load(os.path.join(entrada, _ARCHIVO_FRECUENCIAS), mmap_mode='r')
+        magnitudes = np.load(os.path.join(entrada, _ARCHIVO_MAGNITUDES), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != VERSION_CACHE:
+        return None
+
+    # La fecha de modificación del JSON marca el último uso para el orden LRU
+    try:
+        os.utime(ruta_meta)
+    except OSError:
+        pass
+    # Las entradas sin 'paso' son de antes de la cuantización: matriz float32
+    return CapturaCSV(_tabla_desde_json(meta['df1']), _tabla_desde_json(meta['df2']),
+                      meta['columnas'], meta['metadatos'], frecuencias, magnitudes,
+                      IndiceBarridos(meta['columnas'][1:]), meta.get('paso'),
+                      meta.get('desplazamiento', DESPLAZAMIENTO_CUANTIZACION_DBM))
+
+
+def recortar_cache(directorio=None, limite_bytes=LIMITE_BYTES):
+    """
+    Elimina las entradas usadas hace más tiempo hasta que el caché ocupe como
+    máximo `limite_bytes`.
+    """
+    directorio = directorio or directorio_cache()
+    entradas = []
+    total = 0
+    for nombre in os.listdir(directorio):
+        entrada = os.path.join(directorio, nombre)
+        if nombre.startswith('.') or not os.path.isdir(entrada):
+            continue
+        try:
+            tamaño = sum(os.path.getsize(os.path.join(entrada, archivo)) for archivo in os.listdir(entrada))
+            ultimo_uso = os.path.getmtime(os.path.join(entrada, _ARCHIVO_META))
+        except OSError:
+            continue
+        entradas.append((ultimo_uso, tamaño, entrada))
+        total += tamaño
+
+    for ultimo_uso, tamaño, entrada in sorted(entradas):
+        if total <= limite_bytes:
+            break
+        try:
+            shutil.rmtree(entrada)
+        except OSError:
+            # Entrada abierta por otro proceso (p. ej. memory-mapping en Windows)
+            continue
+        total -= tamaño
+
+
+def leer_csv_con_cache(ruta_archivo, directorio=None, por_contenido=False, limite_bytes=LIMITE_BYTES,
+                       progreso=None, dtype=np.float32):
+    """
+    Igual que `leer_csv_especial`, pero consulta primero el caché y guarda en él
+    las capturas que no estaban. `progreso` solo se llama si hay que leer el CSV.
+    """
+    clave = clave_captura(ruta_archivo, por_contenido, dtype)
+    with perfil.etapa('cargar_de_cache') as medicion:
+        captura = cargar_de_cache(clave, directorio)
+        medicion.salida(acierto=captura is not None)
+    if captura is None:
+        captura = leer_csv_especial(ruta_archivo, dtype, progreso)
+        guardar_en_cache(clave, captura, directorio, limite_bytes)
+    return captura
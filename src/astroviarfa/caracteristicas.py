@@ -0,0 +1,130 @@
+"""
+Extracción de las características de las señales detectadas, para un barrido o
+para todos los barridos de una matriz (barridos x bins) a la vez.
+"""
+import numpy as np
+
+from .deteccion import dBm_to_mW
+
+COLUMNAS_CARACTERISTICAS = [
+    'Señal',
+    'Frecuencia menor [Hz]',
+    'Frecuencia mayor [Hz]',
+    'Frecuencia central [Hz]',
+    'Ancho de banda (BW) [Hz]',
+    'Amplitud/ Potencia [dBm]',
+    'Nivel de ruido [dBm]',
+    'Relación señal-ruido (SNR) [dB]',
+    'Potencia de canal [dBm]',
+]
+
+# Caída desde el pico que define los bordes de la señal, en dB
+CAIDA_BORDES_DB = 3
+
+# Ancho inicial de la ventana de búsqueda de los bordes; se duplica en cada ronda
+VENTANA_INICIAL = 16
+
+
+def _buscar_cruces(plano, inicios, umbrales, minimos, maximos, paso):
+    """
+    Para cada pico, primer índice desde `inicios` en la dirección `paso` (+1 o -1)
+    cuya magnitud no supera su umbral, acotado a [minimos, maximos].
+
+    Equivale a recorrer bin a bin, pero todos los picos avanzan juntos con ventanas
+    que se duplican en cada ronda, de modo que el trabajo es proporcional al ancho
+    de las señales y no al número de bins.
+    """
+    cruces = np.empty(len(inicios), dtype=np.intp)
+    pendientes = np.arange(len(inicios))
+    desplazamiento = 0
+    ancho = VENTANA_INICIAL
+    while pendientes.size:
+        posiciones = inicios[pendientes, None] + paso * (desplazamiento + np.arange(ancho))
+        fuera = (posiciones < minimos[pendientes, None]) | (posiciones > maximos[pendientes, None])
+        posiciones = np.clip(posiciones, minimos[pendientes, None], maximos[pendientes, None])
+        cruza = fuera | (plano[posiciones] <= umbrales[pendientes, None])
+
+        encontrados = np.flatnonzero(cruza.any(axis=1))
+        primeros = cruza[encontrados].argmax(axis=1)
+        cruces[pendientes[encontrados]] = posiciones[encontrados, primeros]
+
+        pendientes = np.delete(pendientes, encontrados)
+        desplazamiento += ancho
+        ancho *= 2
+    return cruces
+
+
+def extraer_caracteristicas(frecuencias, magnitudes, indices_picos, noise_level, filas=None):
+    """
+    Calcula las características de cada pico y las devuelve como un diccionario
+    de columnas (un arreglo por columna de COLUMNAS_CARACTERISTICAS).
+
+    `magnitudes` puede ser un barrido o una matriz barridos x bins; en ese caso
+    `filas` indica el barrido de cada pico (ordenados por fila) y `noise_level`
+    trae un nivel por barrido. `noise_level` también puede ser un piso local por
+    bin (misma forma que `magnitudes`), y entonces cada señal toma el piso del bin
+    de su pico. Los bordes a -3 dB se buscan con operaciones de
+    arreglos y la potencia de canal sale de una única suma acumulada de la potencia
+    lineal (compensada), con el eje de frecuencias en orden creciente. El resultado
+    coincide con el recorrido bin a bin salvo el último dígito de la potencia de canal.
+    """
+    frecuencias = np.asarray(frecuencias, dtype=np.float64)
+    matriz = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+    n_bins = matriz.shape[1]
+    indices_picos = np.asarray(indices_picos, dtype=np.intp)
+    filas = np.zeros(len(indices_picos), dtype=np.intp) if filas is None else np.asarray(filas, dtype=np.intp)
+    niveles = np.asarray(noise_level, dtype=np.float64)
+    if niveles.ndim and niveles.size == matriz.size and n_bins > 1:
+        # Piso de ruido local: el nivel de cada señal es el del bin de su pico
+        niveles = niveles.reshape(matriz.shape)[filas, indices_picos]
+    elif niveles.ndim:
+        niveles = niveles[filas]
+    else:
+        niveles = np.full(len(filas), niveles)
+
+    # Posiciones en la matriz aplanada, sin salir del barrido de cada pico
+    plano = matriz.reshape(-1)
+    inicios = filas * n_bins + indices_picos
+    primeros = filas * n_bins
+    ultimos = primeros + n_bins - 1
+
+    mag_peak = plano[inicios]
+    threshold = mag_peak - CAIDA_BORDES_DB
+    idx_left = _buscar_cruces(plano, inicios, threshold, primeros, ultimos, -1) - primeros
+    idx_right = _buscar_cruces(plano, inicios, threshold, primeros, ultimos, 1) - primeros
+    frec_lower = frecuencias[idx_left]
+    frec_upper = frecuencias[idx_right]
+
+    # Potencia de canal: suma de la potencia lineal en [frec_lower, frec_upper]
+    # como diferencia de la suma acumulada de cada barrido
+    potencia = dBm_to_mW(matriz)
+    acumulada = np.zeros((matriz.shape[0], n_bins + 1), dtype=np.float64)
+    np.cumsum(potencia, axis=1, out=acumulada[:, 1:])
+
+    # Error exacto de redondeo de cada suma parcial (TwoSum), acumulado aparte para
+    # que una banda débil después de portadoras fuertes no pierda precisión al restar
+    previa = acumulada[:, :-1]
+    sumando = acumulada[:, 1:] - previa
+    error = (previa - (acumulada[:, 1:] - sumando)) + (potencia - sumando)
+    correccion = np.zeros_like(acumulada)
+    np.cumsum(error, axis=1, out=correccion[:, 1:])
+
+    desde = np.searchsorted(frecuencias, frec_lower, side='left')
+    hasta = np.searchsorted(frecuencias, frec_upper, side='right')
+    total_power_mW = ((acumulada[filas, hasta] - acumulada[filas, desde])
+                      + (correccion[filas, hasta] - correccion[filas, desde]))
+
+    # Numeración de las señales dentro de cada barrido
+    señal = np.arange(len(filas)) - np.searchsorted(filas, filas, side='left') + 1
+
+    return {
+        'Señal': señal.astype(np.int64),
+        'Frecuencia menor [Hz]': frec_lower,
+        'Frecuencia mayor [Hz]': frec_upper,
+        'Frecuencia central [Hz]': (frec_upper + frec_lower) / 2,
+        'Ancho de banda (BW) [Hz]': frec_upper - frec_lower,
+        'Amplitud/ Potencia [dBm]': mag_peak,
+        'Nivel de ruido [dBm]': niveles,
+        'Relación señal-ruido (SNR) [dB]': mag_peak - niveles,
+        'Potencia de canal [dBm]': 10 * np.log10(total_power_mW),
+    }
@@ -0,0 +1,235 @@
+"""
+Estimación del nivel de ruido y detección de picos, para un barrido o para la
+matriz completa de barridos (barridos x bins).
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+# Percentil por debajo del cual se consideran muestras de ruido
+PERCENTIL_RUIDO = 20
+
+# Ancho por defecto, en bins, de la ventana del piso de ruido local
+ANCHO_PISO_BINS = 1001
+
+# Altura mínima de los picos por encima del nivel de ruido, en dB
+MARGEN_PICO_DB = 60
+
+# Detector CFAR: celdas de guarda y de entrenamiento a cada lado del bin y probabilidad de falsa alarma
+GUARDA_CFAR = 8
+ENTRENAMIENTO_CFAR = 64
+PFA_CFAR = 1e-6
+
+# 'ca': promedio de las celdas de entrenamiento; 'os': estadístico de orden (más robusto junto a otras señales)
+METODOS_CFAR = ('ca', 'os')
+
+# Posición del estadístico de orden del OS-CFAR, como fracción de las celdas de entrenamiento
+FRACCION_ORDEN_OS = 0.75
+
+ParametrosCFAR = namedtuple('ParametrosCFAR', ['guarda', 'entrenamiento', 'pfa', 'metodo'],
+                            defaults=[GUARDA_CFAR, ENTRENAMIENTO_CFAR, PFA_CFAR, 'ca'])
+
+
+def dBm_to_mW(dBm):
+    return 10 ** (dBm / 10)
+
+
+def _percentil_lineal(menor, mayor, n, percentil):
+    # Interpolación lineal entre los estadísticos de orden k y k + 1, con la misma
+    # aritmética que np.percentile (método 'linear') para obtener exactamente el mismo umbral
+    gamma = (n - 1) * (percentil / 100) % 1
+    diferencia = mayor - menor
+    return np.where(gamma >= 0.5, mayor - diferencia * (1 - gamma), menor + diferencia * gamma)
+
+
+def estimar_nivel_ruido(magnitudes, percentil=PERCENTIL_RUIDO):
+    """
+    Estima el nivel de ruido como la mediana de las magnitudes por debajo del
+    percentil indicado. Con una matriz devuelve un nivel por barrido (fila).
+
+    Usa selección parcial (np.partition) en lugar de ordenar: una partición de la
+    fila completa da el percentil, y la mediana sale de una segunda partición
+    limitada a la fracción inferior, sin máscaras ni copias intermedias.
+    """
+    matriz = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+    n = matriz.shape[-1]
+    k = int((n - 1) * (percentil / 100))
+    siguiente = min(k + 1, n - 1)
+
+    particion = np.partition(matriz, [k, siguiente], axis=-1)
+    limite = _percentil_lineal(particion[:, k], particion[:, siguiente], n, percentil)
+
+    # Normalmente quedan exactamente k + 1 valores por debajo del percentil: su mediana
+    # es la de los primeros k + 1 elementos de la partición
+    inferiores = particion[:, :k + 1]
+    medio_bajo, medio_alto = k // 2, (k + 1) // 2
+    inferiores.partition([medio_bajo, medio_alto], axis=-1)
+    nivel = (inferiores[:, medio_bajo] + inferiores[:, medio_alto]) / 2
+
+    # Si el estadístico k + 1 es igual al umbral (valores repetidos) entran más
+    # muestras, todas iguales al umbral; solo en esas filas hace falta contarlas
+    empates = np.flatnonzero(particion[:, siguiente] <= limite) if siguiente > k else np.empty(0, dtype=int)
+    if empates.size:
+        m = np.count_nonzero(particion[empates] <= limite[empates, None], axis=-1)
+        ordenados = np.sort(inferiores[empates], axis=-1)
+        posiciones = np.stack([(m - 1) // 2, m // 2], axis=-1)
+        valores = np.take_along_axis(ordenados, np.minimum(posiciones, k), axis=-1)
+        valores = np.where(posiciones > k, limite[empates, None], valores)
+        nivel[empates] = (valores[:, 0] + valores[:, 1]) / 2
+
+    return nivel[0] if np.ndim(magnitudes) == 1 else nivel
+
+
+def ancho_piso(ancho_bins, n_bins):
+    """
+    Ancho efectivo de la ventana del piso local para barridos de `n_bins` bins:
+    `ancho_bins` acotado al barrido e impar, para que la ventana quede centrada.
+    """
+    return max(1, min(int(ancho_bins), n_bins)) | 1
+
+
+def estimar_piso_local(magnitudes, ancho_bins=ANCHO_PISO_BINS, percentil=PERCENTIL_RUIDO, vecinos=None):
+    """
+    Piso de ruido dependiente de la frecuencia: para cada bin, el nivel de ruido de
+    una ventana deslizante de `ancho_bins` bins centrada en él. Devuelve un arreglo
+    con la misma forma que `magnitudes`.
+
+    La mediana de las muestras bajo el percentil p es el percentil p / 2 de la
+    ventana, que se calcula con el filtro de rango 1-D de SciPy (O(n log W) por
+    barrido). Todos los barridos se rellenan por los extremos y se concatenan
+    para filtrarlos con una sola llamada.
+
+    Para un tramo de bins de barridos más largos, `vecinos` = (izquierda, derecha)
+    son los `ancho // 2` bins que lo rodean a cada lado (ya rellenados si el tramo
+    toca un extremo), con `ancho_bins` ya ajustado al barrido completo (`ancho_piso`):
+    el resultado es el mismo que en esos bins del barrido completo.
+    """
+    matriz = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+    n_barridos, n_bins = matriz.shape
+    if vecinos is None:
+        ancho = ancho_piso(ancho_bins, n_bins)
+        relleno = np.pad(matriz, ((0, 0), (ancho // 2, ancho // 2)), mode='symmetric')
+    else:
+        ancho = int(ancho_bins)
+        relleno = np.concatenate([np.atleast_2d(vecinos[0]), matriz, np.atleast_2d(vecinos[1])], axis=1)
+    mitad = ancho // 2
+
+    # scipy.ndimage tarda en importarse y solo lo usan el piso local y el OS-CFAR
+    from scipy.ndimage import percentile_filter
+
+    piso = percentile_filter(relleno.reshape(-1), percentil / 2, size=ancho, mode='nearest')
+    piso = piso.reshape(n_barridos, -1)[:, mitad:mitad + n_bins]
+    return piso[0] if np.ndim(magnitudes) == 1 else piso
+
+
+def detectar_picos(magnitudes, altura):
+    """
+    Detecta los máximos locales de todos los barridos a la vez, con la misma regla
+    que `scipy.signal.find_peaks` (los picos planos se ubican en el centro de la meseta
+    y los extremos nunca son picos), conservando los que alcanzan `altura`.
+
+    `altura` puede ser un escalar, un valor por barrido o un valor por bin (misma
+    forma que `magnitudes`, p. ej. a partir de `estimar_piso_local`). Devuelve dos
+    arreglos (fila, índice del pico) ordenados por fila y luego por índice.
+    """
+    matriz = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+    altura = np.asarray(altura, dtype=np.float64)
+    por_bin = altura.ndim > 0 and altura.size == matriz.size and matriz.shape[1] > 1
+
+    # Solo importan los cambios de pendiente: una subida seguida directamente de
+    # una bajada (ignorando los tramos planos) delimita un pico o una meseta.
+    pendiente = np.sign(np.diff(matriz, axis=1))
+    filas, posiciones = np.nonzero(pendiente)
+    signos = pendiente[filas, posiciones]
+    es_pico = (signos[:-1] > 0) & (signos[1:] < 0) & (filas[:-1] == filas[1:])
+    k = np.flatnonzero(es_pico)
+
+    filas_picos = filas[k]
+    indices_picos = (posiciones[k] + 1 + posiciones[k + 1]) // 2
+
+    if por_bin:
+        umbrales = altura.reshape(matriz.shape)[filas_picos, indices_picos]
+    else:
+        umbrales = np.broadcast_to(altura.reshape(-1), (matriz.shape[0],))[filas_picos]
+    validos = matriz[filas_picos, indices_picos] >= umbrales
+    return filas_picos[validos], indices_picos[validos]
+
+
+@lru_cache(maxsize=64)
+def factor_cfar(n_celdas, pfa, metodo='ca', orden=None):
+    """
+    Factor (lineal) sobre la estimación de ruido que da la probabilidad de falsa
+    alarma `pfa` con `n_celdas` celdas de entrenamiento, para ruido de potencia
+    exponencial. En el OS-CFAR `orden` es la posición (1..n) del estadístico usado.
+    """
+    if metodo == 'ca':
+        return n_celdas * (pfa ** (-1 / n_celdas) - 1)
+    # OS-CFAR: Pfa = prod_{i<k} (n - i) / (n - i + T); se despeja T por bisección en escala logarítmica
+    i = np.arange(orden)
+    objetivo = np.log(pfa)
+    bajo, alto = 0.0, 1.0
+    while np.sum(np.log((n_celdas - i) / (n_celdas - i + alto))) > objetivo:
+        alto *= 2
+    for _ in range(100):
+        medio = (bajo + alto) / 2
+        if np.sum(np.log((n_celdas - i) / (n_celdas - i + medio))) > objetivo:
+            bajo = medio
+        else:
+            alto = medio
+    return alto
+
+
+def umbral_cfar(magnitudes, guarda=GUARDA_CFAR, entrenamiento=ENTRENAMIENTO_CFAR, pfa=PFA_CFAR, metodo='ca'):
+    """
+    Umbral adaptativo CFAR de cada bin, para un barrido o para todos los barridos de
+    una matriz a la vez. El ruido de cada bin se estima con las `entrenamiento`
+    celdas a cada lado, saltando las `guarda` celdas vecinas (donde cae la propia
+    señal), y se multiplica por el factor que da la probabilidad de falsa alarma `pfa`.
+
+    - 'ca': promedio de la potencia lineal de las celdas, con sumas acumuladas
+      (tiempo lineal en el número de bins, sin depender del tamaño de la ventana).
+    - 'os': el estadístico de orden FRACCION_ORDEN_OS de las celdas (filtro de rango);
+      no lo desplazan las señales vecinas, a cambio de un costo proporcional a la ventana.
+
+    Los extremos se rellenan por simetría. Devuelve (umbral, ruido) en dBm, con la
+    forma de `magnitudes`; el ruido sirve como nivel de ruido por bin para el SNR.
+    """
+    if metodo not in METODOS_CFAR:
+        raise ValueError(f"Método CFAR desconocido: {metodo!r} (opciones: {', '.join(METODOS_CFAR)})")
+    matriz = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+    n_bins = matriz.shape[1]
+    guarda, entrenamiento = int(guarda), max(int(entrenamiento), 1)
+    n_celdas = 2 * entrenamiento
+    borde = guarda + entrenamiento
+
+    if metodo == 'ca':
+        relleno = np.pad(dBm_to_mW(matriz), ((0, 0), (borde, borde)), mode='symmetric')
+        acumulada = np.zeros((len(matriz), relleno.shape[1] + 1))
+        np.cumsum(relleno, axis=1, out=acumulada[:, 1:])
+        def suma_celdas(desde):
+            # Suma de las celdas [i + desde, i + desde + entrenamiento) del relleno para cada bin i
+            return (acumulada[:, desde + entrenamiento:desde + entrenamiento + n_bins]
+                    - acumulada[:, desde:desde + n_bins])
+
+        # El bin i está en i + borde dentro del relleno: celdas a su izquierda y a su derecha, sin las de guarda
+        promedio = (suma_celdas(0) + suma_celdas(borde + guarda + 1)) / n_celdas
+        # Celdas sin potencia: se acota al menor valor representable en lugar de -inf
+        ruido = 10 * np.log10(np.maximum(promedio, np.finfo(np.float64).tiny))
+        factor = factor_cfar(n_celdas, pfa, 'ca')
+    else:
+        orden = max(1, min(n_celdas, int(round(FRACCION_ORDEN_OS * n_celdas))))
+        ventana = np.ones((1, 2 * borde + 1), dtype=bool)
+        ventana[0, entrenamiento:entrenamiento + 2 * guarda + 1] = False
+        # El orden de las celdas no cambia al pasar a dB: se filtra directamente en dBm. La ventana
+        # es 2-D a propósito: con una 1-D, SciPy usa un camino rápido que no respeta los huecos
+        # de la guarda en los rangos intermedios
+        from scipy.ndimage import rank_filter
+
+        ruido = rank_filter(matriz, orden - 1, footprint=ventana, mode='reflect')
+        factor = factor_cfar(n_celdas, pfa, 'os', orden)
+
+    umbral = ruido + 10 * np.log10(factor)
+    if np.ndim(magnitudes) == 1:
+        return umbral[0], ruido[0]
+    return umbral, ruido
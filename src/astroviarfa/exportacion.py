@@ -0,0 +1,208 @@
+"""
+Exportación por bloques de las tablas de características.
+
+Cada escritor recibe la tabla en bloques de filas y los escribe a medida que
+llegan, así que la memoria no depende del número total de filas:
+
+- .xlsx: xlsxwriter en modo `constant_memory` (cada fila se vuelca al disco al
+  pasar a la siguiente); al llegar al límite de filas de Excel se continúa en
+  una hoja nueva con los mismos encabezados.
+- .parquet: un row group de Parquet por bloque (pyarrow).
+- .arrow / .feather: formato IPC de Arrow, un record batch por bloque (pyarrow).
+- cualquier otra extensión: CSV con ';' y coma decimal como los archivos del analizador.
+"""
+import os
+
+from . import perfil
+
+# Filas por bloque al exportar una tabla que ya está en memoria
+FILAS_POR_BLOQUE = 100_000
+
+# Filas por hoja de Excel, incluida la de encabezados
+MAX_FILAS_EXCEL = 1_048_576
+
+NOMBRE_HOJA = 'Hoja'
+
+# Formato de las celdas de fecha y hora en Excel (sin él se verían como números de serie)
+FORMATO_FECHA_EXCEL = 'yyyy-mm-dd hh:mm:ss'
+
+
+class EscritorCSV:
+    __slots__ = ('ruta', '_archivo', '_con_encabezado')
+
+    def __init__(self, ruta_salida):
+        self.ruta = ruta_salida
+        self._archivo = open(ruta_salida, 'w', encoding='utf-8', newline='')
+        self._con_encabezado = False
+
+    def escribir(self, bloque):
+        bloque.to_csv(self._archivo, sep=';', decimal=',', index=False, header=not self._con_encabezado)
+        self._con_encabezado = True
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+
+class EscritorArrow:
+    """
+    Parquet (un row group por bloque) o Arrow IPC (un record batch por bloque).
+    El esquema se toma del primer bloque y los siguientes se convierten a él.
+    """
+    __slots__ = ('ruta', 'formato', '_esquema', '_escritor', '_vacio')
+
+    def __init__(self, ruta_salida, formato='parquet'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Para exportar a Parquet o Arrow se necesita pyarrow (pip install pyarrow).") from None
+        self.ruta = ruta_salida
+        self.formato = formato
+        self._esquema = None
+        self._escritor = None
+        self._vacio = None
+
+    def escribir(self, bloque):
+        import pyarrow as pa
+
+        # Un bloque vacío no define bien el esquema (columnas de texto sin valores)
+        if not len(bloque) and self._escritor is None:
+            self._vacio = bloque
+            return
+        tabla = pa.Table.from_pandas(bloque, schema=self._esquema, preserve_index=False)
+        if self._escritor is None:
+            self._abrir(tabla.schema)
+        self._escritor.write_table(tabla)
+
+    def _abrir(self, esquema):
+        import pyarrow as pa
+
+        self._esquema = esquema
+        if self.formato == 'parquet':
+            import pyarrow.parquet as pq
+            self._escritor = pq.ParquetWriter(self.ruta, esquema)
+        else:
+            self._escritor = pa.ipc.new_file(self.ruta, esquema)
+
+    def cerrar(self):
+        if self._escritor is None and self._vacio is not None:
+            # Solo hubo bloques vacíos: el archivo queda con las columnas y sin filas
+            import pyarrow as pa
+            self._abrir(pa.Table.from_pandas(self._vacio, preserve_index=False).schema)
+        if self._escritor is not None:
+            self._escritor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+
+class EscritorExcel:
+    """
+    Libro de Excel escrito fila a fila en modo `constant_memory`. Cuando una hoja
+    llega a `max_filas` se crea otra ('Hoja2', 'Hoja3', ...) con los encabezados.
+    """
+    __slots__ = ('ruta', 'max_filas', '_libro', '_hoja', '_fila', '_n_hojas', '_columnas')
+
+    def __init__(self, ruta_salida, max_filas=MAX_FILAS_EXCEL):
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("Para exportar a Excel se necesita xlsxwriter (pip install xlsxwriter).") from None
+        self.ruta = ruta_salida
+        self.max_filas = max_filas
+        # Los NaN/inf se escriben como errores de Excel (#NUM!) en lugar de fallar
+        self._libro = xlsxwriter.Workbook(ruta_salida, {'constant_memory': True, 'nan_inf_to_errors': True,
+                                                        'default_date_format': FORMATO_FECHA_EXCEL})
+        self._hoja = None
+        self._fila = 0
+        self._n_hojas = 0
+        self._columnas = None
+
+    def _nueva_hoja(self):
+        self._n_hojas += 1
+        self._hoja = self._libro.add_worksheet(f"{NOMBRE_HOJA}{self._n_hojas}")
+        self._hoja.write_row(0, 0, self._columnas)
+        self._fila = 1
+
+    def escribir(self, bloque):
+        if self._columnas is None:
+            self._columnas = [str(columna) for columna in bloque.columns]
+            self._nueva_hoja()
+        # Fechas y tipos de numpy a tipos de Python que xlsxwriter sabe escribir
+        filas = bloque.astype(object).where(bloque.notna(), None).to_numpy().tolist()
+        inicio = 0
+        while inicio < len(filas):
+            if self._fila >= self.max_filas:
+                self._nueva_hoja()
+            fin = min(len(filas), inicio + self.max_filas - self._fila)
+            escribir_fila = self._hoja.write_row
+            for fila in filas[inicio:fin]:
+                escribir_fila(self._fila, 0, fila)
+                self._fila += 1
+            inicio = fin
+
+    def cerrar(self):
+        if self._columnas is None:
+            self._columnas = []
+            self._nueva_hoja()
+        self._libro.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+
+def abrir_escritor(ruta_salida):
+    """
+    Escritor por bloques según la extensión de `ruta_salida`.
+    """
+    extension = os.path.splitext(ruta_salida)[1].lower()
+    if extension == '.xlsx':
+        return EscritorExcel(ruta_salida)
+    if extension == '.parquet':
+        return EscritorArrow(ruta_salida, 'parquet')
+    if extension in ('.arrow', '.feather'):
+        return EscritorArrow(ruta_salida, 'arrow')
+    return EscritorCSV(ruta_salida)
+
+
+def exportar_bloques(bloques, ruta_salida, progreso=None):
+    """
+    Escribe en `ruta_salida` los DataFrames de `bloques` (un iterable, que puede ser
+    un generador) y devuelve el número de filas escritas. `progreso(filas)` se llama
+    después de cada bloque.
+    """
+    filas = 0
+    with perfil.etapa('exportar', formato=os.path.splitext(ruta_salida)[1].lower()) as medicion:
+        with abrir_escritor(ruta_salida) as escritor:
+            for bloque in bloques:
+                escritor.escribir(bloque)
+                filas += len(bloque)
+                if progreso is not None:
+                    progreso(filas)
+        medicion.salida(filas=filas, bytes=os.path.getsize(ruta_salida))
+    return filas
+
+
+def exportar_tabla(tabla, ruta_salida, filas_por_bloque=FILAS_POR_BLOQUE, progreso=None):
+    """
+    Exporta una tabla en memoria por bloques de `filas_por_bloque` filas.
+    `progreso(filas_escritas, total)` se llama después de cada bloque.
+    """
+    total = len(tabla)
+    bloques = (tabla.iloc[inicio:inicio + filas_por_bloque] for inicio in range(0, max(total, 1), filas_por_bloque))
+    avance = None if progreso is None else (lambda filas: progreso(filas, total))
+    return exportar_bloques(bloques, ruta_salida, avance)
@@ -0,0 +1,76 @@
+"""
+Eliminación de ruido con wavelets, antes de la detección de picos.
+
+La matriz barridos x bins se descompone con una DWT multinivel a lo largo de los
+bins (una sola llamada de PyWavelets para todos los barridos), los coeficientes de
+detalle se umbralizan y la matriz se reconstruye. El umbral es el universal
+(sigma * sqrt(2 ln n)), con sigma estimado por barrido a partir de la mediana de
+los coeficientes de detalle más finos, así que se adapta al ruido de cada barrido
+sin ajustes manuales. La wavelet y el número de niveles para cada largo se
+preparan una sola vez.
+
+PyWavelets es opcional: solo se importa al usar esta etapa.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from . import perfil
+
+WAVELET = 'db4'
+
+# Umbralización de los coeficientes de detalle: 'soft' (contracción) o 'hard'
+MODO_UMBRAL = 'soft'
+
+# Extensión de la señal en los bordes para la transformada
+MODO_EXTENSION = 'symmetric'
+
+# Nivel máximo de la descomposición; el efectivo también depende del largo del barrido
+MAX_NIVELES = 6
+
+# Mediana del valor absoluto de ruido gaussiano de desvío 1
+_MAD_GAUSSIANA = 0.6745
+
+
+def _importar_pywt():
+    try:
+        import pywt
+    except ImportError:
+        raise ImportError("Para eliminar ruido con wavelets se necesita PyWavelets (pip install PyWavelets).") from None
+    return pywt
+
+
+@lru_cache(maxsize=32)
+def _preparar(nombre, n_bins, max_niveles):
+    # Filtros de la wavelet y niveles de la descomposición para barridos de `n_bins` bins
+    pywt = _importar_pywt()
+    wavelet = pywt.Wavelet(nombre)
+    niveles = min(max_niveles, pywt.dwt_max_level(n_bins, wavelet.dec_len))
+    return wavelet, max(niveles, 1)
+
+
+def eliminar_ruido_wavelet(magnitudes, wavelet=WAVELET, niveles=MAX_NIVELES, modo=MODO_UMBRAL, eje=-1):
+    """
+    Devuelve `magnitudes` (un barrido o una matriz barridos x bins) sin ruido,
+    con la misma forma. La transformada se aplica a lo largo de `eje` (los bins) a
+    todos los barridos a la vez.
+    """
+    pywt = _importar_pywt()
+    matriz = np.asarray(magnitudes, dtype=np.float64)
+    eje = eje % matriz.ndim
+    n_bins = matriz.shape[eje]
+    if n_bins < 2:
+        return matriz.copy()
+    filtro, n_niveles = _preparar(wavelet, n_bins, niveles)
+
+    with perfil.etapa('wavelet', bins=n_bins, barridos=matriz.size // n_bins, niveles=n_niveles):
+        coeficientes = pywt.wavedec(matriz, filtro, mode=MODO_EXTENSION, level=n_niveles, axis=eje)
+        # Ruido de cada barrido a partir de los detalles más finos, donde casi todo es ruido
+        sigma = np.median(np.abs(coeficientes[-1]), axis=eje, keepdims=True) / _MAD_GAUSSIANA
+        umbral = sigma * np.sqrt(2 * np.log(n_bins))
+        coeficientes[1:] = [pywt.threshold(detalle, umbral, mode=modo) for detalle in coeficientes[1:]]
+        reconstruida = pywt.waverec(coeficientes, filtro, mode=MODO_EXTENSION, axis=eje)
+    # La reconstrucción tiene un bin de más con largos impares
+    recorte = [slice(None)] * matriz.ndim
+    recorte[eje] = slice(0, n_bins)
+    return reconstruida[tuple(recorte)]
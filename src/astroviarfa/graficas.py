@@ -0,0 +1,103 @@
+"""
+Dibujo del espectro con nivel de detalle (LOD).
+
+Se precalcula una pirámide de decimación mín/máx: en el nivel k cada bloque de 2**k
+bins guarda la posición de su mínimo y de su máximo. Al dibujar solo se entregan a
+Matplotlib los puntos del nivel que corresponde al ancho en píxeles del eje, y se
+vuelve a decimar al hacer zoom o cambiar el tamaño de la ventana. Como el máximo de
+cada bloque se conserva, los picos se ven a su altura exacta.
+"""
+import numpy as np
+
+# Puntos por píxel del eje: un mínimo y un máximo por columna de píxeles
+PUNTOS_POR_PIXEL = 2
+
+
+def indices_en_rango(frecuencias, frec_inferior, frec_superior):
+    """
+    Tramo de índices con frecuencias en [frec_inferior, frec_superior], para ejes de
+    frecuencia crecientes. Sirve para tomar vistas de los arreglos en lugar de máscaras.
+    """
+    return slice(np.searchsorted(frecuencias, frec_inferior, side='left'),
+                 np.searchsorted(frecuencias, frec_superior, side='right'))
+
+
+class PiramideMinMax:
+    """
+    Pirámide de decimación mín/máx de un espectro. `niveles[k - 1]` contiene los índices
+    (en el espectro original) del mínimo y del máximo de cada bloque de 2**k bins.
+    """
+    __slots__ = ('frecuencias', 'magnitudes', 'niveles')
+
+    def __init__(self, frecuencias, magnitudes):
+        self.frecuencias = np.asarray(frecuencias, dtype=np.float64)
+        self.magnitudes = np.asarray(magnitudes, dtype=np.float64)
+        self.niveles = []
+
+        # Cada nivel se obtiene del anterior comparando pares de bloques: O(N) en total
+        indices_min = indices_max = np.arange(len(self.magnitudes))
+        while len(indices_min) > 1:
+            if len(indices_min) % 2:
+                indices_min = np.append(indices_min, indices_min[-1])
+                indices_max = np.append(indices_max, indices_max[-1])
+            pares, impares = indices_min[0::2], indices_min[1::2]
+            indices_min = np.where(self.magnitudes[impares] < self.magnitudes[pares], impares, pares)
+            pares, impares = indices_max[0::2], indices_max[1::2]
+            indices_max = np.where(self.magnitudes[impares] > self.magnitudes[pares], impares, pares)
+            self.niveles.append((indices_min, indices_max))
+
+    def muestras(self, inicio, fin, max_puntos):
+        """
+        Índices a dibujar para el tramo [inicio, fin) con a lo sumo unos `max_puntos`
+        puntos: todos si caben, o el mínimo y el máximo (en su orden) de cada bloque
+        del nivel adecuado.
+        """
+        n_visibles = fin - inicio
+        if n_visibles <= max_puntos:
+            return np.arange(inicio, fin)
+        # Dos puntos (mínimo y máximo) por bloque
+        nivel = min(int(np.ceil(np.log2(2 * n_visibles / max_puntos))), len(self.niveles))
+        tamaño = 2 ** nivel
+        indices_min, indices_max = self.niveles[nivel - 1]
+        bloques = slice(inicio // tamaño, -(-fin // tamaño))
+        return np.sort(np.stack([indices_min[bloques], indices_max[bloques]], axis=1), axis=1).ravel()
+
+
+class EspectroLOD:
+    """
+    Línea de Matplotlib que dibuja un espectro con la pirámide mín/máx y se actualiza
+    al cambiar los límites del eje x o el tamaño de la figura.
+    """
+    __slots__ = ('piramide', 'ax', 'linea')
+
+    def __init__(self, ax, frecuencias, magnitudes, **estilo):
+        self.piramide = PiramideMinMax(frecuencias, magnitudes)
+        self.ax = ax
+        (self.linea,) = ax.plot([], [], **estilo)
+
+        # Los límites de los datos se declaran aparte porque la línea solo guarda la vista decimada
+        if len(self.piramide.frecuencias):
+            ax.update_datalim([(self.piramide.frecuencias[0], np.nanmin(self.piramide.magnitudes)),
+                               (self.piramide.frecuencias[-1], np.nanmax(self.piramide.magnitudes))])
+            ax.autoscale_view()
+
+        # Funciones (no métodos) para que Matplotlib mantenga viva la referencia
+        ax.callbacks.connect('xlim_changed', lambda _ax: self.actualizar())
+        ax.figure.canvas.mpl_connect('resize_event', lambda _evento: self.actualizar())
+        self.actualizar()
+
+    def actualizar(self):
+        frecuencias = self.piramide.frecuencias
+        x_min, x_max = sorted(self.ax.get_xlim())
+        inicio = max(np.searchsorted(frecuencias, x_min, side='left') - 1, 0)
+        fin = min(np.searchsorted(frecuencias, x_max, side='right') + 1, len(frecuencias))
+        pixeles = max(int(self.ax.bbox.width), 1)
+        indices = self.piramide.muestras(inicio, fin, PUNTOS_POR_PIXEL * pixeles)
+        self.linea.set_data(frecuencias[indices], self.piramide.magnitudes[indices])
+
+
+def dibujar_espectro(ax, frecuencias, magnitudes, **estilo):
+    """
+    Dibuja el espectro en `ax` con nivel de detalle y devuelve el EspectroLOD.
+    """
+    return EspectroLOD(ax, frecuencias, magnitudes, **estilo)
@@ -0,0 +1,340 @@
+"""
+Lectura en streaming de los archivos CSV exportados por el analizador de espectro.
+
+El archivo tiene tres secciones separadas por líneas en blanco:
+
+1. Cabecera del instrumento (sin nombres de columna).
+2. Parámetros de la medición (con nombres de columna).
+3. Barridos: una fila de nombres (fecha y hora de cada barrido), dos filas de
+   metadatos (la segunda contiene 'Frequency [Hz]' / 'Magnitude [dBm]') y
+   después una fila por bin con la frecuencia y la magnitud de cada barrido.
+
+Los números usan coma decimal o punto decimal según la configuración regional del
+equipo que exportó la captura; el separador es el primer ',' o '.' que aparece en
+los datos, aunque las primeras filas tengan solo valores enteros.
+
+En memoria la captura queda como un eje de frecuencias float64 compartido y una
+matriz contigua de magnitudes (barridos x bins), float32 o, con `dtype=np.int16`,
+cuantizada en pasos de 0,01 dB (la resolución con la que exporta el analizador),
+que ocupa la mitad.
+
+`ubicar_secciones`, `dividir_linea`, `desduplicar` y `bloques_numericos` son los
+pasos de la lectura por separado, para quien lee el archivo por partes mientras
+crece (el monitoreo en vivo).
+"""
+import io
+import os
+import re
+
+import numpy as np
+
+from . import perfil
+from .tiempos import IndiceBarridos
+
+SEPARADOR = ';'
+CODIFICACION = 'utf-8'
+
+# Filas de metadatos entre los nombres de columna y los datos de la tercera sección
+FILAS_METADATOS = 2
+
+# Número de valores (filas x columnas) que se convierten por bloque en la tercera sección
+VALORES_POR_BLOQUE = 2 ** 22
+
+# Bytes que se leen a la vez al buscar el separador decimal
+BYTES_BUSQUEDA_DECIMAL = 2 ** 16
+
+# Cuantización int16 de las magnitudes: dBm = código * PASO + DESPLAZAMIENTO (de -427,67 a 227,67 dBm)
+PASO_CUANTIZACION_DB = 0.01
+DESPLAZAMIENTO_CUANTIZACION_DBM = -100.0
+
+# Código int16 reservado para los valores faltantes (NaN)
+CODIGO_NAN = np.iinfo(np.int16).min
+
+
+def cuantizar(magnitudes, paso=PASO_CUANTIZACION_DB, desplazamiento=DESPLAZAMIENTO_CUANTIZACION_DBM):
+    """
+    Códigos int16 de `magnitudes` (dBm). Los valores fuera del rango representable
+    se recortan a los extremos y los NaN quedan como CODIGO_NAN.
+    """
+    codigos = np.rint((np.asarray(magnitudes, dtype=np.float64) - desplazamiento) / paso)
+    faltantes = np.isnan(codigos)
+    np.clip(codigos, CODIGO_NAN + 1, np.iinfo(np.int16).max, out=codigos)
+    codigos[faltantes] = CODIGO_NAN
+    return codigos.astype(np.int16)
+
+
+def descuantizar(codigos, paso=PASO_CUANTIZACION_DB, desplazamiento=DESPLAZAMIENTO_CUANTIZACION_DBM,
+                 dtype=np.float64):
+    """
+    Magnitudes en dBm de los códigos int16, como `dtype`. La cuenta se hace en float64
+    y recién después se convierte, así que con float32 cada valor es el float32 más
+    cercano al valor decimal, el mismo que da la lectura sin cuantizar.
+    """
+    magnitudes = (codigos * np.float64(paso) + np.float64(desplazamiento)).astype(dtype, copy=False)
+    magnitudes[codigos == CODIGO_NAN] = np.nan
+    return magnitudes
+
+
+class CapturaCSV:
+    """
+    Captura en memoria: las secciones df1/df2, los nombres de columna de la tercera
+    sección (desduplicados como pandas), las filas de metadatos de los barridos
+    (listas de texto, con la etiqueta de la fila en la primera posición), el eje
+    de frecuencias compartido (float64, bins) y la matriz `datos` (barridos x bins).
+
+    `datos` es float32, o int16 cuantizada si `paso` no es None. El análisis toma
+    los barridos con `bloque` o `barrido`, que devuelven dBm en float64 sin pasar
+    por otro tipo intermedio; `magnitudes` devuelve la matriz en dBm (una copia
+    float32 si está cuantizada).
+    """
+    __slots__ = ('df1', 'df2', 'columnas', 'metadatos', 'frecuencias', 'datos', 'indice', 'paso', 'desplazamiento')
+
+    def __init__(self, df1, df2, columnas, metadatos, frecuencias, datos, indice=None, paso=None,
+                 desplazamiento=DESPLAZAMIENTO_CUANTIZACION_DBM):
+        self.df1 = df1
+        self.df2 = df2
+        self.columnas = columnas
+        self.metadatos = metadatos
+        self.frecuencias = frecuencias
+        self.datos = datos
+        # IndiceBarridos con la fecha y hora de cada barrido (None si no se construyó)
+        self.indice = indice
+        self.paso = paso
+        self.desplazamiento = desplazamiento
+
+    @property
+    def cuantizada(self):
+        return self.paso is not None
+
+    @property
+    def n_barridos(self):
+        return self.datos.shape[0]
+
+    @property
+    def n_bins(self):
+        return self.datos.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.frecuencias.nbytes + self.datos.nbytes
+
+    @property
+    def magnitudes(self):
+        if self.cuantizada:
+            return descuantizar(self.datos, self.paso, self.desplazamiento, np.float32)
+        return self.datos
+
+    def bloque(self, inicio=0, fin=None, dtype=np.float64):
+        """
+        Barridos `inicio` a `fin` (sin incluir) en dBm, como matriz de `dtype`.
+        """
+        codigos = self.datos[inicio:fin]
+        if self.cuantizada:
+            return descuantizar(codigos, self.paso, self.desplazamiento, dtype)
+        return np.asarray(codigos, dtype=dtype)
+
+    def barrido(self, indice, dtype=np.float64):
+        return self.bloque(indice, indice + 1, dtype)[0]
+
+    def metadatos_barrido(self, indice):
+        """
+        Metadatos del barrido `indice` como {etiqueta de la fila: valor}.
+        """
+        return {fila[0]: fila[indice + 1] for fila in self.metadatos or [] if len(fila) > indice + 1}
+
+
+def ubicar_secciones(archivo):
+    """
+    Recorre el archivo una sola vez y devuelve, para cada sección,
+    el desplazamiento inicial, el final y el número de líneas.
+    """
+    secciones = []
+    inicio = None
+    n_lineas = 0
+    posicion = 0
+    for linea in archivo:
+        if linea.strip():
+            if inicio is None:
+                inicio = posicion
+                n_lineas = 0
+            n_lineas += 1
+        elif inicio is not None:
+            secciones.append((inicio, posicion, n_lineas))
+            inicio = None
+        posicion += len(linea)
+    if inicio is not None:
+        secciones.append((inicio, posicion, n_lineas))
+    return secciones
+
+
+def _leer_bytes(archivo, inicio, fin):
+    archivo.seek(inicio)
+    return io.BytesIO(archivo.read(fin - inicio))
+
+
+def dividir_linea(linea):
+    """
+    Campos de una línea del archivo (bytes, con o sin el fin de línea).
+    """
+    return linea.decode(CODIFICACION).rstrip('\r\n').split(SEPARADOR)
+
+
+def desduplicar(nombres):
+    """
+    Añade los sufijos '.1', '.2', ... a los nombres repetidos, igual que pandas,
+    para que los nombres de barrido sigan coincidiendo con los de versiones anteriores.
+    """
+    vistos = {}
+    resultado = []
+    for nombre in nombres:
+        if nombre in vistos:
+            contador = vistos[nombre]
+            candidato = f"{nombre}.{contador}"
+            while candidato in vistos:
+                contador += 1
+                candidato = f"{nombre}.{contador}"
+            vistos[nombre] = contador + 1
+            vistos[candidato] = 1
+            resultado.append(candidato)
+        else:
+            vistos[nombre] = 1
+            resultado.append(nombre)
+    return resultado
+
+
+def normalizar_columna(columna):
+    """
+    Nombre de columna sin espacios sobrantes y en minúsculas, para comparar la fecha
+    y hora ingresada por el usuario con los nombres de los barridos.
+    """
+    # Eliminar espacios adicionales y convertir a minúsculas
+    columna = columna.strip().lower()
+    # Reemplazar múltiples espacios por uno solo
+    return re.sub(r'\s+', ' ', columna)
+
+
+def _separador_decimal(archivo, fin=None):
+    """
+    Separador decimal de los datos entre la posición actual de `archivo` (que no se
+    mueve) y el byte `fin` (por defecto, el final del archivo): el primer ',' o '.'
+    que aparezca, porque los campos se separan con ';' y el resto de los caracteres
+    son dígitos, signos y exponentes. Normalmente está en la primera fila; la búsqueda
+    sigue si esa fila tiene solo enteros. Si no aparece ninguno, '.' (da igual).
+    """
+    posicion = archivo.tell()
+    try:
+        while fin is None or archivo.tell() < fin:
+            trozo = archivo.read(BYTES_BUSQUEDA_DECIMAL if fin is None
+                                 else min(BYTES_BUSQUEDA_DECIMAL, fin - archivo.tell()))
+            if not trozo:
+                break
+            coma, punto = trozo.find(b','), trozo.find(b'.')
+            if coma >= 0 and (punto < 0 or coma < punto):
+                return ','
+            if punto >= 0:
+                return '.'
+        return '.'
+    finally:
+        archivo.seek(posicion)
+
+
+def bloques_numericos(archivo, columnas_usadas, n_filas, decimal=None):
+    """
+    Genera, por bloques, las filas numéricas de la tercera sección desde la posición
+    actual de `archivo`, como arreglos float64 (filas x columnas_usadas). Si no se
+    indica `decimal`, se detecta en los datos desde esa posición.
+    """
+    # pandas (su parser en C) se importa al leer, no al importar el paquete
+    import pandas as pd
+
+    columnas_usadas = list(columnas_usadas)
+    if not n_filas or not columnas_usadas:
+        return
+    if decimal is None:
+        decimal = _separador_decimal(archivo)
+    bloques = pd.read_csv(
+        archivo, sep=SEPARADOR, decimal=decimal, header=None, nrows=n_filas,
+        usecols=columnas_usadas, dtype=np.float64, engine='c',
+        encoding=CODIFICACION, chunksize=max(1, VALORES_POR_BLOQUE // len(columnas_usadas)),
+    )
+    with bloques:
+        for bloque in bloques:
+            yield bloque.to_numpy()
+
+
+def leer_csv_especial(ruta_archivo, dtype=np.float32, progreso=None, al_leer_bloque=None, conservar=True):
+    """
+    Función para cargar archivo CSV.
+
+    Localiza las tres secciones en una sola pasada y convierte los datos de la
+    tercera sección por bloques con el parser en C de pandas (con coma o punto
+    decimal, según los datos), rellenando directamente los arreglos finales. La memoria máxima
+    queda cerca del tamaño de `frecuencias` + `magnitudes`. Con `dtype=np.int16`
+    las magnitudes se cuantizan al llenar la matriz (ver `cuantizar`). Si se indica,
+    `progreso(bins_leidos, total_bins)` se llama después de cada bloque; una
+    excepción lanzada desde ahí interrumpe la lectura.
+
+    `al_leer_bloque(inicio, total_bins, frecuencias, magnitudes)` recibe cada bloque
+    de bins recién convertido: sus frecuencias y la matriz barridos x bins en dBm, con
+    la misma precisión que la matriz en memoria. Con `conservar=False` la matriz no se
+    guarda (la captura devuelta tiene el eje de frecuencias, los metadatos y cero
+    bins de magnitudes), para quien solo necesita recorrer los bloques.
+    """
+    import pandas as pd
+
+    with perfil.etapa('leer_csv', bytes=os.path.getsize(ruta_archivo)) as medicion, \
+            open(ruta_archivo, 'rb') as archivo:
+        secciones = ubicar_secciones(archivo)
+        if len(secciones) < 3:
+            raise ValueError(
+                f"Se esperaban 3 secciones separadas por líneas en blanco y se encontraron {len(secciones)}."
+            )
+
+        # Separador decimal de los datos de la tercera sección, que también usan los parámetros
+        inicio, fin, n_lineas = secciones[2]
+        archivo.seek(inicio)
+        for _ in range(1 + FILAS_METADATOS):
+            archivo.readline()
+        decimal = _separador_decimal(archivo, fin)
+
+        # Procesar la primera sección
+        df1 = pd.read_csv(_leer_bytes(archivo, *secciones[0][:2]), sep=SEPARADOR, header=None,
+                          encoding=CODIFICACION)
+
+        # Procesar la segunda sección
+        df2 = pd.read_csv(_leer_bytes(archivo, *secciones[1][:2]), sep=SEPARADOR, decimal=decimal,
+                          encoding=CODIFICACION)
+
+        # Procesar la tercera sección: nombres de columna y metadatos
+        archivo.seek(inicio)
+        columnas = desduplicar(dividir_linea(archivo.readline()))
+        metadatos = [dividir_linea(archivo.readline()) for _ in range(FILAS_METADATOS)]
+
+        n_columnas = len(columnas)
+        n_bins = max(n_lineas - 1 - FILAS_METADATOS, 0)
+        frecuencias = np.empty(n_bins, dtype=np.float64)
+        magnitudes = np.empty((n_columnas - 1, n_bins if conservar else 0), dtype=dtype)
+        paso = PASO_CUANTIZACION_DB if np.dtype(dtype) == np.int16 else None
+
+        # Datos numéricos, por bloques, directamente en los arreglos finales
+        fila = 0
+        for valores in bloques_numericos(archivo, range(n_columnas), n_bins, decimal):
+            siguiente = fila + len(valores)
+            frecuencias[fila:siguiente] = valores[:, 0]
+            bloque = valores[:, 1:].T if paso is None else cuantizar(valores[:, 1:].T)
+            if conservar:
+                magnitudes[:, fila:siguiente] = bloque
+            if al_leer_bloque is not None:
+                bloque = descuantizar(bloque, paso) if paso is not None else bloque.astype(dtype, copy=False)
+                al_leer_bloque(fila, n_bins, frecuencias[fila:siguiente], bloque)
+            fila = siguiente
+            if progreso is not None:
+                progreso(fila, n_bins)
+        if fila < n_bins:
+            frecuencias = frecuencias[:fila]
+            magnitudes = magnitudes[:, :fila]
+        medicion.salida(barridos=magnitudes.shape[0], bins=len(frecuencias))
+
+        indice = IndiceBarridos(columnas[1:])
+
+    return CapturaCSV(df1, df2, columnas, metadatos, frecuencias, magnitudes, indice, paso)
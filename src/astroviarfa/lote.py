@@ -0,0 +1,197 @@
+"""
+Procesamiento de varias capturas en paralelo con un pool de procesos:
+leer_csv_especial -> analizar_captura -> asignar_satelites por archivo, y una
+tabla combinada al final. Opcionalmente cada proceso acumula también las
+estadísticas de ocupación de su archivo mientras lo lee, y se combinan al final.
+"""
+import glob
+import os
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import numpy as np
+
+from .deteccion import ANCHO_PISO_BINS
+from .exportacion import exportar_tabla
+from .lector import leer_csv_especial
+from .motor import analizar_captura
+from .ocupacion import MARGEN_OCUPACION_DB, UMBRAL_SNR_INTERFERENCIA_DB, AcumuladorLectura
+from .satelites import asignar_satelites
+
+ResultadoLote = namedtuple('ResultadoLote', ['tabla', 'errores', 'estadisticas'], defaults=[None])
+
+
+def expandir_rutas(entradas):
+    """
+    Convierte archivos, patrones glob y directorios (todos sus *.csv) en una lista
+    ordenada de rutas sin repetir. Las rutas que no existen se conservan para
+    que el error se informe al procesarlas.
+    """
+    rutas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            rutas.extend(glob.glob(os.path.join(entrada, '*.csv')))
+        elif glob.has_magic(entrada):
+            rutas.extend(glob.glob(entrada, recursive=True))
+        else:
+            rutas.append(entrada)
+    return sorted(set(rutas))
+
+
+def procesar_archivo(ruta_archivo, plan_bandas=None, estadisticas=False, margen_ocupacion=MARGEN_OCUPACION_DB,
+                     umbral_interferencia=UMBRAL_SNR_INTERFERENCIA_DB, dtype=np.float32, **opciones):
+    """
+    Analiza todos los barridos de una captura y devuelve su tabla de
+    características con el archivo de origen y el satélite de cada señal según
+    `plan_bandas` (ruta del plan o None para el plan por defecto).
+    `opciones` se pasan a `analizar_captura` (margen_pico, piso_local, ...).
+    Con `estadisticas` devuelve (tabla, EstadisticasEspectro) con la ocupación
+    y las interferencias de la captura, según `margen_ocupacion` y `umbral_interferencia` (dB);
+    se acumulan bloque a bloque durante la lectura (ver `AcumuladorLectura`).
+    `dtype` es el tipo de la matriz de magnitudes en memoria (np.int16 para cuantizarla).
+    """
+    acumulador = None
+    if estadisticas:
+        acumulador = AcumuladorLectura(plan_bandas, margen_ocupacion, umbral_interferencia,
+                                       opciones.get('piso_local', False), opciones.get('ancho_piso', ANCHO_PISO_BINS))
+    captura = leer_csv_especial(ruta_archivo, dtype, al_leer_bloque=acumulador)
+    tabla = analizar_captura(captura, **opciones)
+    tabla.insert(0, 'Archivo', ruta_archivo)
+    tabla['Satélite'] = asignar_satelites(tabla['Frecuencia central [Hz]'], plan_bandas)
+    if not estadisticas:
+        return tabla
+    ocupacion = acumulador.terminar(captura)
+    ocupacion.agregar_senales(tabla)
+    return tabla, ocupacion
+
+
+def _procesar_archivo_seguro(ruta_archivo, opciones):
+    # Los errores se devuelven como texto para que un archivo defectuoso no detenga el lote
+    try:
+        return ruta_archivo, procesar_archivo(ruta_archivo, **opciones), None
+    except Exception as e:
+        return ruta_archivo, None, f"{type(e).__name__}: {e}"
+
+
+def _procesar_grupo(rutas, opciones):
+    return [_procesar_archivo_seguro(ruta, opciones) for ruta in rutas]
+
+
+def _resultados_en_paralelo(rutas, trabajadores, chunksize, opciones):
+    """
+    Genera (posición en `rutas`, (ruta, resultado, error)) a medida que terminan los
+    archivos, con a lo sumo `trabajadores` grupos de `chunksize` archivos en curso.
+
+    Si un proceso muere, el pool deja de servir y no se sabe cuál de los grupos en
+    curso lo hizo caer: sus archivos se vuelven a procesar de a uno, cada uno en un
+    pool nuevo de un proceso, y solo el que lo vuelve a hacer caer se informa con el
+    error BrokenProcessPool. El resto sigue en un pool nuevo.
+    """
+    pendientes = deque(range(inicio, min(inicio + chunksize, len(rutas)))
+                       for inicio in range(0, len(rutas), chunksize))
+    sospechosos = deque()
+    while pendientes or sospechosos:
+        if sospechosos:
+            posicion = sospechosos.popleft()
+            with ProcessPoolExecutor(max_workers=1) as ejecutor:
+                try:
+                    resultado = ejecutor.submit(_procesar_archivo_seguro, rutas[posicion], opciones).result()
+                except BrokenProcessPool as e:
+                    resultado = rutas[posicion], None, f"{type(e).__name__}: {e}"
+            yield posicion, resultado
+            continue
+        with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+            en_curso = {}
+            while (pendientes or en_curso) and not sospechosos:
+                while pendientes and len(en_curso) < trabajadores:
+                    grupo = pendientes.popleft()
+                    en_curso[ejecutor.submit(_procesar_grupo, [rutas[i] for i in grupo], opciones)] = grupo
+                listos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                roto = False
+                for futuro in listos:
+                    if isinstance(futuro.exception(), BrokenProcessPool):
+                        roto = True
+                        continue
+                    yield from zip(en_curso.pop(futuro), futuro.result())
+                if roto:
+                    sospechosos.extend(sorted(posicion for grupo in en_curso.values() for posicion in grupo))
+                    en_curso.clear()
+
+
+def iterar_lote(rutas, trabajadores=None, chunksize=1, **opciones):
+    """
+    Procesa las capturas repartiéndolas en `trabajadores` procesos (por defecto,
+    uno por núcleo), enviando `chunksize` archivos por tarea. Genera, en el orden
+    de `rutas`, tuplas (ruta, resultado, error) donde exactamente uno de
+    resultado/error es None; resultado es lo que devuelve `procesar_archivo`
+    (la tabla, o (tabla, estadísticas) con `estadisticas=True`).
+    `opciones` se pasan a `procesar_archivo`.
+
+    Si un proceso de trabajo termina de golpe (p. ej. sin memoria), solo el archivo
+    que lo hizo caer se informa con el error BrokenProcessPool; los demás se vuelven
+    a enviar a un pool nuevo (ver `_resultados_en_paralelo`).
+    """
+    tarea = partial(_procesar_archivo_seguro, opciones=opciones)
+    if trabajadores == 1 or len(rutas) <= 1:
+        yield from map(tarea, rutas)
+        return
+    trabajadores = trabajadores or os.cpu_count() or 1
+    # Los archivos terminan en cualquier orden: se entregan en el de `rutas`
+    terminados = {}
+    siguiente = 0
+    for posicion, resultado in _resultados_en_paralelo(rutas, trabajadores, max(int(chunksize), 1), opciones):
+        terminados[posicion] = resultado
+        while siguiente in terminados:
+            yield terminados.pop(siguiente)
+            siguiente += 1
+
+
+def procesar_lote(rutas, trabajadores=None, chunksize=1, **opciones):
+    """
+    Procesa todas las capturas y devuelve la tabla combinada y un diccionario
+    {ruta: mensaje} con los archivos que fallaron. Con `estadisticas=True` el
+    resultado incluye las estadísticas de ocupación combinadas de todos los
+    archivos; las de un archivo con otro eje de frecuencias no se combinan y el
+    archivo figura en los errores.
+    """
+    import pandas as pd
+
+    tablas = []
+    errores = {}
+    combinadas = None
+    for ruta, resultado, error in iterar_lote(rutas, trabajadores, chunksize, **opciones):
+        if error is not None:
+            errores[ruta] = error
+            continue
+        if not opciones.get('estadisticas'):
+            tablas.append(resultado)
+            continue
+        tabla, ocupacion = resultado
+        tablas.append(tabla)
+        try:
+            combinadas = ocupacion if combinadas is None else combinadas.combinar(ocupacion)
+        except ValueError as e:
+            errores[ruta] = f"{type(e).__name__}: {e}"
+    tabla = pd.concat(tablas, ignore_index=True) if tablas else pd.DataFrame()
+    return ResultadoLote(tabla, errores, combinadas)
+
+
+def guardar_tabla(tabla, ruta_salida, progreso=None):
+    """
+    Guarda la tabla según la extensión de `ruta_salida`: .xlsx (repartida en varias
+    hojas si supera el límite de filas de Excel), .parquet, .arrow/.feather o, en
+    cualquier otro caso, CSV con ';' y coma decimal como los archivos del analizador.
+    Se escribe por bloques (ver el módulo `exportacion`).
+    """
+    exportar_tabla(tabla, ruta_salida, progreso=progreso)
+
+
+def agregar_a_csv(tabla, ruta_salida):
+    """
+    Agrega las filas de `tabla` al final de un CSV (mismo formato que `guardar_tabla`),
+    escribiendo los nombres de columna solo si el archivo todavía no existe.
+    """
+    nuevo = not os.path.exists(ruta_salida) or os.path.getsize(ruta_salida) == 0
+    tabla.to_csv(ruta_salida, sep=';', decimal=',', index=False, mode='a', header=nuevo)
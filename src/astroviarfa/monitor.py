@@ -0,0 +1,203 @@
+"""
+Monitoreo en vivo de capturas que crecen durante un paso del satélite.
+
+El analizador agrega un barrido como una nueva columna de la tercera sección.
+En cada consulta solo se leen el encabezado y, si hay barridos nuevos, sus
+columnas (el parser descarta el resto de cada línea sin convertirlo), y la
+detección y las características se calculan únicamente sobre esos barridos.
+La columna de frecuencias se vuelve a leer en cada consulta y los barridos nuevos
+solo se aceptan si coincide con la de la primera lectura, que además espera a que
+el tamaño y la fecha de modificación del archivo no cambien entre dos consultas.
+Con un directorio o un patrón glob, cada archivo nuevo se incorpora al vigilarlo.
+"""
+import os
+import time
+
+import numpy as np
+
+from .deteccion import ANCHO_PISO_BINS
+from .lector import (FILAS_METADATOS, PASO_CUANTIZACION_DB, CapturaCSV, bloques_numericos, cuantizar, desduplicar,
+                     dividir_linea, ubicar_secciones)
+from .lote import expandir_rutas
+from .motor import analizar_captura
+from .ocupacion import MARGEN_OCUPACION_DB, UMBRAL_SNR_INTERFERENCIA_DB, EstadisticasEspectro
+from .satelites import asignar_satelites
+from .seguimiento import TOLERANCIA_HZ, SeguidorSenales
+
+# Segundos entre consultas al vigilar
+INTERVALO_S = 1.0
+
+
+class MonitorArchivo:
+    """
+    Estado incremental de una captura: barridos ya analizados, eje de frecuencias
+    y posición de la tercera sección dentro del archivo. Con un `seguidor`
+    (SeguidorSenales) las señales de cada barrido nuevo se asocian a sus pistas y
+    la tabla incluye la columna 'Pista'. Con `estadisticas` los barridos nuevos se
+    acumulan además en `self.estadisticas` (EstadisticasEspectro, con los umbrales
+    `margen_ocupacion` y `umbral_interferencia`), que se crea al conocer el eje de frecuencias.
+    Los barridos nuevos se analizan con la precisión de `dtype` (float32 o int16), como
+    en `leer_csv_especial`, para que la tabla coincida con la del análisis por lotes.
+    """
+    __slots__ = ('ruta', 'plan_bandas', 'seguidor', 'con_estadisticas', 'umbrales', 'estadisticas', 'dtype',
+                 'opciones', 'columnas', 'frecuencias', '_inicio_barridos', '_firma', '_firma_anterior')
+
+    def __init__(self, ruta, plan_bandas=None, seguidor=None, estadisticas=False,
+                 margen_ocupacion=MARGEN_OCUPACION_DB, umbral_interferencia=UMBRAL_SNR_INTERFERENCIA_DB,
+                 dtype=np.float32, **opciones):
+        self.ruta = ruta
+        self.plan_bandas = plan_bandas
+        self.seguidor = seguidor
+        self.con_estadisticas = estadisticas
+        self.umbrales = (margen_ocupacion, umbral_interferencia)
+        self.estadisticas = None
+        self.dtype = dtype
+        self.opciones = opciones
+        self.columnas = []
+        self.frecuencias = None
+        self._inicio_barridos = None
+        # Firma (tamaño, fecha de modificación) de la última lectura completa y de la última consulta
+        self._firma = None
+        self._firma_anterior = None
+
+    @property
+    def n_barridos(self):
+        return max(len(self.columnas) - 1, 0)
+
+    def _leer_encabezado(self, archivo):
+        """
+        Devuelve (columnas de la tercera sección, número de bins según sus líneas), o
+        (None, 0) si el archivo todavía no tiene las tres secciones. El número de bins
+        es None cuando no se recorrió el archivo.
+        """
+        # Las dos primeras secciones no cambian, así que la tercera empieza siempre en
+        # el mismo lugar; solo se vuelve a recorrer el archivo (desde el principio) si
+        # eso deja de cumplirse o todavía no se leyó ningún barrido.
+        if self._inicio_barridos is not None and self.columnas:
+            archivo.seek(self._inicio_barridos)
+            columnas = dividir_linea(archivo.readline())
+            if columnas[:1] == self.columnas[:1]:
+                return columnas, None
+        archivo.seek(0)
+        secciones = ubicar_secciones(archivo)
+        if len(secciones) < 3:
+            return None, 0
+        self._inicio_barridos, _, n_lineas = secciones[2]
+        archivo.seek(self._inicio_barridos)
+        return dividir_linea(archivo.readline()), max(n_lineas - 1 - FILAS_METADATOS, 0)
+
+    def actualizar(self):
+        """
+        Analiza los barridos agregados desde la consulta anterior y devuelve su tabla
+        de características (con la misma forma que `procesar_archivo`), o None si no
+        hay barridos nuevos o el archivo se está escribiendo en ese momento.
+        """
+        try:
+            estado = os.stat(self.ruta)
+        except OSError:
+            return None
+        firma = (estado.st_size, estado.st_mtime_ns)
+        if firma == self._firma:
+            return None
+        # La primera lectura fija el eje de frecuencias: se espera a que el archivo no
+        # cambie entre dos consultas para no tomarlo de una escritura a medias
+        anterior, self._firma_anterior = self._firma_anterior, firma
+        if self.frecuencias is None and firma != anterior:
+            return None
+
+        try:
+            with open(self.ruta, 'rb') as archivo:
+                columnas, n_lineas = self._leer_encabezado(archivo)
+                if columnas is None or len(columnas) <= len(self.columnas):
+                    self._firma = firma
+                    return None
+                for _ in range(FILAS_METADATOS):
+                    archivo.readline()
+
+                # La columna de frecuencias se lee siempre, con una fila de más para
+                # notar si la sección de datos cambió de largo
+                primera = len(self.columnas) or 1
+                n_bins = n_lineas if self.frecuencias is None else len(self.frecuencias) + 1
+                valores = list(bloques_numericos(archivo, [0, *range(primera, len(columnas))], n_bins))
+        except (OSError, ValueError):
+            # Escritura a medias: se reintenta en la siguiente consulta
+            return None
+        valores = np.concatenate(valores) if valores else np.empty((0, len(columnas) - primera + 1))
+
+        if self.frecuencias is None:
+            if not n_bins or len(valores) != n_bins:
+                return None
+            self.frecuencias = valores[:, 0].copy()
+        elif len(valores) != len(self.frecuencias) or not np.array_equal(valores[:, 0], self.frecuencias):
+            # Escritura a medias (o el eje cambió): se reintenta cuando el archivo vuelva a cambiar
+            self._firma = firma
+            return None
+        valores = valores[:, 1:]
+        desde = self.n_barridos
+        self.columnas = desduplicar(columnas)
+        self._firma = firma
+        if not valores.shape[1]:
+            return None
+
+        # Mismo tipo que `leer_csv_especial` para que el resultado coincida con el análisis completo
+        paso = PASO_CUANTIZACION_DB if np.dtype(self.dtype) == np.int16 else None
+        datos = valores.T.astype(self.dtype) if paso is None else cuantizar(valores.T)
+        nuevos = CapturaCSV(None, None, self.columnas[:1] + self.columnas[desde + 1:], None, self.frecuencias,
+                            datos, paso=paso)
+        tabla = analizar_captura(nuevos, **self.opciones)
+        tabla['Índice de barrido'] += desde
+        tabla.insert(0, 'Archivo', self.ruta)
+        tabla['Satélite'] = asignar_satelites(tabla['Frecuencia central [Hz]'], self.plan_bandas)
+        if self.seguidor is not None:
+            tabla['Pista'] = self.seguidor.procesar_tabla(tabla) + 1
+        if self.con_estadisticas:
+            if self.estadisticas is None:
+                self.estadisticas = EstadisticasEspectro(self.frecuencias, self.plan_bandas, *self.umbrales)
+            self.estadisticas.agregar_captura(nuevos, piso_local=self.opciones.get('piso_local', False),
+                                              ancho_piso=self.opciones.get('ancho_piso', ANCHO_PISO_BINS))
+            self.estadisticas.agregar_senales(tabla)
+        return tabla
+
+
+class MonitorCapturas:
+    """
+    Vigila archivos, directorios (*.csv) o patrones glob; los archivos que aparecen
+    después del inicio se agregan en la siguiente consulta. Con `seguimiento` cada
+    archivo tiene su propio SeguidorSenales con tolerancia `tolerancia_hz`.
+    """
+    __slots__ = ('entradas', 'seguimiento', 'tolerancia_hz', 'opciones', 'monitores')
+
+    def __init__(self, entradas, seguimiento=False, tolerancia_hz=TOLERANCIA_HZ, **opciones):
+        self.entradas = [entradas] if isinstance(entradas, str) else list(entradas)
+        self.seguimiento = seguimiento
+        self.tolerancia_hz = tolerancia_hz
+        self.opciones = opciones
+        self.monitores = {}
+
+    def actualizar(self):
+        """
+        Devuelve una lista con las tablas de los barridos nuevos de cada archivo.
+        """
+        for ruta in expandir_rutas(self.entradas):
+            if ruta not in self.monitores:
+                seguidor = SeguidorSenales(self.tolerancia_hz) if self.seguimiento else None
+                self.monitores[ruta] = MonitorArchivo(ruta, seguidor=seguidor, **self.opciones)
+        tablas = []
+        for monitor in self.monitores.values():
+            tabla = monitor.actualizar()
+            if tabla is not None:
+                tablas.append(tabla)
+        return tablas
+
+
+def vigilar(entradas, al_recibir, intervalo=INTERVALO_S, continuar=lambda: True, **opciones):
+    """
+    Consulta las entradas cada `intervalo` segundos mientras `continuar()` sea verdadero
+    y entrega a `al_recibir(tabla)` las características de cada grupo de barridos nuevos.
+    `opciones` se pasan a `MonitorArchivo` (plan_bandas y opciones de `analizar_captura`).
+    """
+    monitor = MonitorCapturas(entradas, **opciones)
+    while continuar():
+        for tabla in monitor.actualizar():
+            al_recibir(tabla)
+        time.sleep(intervalo)
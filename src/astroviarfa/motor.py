@@ -0,0 +1,92 @@
+"""
+Motor de análisis por lotes, sin interfaz gráfica: procesa todos los barridos
+de una captura y devuelve una única tabla larga de características.
+"""
+import numpy as np
+
+from .caracteristicas import COLUMNAS_CARACTERISTICAS, extraer_caracteristicas
+from . import perfil
+from .deteccion import (ANCHO_PISO_BINS, MARGEN_PICO_DB, detectar_picos, estimar_nivel_ruido,
+                        estimar_piso_local, umbral_cfar)
+from .filtrado import eliminar_ruido_wavelet
+
+# Valores (barridos x bins) que se convierten a float64 y se analizan juntos en cada paso
+VALORES_POR_BLOQUE = 2 ** 22
+
+COLUMNAS_MOTOR = ['Barrido', 'Índice de barrido'] + COLUMNAS_CARACTERISTICAS
+
+
+def _estimar_ruido(magnitudes, margen_pico, piso_local, ancho_piso, cfar):
+    # Altura mínima de los picos y nivel de ruido (por barrido o por bin) con el estimador elegido
+    tamaño = {'barridos': len(magnitudes), 'bins': magnitudes.shape[1]}
+    if cfar is not None:
+        with perfil.etapa('cfar', metodo=cfar.metodo, **tamaño):
+            return umbral_cfar(magnitudes, *cfar)
+    with perfil.etapa('nivel_ruido', piso_local=piso_local, **tamaño):
+        if piso_local:
+            niveles_ruido = estimar_piso_local(magnitudes, ancho_piso)
+        else:
+            niveles_ruido = estimar_nivel_ruido(magnitudes)
+    return niveles_ruido + margen_pico, niveles_ruido
+
+
+def analizar_captura(captura, margen_pico=MARGEN_PICO_DB, barridos_por_bloque=None, piso_local=False,
+                     ancho_piso=ANCHO_PISO_BINS, wavelet=None, cfar=None, progreso=None):
+    """
+    Analiza todos los barridos de una captura (ver `leer_csv_especial`).
+
+    El nivel de ruido y la detección de picos se calculan sobre la matriz
+    barridos x bins por bloques de `barridos_por_bloque` filas (por defecto, las
+    que caben en VALORES_POR_BLOQUE), y las características de todos los picos
+    del bloque con una sola llamada a `extraer_caracteristicas`. Con `piso_local`
+    se usa un piso de ruido deslizante de `ancho_piso` bins en lugar de un nivel
+    único por barrido, tanto para la altura mínima de los picos como para el SNR.
+    Con `wavelet` (p. ej. 'db4') la altura mínima y la detección de picos se calculan
+    sobre los barridos sin ruido (`eliminar_ruido_wavelet`), pero la amplitud, la
+    potencia de canal y el SNR se miden sobre los barridos originales: el nivel de
+    ruido del SNR se estima otra vez sobre ellos, con el mismo método. Con `cfar`
+    (ParametrosCFAR) la altura mínima de cada bin es el umbral CFAR y el nivel de
+    ruido del SNR es la estimación CFAR de ese bin; `margen_pico`, `piso_local` y
+    `ancho_piso` no se usan. Devuelve un
+    DataFrame con una fila por señal, identificada por el nombre del barrido
+    (su fecha y hora) y su posición en la matriz. Si se indica,
+    `progreso(barridos_analizados, total)` se llama después de cada bloque; una
+    excepción lanzada desde ahí interrumpe el análisis.
+    """
+    import pandas as pd
+
+    frecuencias = captura.frecuencias
+    nombres = np.asarray(captura.columnas[1:], dtype=object)
+    n_barridos, n_bins = captura.n_barridos, captura.n_bins
+    if barridos_por_bloque is None:
+        barridos_por_bloque = max(1, VALORES_POR_BLOQUE // max(n_bins, 1))
+
+    partes = {columna: [] for columna in COLUMNAS_MOTOR}
+    for inicio in range(0, n_barridos, barridos_por_bloque):
+        bloque = captura.bloque(inicio, inicio + barridos_por_bloque)
+        tamaño = {'barridos': len(bloque), 'bins': n_bins}
+        # La versión sin ruido solo decide dónde hay señales; los niveles se miden sobre `bloque`
+        filtrado = eliminar_ruido_wavelet(bloque, wavelet) if wavelet else bloque
+        umbrales, niveles_ruido = _estimar_ruido(filtrado, margen_pico, piso_local, ancho_piso, cfar)
+        if wavelet:
+            # El SNR compara el pico original con el ruido original, no con el piso suavizado
+            _, niveles_ruido = _estimar_ruido(bloque, margen_pico, piso_local, ancho_piso, cfar)
+        with perfil.etapa('detectar_picos', **tamaño) as medicion:
+            filas, indices_picos = detectar_picos(filtrado, umbrales)
+            medicion.salida(picos=len(indices_picos))
+
+        with perfil.etapa('caracteristicas', picos=len(indices_picos), bins=n_bins):
+            columnas = extraer_caracteristicas(frecuencias, bloque, indices_picos, niveles_ruido, filas=filas)
+        for columna, valores in columnas.items():
+            partes[columna].append(valores)
+        partes['Índice de barrido'].append(inicio + filas.astype(np.int64))
+        if progreso is not None:
+            progreso(inicio + len(bloque), n_barridos)
+
+    if not n_barridos:
+        return pd.DataFrame({columna: pd.Series(dtype=object if columna == 'Barrido' else np.float64)
+                             for columna in COLUMNAS_MOTOR})
+
+    tabla = {columna: np.concatenate(partes[columna]) for columna in COLUMNAS_MOTOR if columna != 'Barrido'}
+    tabla['Barrido'] = nombres[tabla['Índice de barrido']]
+    return pd.DataFrame(tabla, columns=COLUMNAS_MOTOR)
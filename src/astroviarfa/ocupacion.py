@@ -0,0 +1,457 @@
+"""
+Estadísticas de ocupación del espectro e interferencias a lo largo de muchos barridos.
+
+`EstadisticasEspectro` acumula, por bin y por banda del plan, la media y la
+varianza de la potencia (con la fórmula de Welford/Chan, un bloque de barridos a
+la vez), el máximo (max-hold), el número de barridos en que el bin estuvo ocupado
+y, por banda, las señales detectadas y las interferencias. La memoria es
+proporcional al número de bins y no al de barridos: la matriz de cada bloque se
+descarta después de acumularla. Dos acumuladores con el mismo eje de frecuencias
+y el mismo plan se combinan con `combinar`, así que cada archivo o proceso puede
+tener el suyo.
+
+El archivo guarda los barridos por columnas (una fila por bin), así que al leerlo
+llegan bloques de bins con todos los barridos. `AcumuladorLectura` los acumula a
+medida que `leer_csv_especial` los convierte, y `EstadisticasEspectro.agregar_csv`
+acumula un archivo sin cargar nunca la matriz.
+"""
+import numpy as np
+
+from . import perfil
+from .deteccion import (ANCHO_PISO_BINS, PERCENTIL_RUIDO, ancho_piso, dBm_to_mW, estimar_nivel_ruido,
+                        estimar_piso_local)
+from .lector import VALORES_POR_BLOQUE, leer_csv_especial
+from .satelites import SIN_SATELITE, Banda, obtener_plan
+
+# Un bin está ocupado en un barrido si supera el nivel de ruido en este margen
+MARGEN_OCUPACION_DB = 10.0
+
+# Las señales con un SNR menor que este se cuentan como interferencias
+UMBRAL_SNR_INTERFERENCIA_DB = 10.0
+
+
+def _combinar_momentos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    # Combinación de Chan de dos conjuntos (n, media, suma de cuadrados centrada)
+    n = n_a + n_b
+    if not n_b:
+        return n_a, media_a, m2_a
+    if not n_a:
+        return n_b, media_b, m2_b
+    delta = media_b - media_a
+    return n, media_a + delta * (n_b / n), m2_a + m2_b + delta * delta * (n_a * n_b / n)
+
+
+def _zonas(frecuencias, bandas):
+    # Tramos de bins [inicio, fin) de cada banda y, al final, los bins fuera de todas las bandas
+    zonas = []
+    fuera = np.ones(len(frecuencias), dtype=bool)
+    for banda in bandas:
+        inicio = np.searchsorted(frecuencias, banda.inicio, side='left')
+        fin = np.searchsorted(frecuencias, banda.fin, side='right')
+        zonas.append(np.array([[inicio, fin]], dtype=np.int64))
+        fuera[inicio:fin] = False
+    cambios = np.flatnonzero(np.diff(np.concatenate([[False], fuera, [False]]).astype(np.int8)))
+    zonas.append(cambios.reshape(-1, 2).astype(np.int64))
+    return zonas
+
+
+class EstadisticasEspectro:
+    """
+    Acumulador de ocupación e interferencias sobre un eje de frecuencias fijo.
+
+    `plan` es un PlanBandas, la ruta de un plan, una secuencia de Banda o None (plan
+    por defecto); sus bandas se fijan al crear el acumulador. Se consulta en
+    cualquier momento con `ocupacion()` (mapa por bin) y `bandas()` (resumen por banda).
+    """
+    __slots__ = ('frecuencias', 'bandas_plan', 'margen_db', 'umbral_snr_db', 'n_barridos', 'media', 'm2',
+                 'maximo', 'ocupados', 'potencia_banda', 'senales', 'interferencias', '_zonas')
+
+    def __init__(self, frecuencias, plan=None, margen_db=MARGEN_OCUPACION_DB,
+                 umbral_snr_db=UMBRAL_SNR_INTERFERENCIA_DB):
+        self.frecuencias = np.asarray(frecuencias, dtype=np.float64)
+        if isinstance(plan, (list, tuple)):
+            self.bandas_plan = tuple(Banda(*banda) for banda in plan)
+        else:
+            self.bandas_plan = tuple(Banda(*banda) for banda in obtener_plan(plan).indice.bandas)
+        self.margen_db = margen_db
+        self.umbral_snr_db = umbral_snr_db
+        n_bins, n_zonas = len(self.frecuencias), len(self.bandas_plan) + 1
+        self.n_barridos = 0
+        self.media = np.zeros(n_bins)
+        self.m2 = np.zeros(n_bins)
+        self.maximo = np.full(n_bins, -np.inf)
+        self.ocupados = np.zeros(n_bins, dtype=np.int64)
+        # Potencia de canal de cada zona (bandas y fuera del plan): media, m2 y máximo en dBm
+        self.potencia_banda = np.zeros((3, n_zonas))
+        self.potencia_banda[2] = -np.inf
+        self.senales = np.zeros(n_zonas, dtype=np.int64)
+        self.interferencias = np.zeros(n_zonas, dtype=np.int64)
+        self._zonas = _zonas(self.frecuencias, self.bandas_plan)
+
+    def actualizar(self, magnitudes, niveles_ruido=None):
+        """
+        Acumula un bloque de barridos (matriz barridos x bins en dBm, o un solo
+        barrido). `niveles_ruido` es un nivel por barrido o un piso por bin; si no se
+        indica se estima con `estimar_nivel_ruido`.
+        """
+        bloque = np.atleast_2d(np.asarray(magnitudes, dtype=np.float64))
+        if bloque.shape[1] != len(self.frecuencias):
+            raise ValueError(f"El bloque tiene {bloque.shape[1]} bins y el eje de frecuencias {len(self.frecuencias)}.")
+        if not len(bloque):
+            return
+        if niveles_ruido is None:
+            niveles_ruido = estimar_nivel_ruido(bloque)
+        niveles_ruido = np.asarray(niveles_ruido, dtype=np.float64)
+        if niveles_ruido.ndim < 2:
+            niveles_ruido = niveles_ruido.reshape(-1, 1)
+
+        n = len(bloque)
+        media = bloque.mean(axis=0)
+        m2 = ((bloque - media) ** 2).sum(axis=0)
+        # Potencia de canal de cada zona en cada barrido, con sumas acumuladas de la potencia lineal
+        acumulada = np.zeros((n, bloque.shape[1] + 1))
+        np.cumsum(dBm_to_mW(bloque), axis=1, out=acumulada[:, 1:])
+        potencias = np.column_stack([
+            (acumulada[:, tramos[:, 1]] - acumulada[:, tramos[:, 0]]).sum(axis=1) for tramos in self._zonas])
+        self._sumar(n, media, m2, bloque.max(axis=0),
+                    np.count_nonzero(bloque > niveles_ruido + self.margen_db, axis=0), potencias)
+
+    def _sumar(self, n, media, m2, maximo, ocupados, potencias):
+        # Incorpora `n` barridos ya resumidos: media, m2, máximo y barridos ocupados por bin
+        # y la potencia lineal (mW) de cada zona en cada barrido (matriz n x zonas)
+        n_total, self.media, self.m2 = _combinar_momentos(self.n_barridos, self.media, self.m2, n, media, m2)
+        np.maximum(self.maximo, maximo, out=self.maximo)
+        self.ocupados += ocupados
+        with np.errstate(divide='ignore'):
+            potencias = 10 * np.log10(potencias)
+        media_zona, m2_zona, maximo_zona = self.potencia_banda
+        # Zonas sin bins (bandas fuera del eje): su potencia queda en NaN en el resumen
+        validas = np.isfinite(potencias).all(axis=0)
+        media_b = np.where(validas, potencias.mean(axis=0), 0.0)
+        m2_b = np.where(validas, ((potencias - media_b) ** 2).sum(axis=0), 0.0)
+        _, media_zona, m2_zona = _combinar_momentos(self.n_barridos, media_zona, m2_zona, n, media_b, m2_b)
+        maximo_zona = np.maximum(maximo_zona, potencias.max(axis=0))
+        self.potencia_banda = np.vstack([media_zona, m2_zona, maximo_zona])
+        self.n_barridos = n_total
+
+    def agregar_captura(self, captura, barridos_por_bloque=None, piso_local=False, ancho_piso=ANCHO_PISO_BINS,
+                        progreso=None):
+        """
+        Acumula todos los barridos de una captura por bloques, con el mismo nivel de
+        ruido que `analizar_captura` (global por barrido o, con `piso_local`, deslizante).
+        `progreso(barridos_acumulados, total)` se llama después de cada bloque.
+        """
+        n_barridos, n_bins = captura.n_barridos, captura.n_bins
+        if barridos_por_bloque is None:
+            barridos_por_bloque = max(1, VALORES_POR_BLOQUE // max(n_bins, 1))
+        with perfil.etapa('ocupacion', barridos=n_barridos, bins=n_bins):
+            for inicio in range(0, n_barridos, barridos_por_bloque):
+                bloque = captura.bloque(inicio, inicio + barridos_por_bloque)
+                niveles_ruido = estimar_piso_local(bloque, ancho_piso) if piso_local else estimar_nivel_ruido(bloque)
+                self.actualizar(bloque, niveles_ruido)
+                if progreso is not None:
+                    progreso(inicio + len(bloque), n_barridos)
+
+    def agregar_senales(self, tabla):
+        """
+        Cuenta por banda las señales de una tabla de características y las que son
+        interferencias (SNR menor que `umbral_snr_db`).
+        """
+        centros = tabla['Frecuencia central [Hz]'].to_numpy(dtype=np.float64)
+        interferencia = tabla['Relación señal-ruido (SNR) [dB]'].to_numpy(dtype=np.float64) < self.umbral_snr_db
+        orden = np.argsort(centros)
+        centros = centros[orden]
+        interferencias_acumuladas = np.concatenate([[0], np.cumsum(interferencia[orden])])
+
+        dentro = np.zeros(len(centros), dtype=bool)
+        for i, banda in enumerate(self.bandas_plan):
+            inicio = np.searchsorted(centros, banda.inicio, side='left')
+            fin = np.searchsorted(centros, banda.fin, side='right')
+            self.senales[i] += fin - inicio
+            self.interferencias[i] += interferencias_acumuladas[fin] - interferencias_acumuladas[inicio]
+            dentro[inicio:fin] = True
+        self.senales[-1] += np.count_nonzero(~dentro)
+        self.interferencias[-1] += np.count_nonzero(interferencia[orden][~dentro])
+
+    def combinar(self, otro):
+        """
+        Incorpora las estadísticas de otro acumulador (otro archivo u otro proceso)
+        con el mismo eje de frecuencias, plan y umbrales. Devuelve este acumulador.
+        """
+        if not np.array_equal(self.frecuencias, otro.frecuencias):
+            raise ValueError("No se pueden combinar estadísticas con ejes de frecuencia distintos.")
+        if (self.bandas_plan, self.margen_db, self.umbral_snr_db) != (otro.bandas_plan, otro.margen_db,
+                                                                      otro.umbral_snr_db):
+            raise ValueError("No se pueden combinar estadísticas con planes de bandas o umbrales distintos.")
+        n_a, n_b = self.n_barridos, otro.n_barridos
+        self.n_barridos, self.media, self.m2 = _combinar_momentos(n_a, self.media, self.m2, n_b, otro.media, otro.m2)
+        self.maximo = np.maximum(self.maximo, otro.maximo)
+        self.ocupados = self.ocupados + otro.ocupados
+        _, media_zona, m2_zona = _combinar_momentos(n_a, self.potencia_banda[0], self.potencia_banda[1],
+                                                    n_b, otro.potencia_banda[0], otro.potencia_banda[1])
+        self.potencia_banda = np.vstack([media_zona, m2_zona,
+                                         np.maximum(self.potencia_banda[2], otro.potencia_banda[2])])
+        self.senales = self.senales + otro.senales
+        self.interferencias = self.interferencias + otro.interferencias
+        return self
+
+    def ocupacion(self):
+        """
+        Mapa por bin: porcentaje de barridos ocupados, max-hold, media y desvío de la potencia.
+        """
+        import pandas as pd
+
+        n = self.n_barridos
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'Frecuencia [Hz]': self.frecuencias,
+                'Ocupación [%]': 100 * self.ocupados / n if n else np.full(len(self.frecuencias), np.nan),
+                'Máximo [dBm]': np.where(n > 0, self.maximo, np.nan),
+                'Media [dBm]': self.media if n else np.full(len(self.frecuencias), np.nan),
+                'Desvío [dB]': np.sqrt(self.m2 / (n - 1)) if n > 1 else np.full(len(self.frecuencias), np.nan),
+            })
+
+    def bandas(self):
+        """
+        Resumen por banda del plan (y una fila para lo que queda fuera del plan):
+        ocupación, potencia de canal (media, desvío, máximo), señales e interferencias.
+        """
+        import pandas as pd
+
+        n = self.n_barridos
+        nombres = [banda.nombre for banda in self.bandas_plan] + [SIN_SATELITE]
+        bins = np.array([int((tramos[:, 1] - tramos[:, 0]).sum()) for tramos in self._zonas])
+        ocupados = np.array([sum(int(self.ocupados[inicio:fin].sum()) for inicio, fin in tramos)
+                             for tramos in self._zonas])
+        media, m2, maximo = self.potencia_banda
+        con_datos = (bins > 0) & (n > 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return pd.DataFrame({
+                'Banda': nombres,
+                'Frecuencia inicial [Hz]': [banda.inicio for banda in self.bandas_plan] + [np.nan],
+                'Frecuencia final [Hz]': [banda.fin for banda in self.bandas_plan] + [np.nan],
+                'Bins': bins,
+                'Ocupación [%]': np.where(con_datos, 100 * ocupados / (bins * max(n, 1)), np.nan),
+                'Potencia de canal media [dBm]': np.where(con_datos, media, np.nan),
+                'Desvío de potencia de canal [dB]': np.where(con_datos & (n > 1), np.sqrt(m2 / max(n - 1, 1)),
+                                                             np.nan),
+                'Potencia de canal máxima [dBm]': np.where(con_datos, maximo, np.nan),
+                'Señales': self.senales,
+                'Interferencias': self.interferencias,
+            })
+
+
+class _MenoresPorBarrido:
+    """
+    Los valores más bajos de cada barrido, acumulados por bloques de bins, para dar
+    al final exactamente el nivel de `estimar_nivel_ruido` sin guardar los barridos
+    completos: alcanzan los k + 2 menores (k, la posición del percentil) y cuántas
+    copias del mayor de ellos quedaron afuera, que cuentan cuando hay empates.
+    """
+    __slots__ = ('n_bins', 'cupo', 'menores', 'empates')
+
+    def __init__(self, n_bins, percentil=PERCENTIL_RUIDO):
+        self.n_bins = n_bins
+        self.cupo = min(int((n_bins - 1) * (percentil / 100)) + 2, n_bins)
+        self.menores = None
+        self.empates = None
+
+    def agregar(self, bloque):
+        bloque = np.asarray(bloque, dtype=np.float64)
+        if self.menores is None:
+            candidatos = bloque
+            self.empates = np.zeros(len(bloque), dtype=np.int64)
+        else:
+            candidatos = np.concatenate([self.menores, bloque], axis=1)
+        if candidatos.shape[1] <= self.cupo:
+            self.menores = np.array(candidatos)
+            return
+        particion = np.partition(candidatos, self.cupo - 1, axis=1)
+        limite = particion[:, self.cupo - 1]
+        afuera = np.count_nonzero(particion[:, self.cupo:] == limite[:, None], axis=1)
+        if self.menores is not None and self.menores.shape[1] == self.cupo:
+            # Las copias que ya habían quedado afuera siguen contando si el límite no bajó
+            afuera += np.where(limite == self.menores.max(axis=1), self.empates, 0)
+        self.menores = np.array(particion[:, :self.cupo])
+        self.empates = afuera
+
+    def niveles(self):
+        """
+        Nivel de ruido de cada barrido. Se reconstruyen los barridos con los valores
+        guardados, las copias del límite y +inf en lugar del resto, por grupos de barridos.
+        """
+        n_barridos, guardados = self.menores.shape
+        niveles = np.empty(n_barridos)
+        por_bloque = max(1, VALORES_POR_BLOQUE // max(self.n_bins, 1))
+        for inicio in range(0, n_barridos, por_bloque):
+            menores = self.menores[inicio:inicio + por_bloque]
+            filas = np.full((len(menores), max(self.n_bins, guardados)), np.inf)
+            filas[:, :guardados] = menores
+            copias = np.arange(filas.shape[1] - guardados) < self.empates[inicio:inicio + por_bloque, None]
+            filas[:, guardados:] = np.where(copias, menores.max(axis=1)[:, None], np.inf)
+            niveles[inicio:inicio + por_bloque] = estimar_nivel_ruido(filas)
+        return niveles
+
+
+class AcumuladorLectura:
+    """
+    Hook `al_leer_bloque` de `leer_csv_especial` que acumula las estadísticas de una
+    captura mientras se lee, un bloque de bins (con todos los barridos) a la vez: la
+    media, el m2 y el máximo de cada bin y la potencia lineal de cada zona del plan
+    en cada barrido se calculan sobre el bloque, que después se descarta.
+
+    Los bins ocupados dependen del nivel de ruido:
+
+    - con `piso_local`, el piso de un bin solo depende de sus vecinos: cada tramo se
+      cuenta cuando llega el bloque siguiente, con el contexto necesario a cada lado;
+    - con `niveles_ruido` (uno por barrido, p. ej. de una lectura anterior) se cuentan
+      en cada bloque;
+    - si no, el nivel global de un barrido solo se conoce con el barrido completo y
+      `terminar(captura)` los cuenta sobre la captura en memoria.
+
+    `terminar` devuelve el EstadisticasEspectro de la captura.
+    """
+    __slots__ = ('bandas_plan', 'margen_db', 'umbral_snr_db', 'piso_local', 'ancho_piso', 'niveles_ruido',
+                 '_frecuencias', '_leidos', '_media', '_m2', '_maximo', '_ocupados', '_potencias', '_ancho',
+                 '_contados', '_izquierda', '_pendiente')
+
+    def __init__(self, plan=None, margen_db=MARGEN_OCUPACION_DB, umbral_snr_db=UMBRAL_SNR_INTERFERENCIA_DB,
+                 piso_local=False, ancho_piso=ANCHO_PISO_BINS, niveles_ruido=None):
+        if isinstance(plan, (list, tuple)):
+            self.bandas_plan = tuple(Banda(*banda) for banda in plan)
+        else:
+            self.bandas_plan = tuple(Banda(*banda) for banda in obtener_plan(plan).indice.bandas)
+        self.margen_db = margen_db
+        self.umbral_snr_db = umbral_snr_db
+        self.piso_local = piso_local
+        self.ancho_piso = ancho_piso
+        self.niveles_ruido = None if niveles_ruido is None else np.asarray(niveles_ruido, dtype=np.float64)
+        self._frecuencias = None
+        self._leidos = 0
+        self._contados = 0
+        self._izquierda = None
+        self._pendiente = None
+
+    def __call__(self, inicio, total, frecuencias, magnitudes):
+        bloque = np.asarray(magnitudes, dtype=np.float64)
+        if self._frecuencias is None:
+            n_barridos = len(bloque)
+            self._frecuencias = np.empty(total)
+            self._media = np.empty(total)
+            self._m2 = np.empty(total)
+            self._maximo = np.empty(total)
+            self._ocupados = np.zeros(total, dtype=np.int64)
+            self._potencias = np.zeros((n_barridos, len(self.bandas_plan) + 1))
+            self._ancho = ancho_piso(self.ancho_piso, total)
+        fin = inicio + bloque.shape[1]
+        self._frecuencias[inicio:fin] = frecuencias
+        self._leidos = fin
+        if not len(bloque):
+            return
+
+        media = bloque.mean(axis=0)
+        self._media[inicio:fin] = media
+        self._m2[inicio:fin] = ((bloque - media) ** 2).sum(axis=0)
+        self._maximo[inicio:fin] = bloque.max(axis=0)
+        # Potencia lineal de cada zona: bins de cada banda (cerradas) y, al final, los de ninguna
+        en_bandas = [(frecuencias >= banda.inicio) & (frecuencias <= banda.fin) for banda in self.bandas_plan]
+        fuera = ~np.any(en_bandas, axis=0) if en_bandas else np.ones(len(frecuencias), dtype=bool)
+        self._potencias += dBm_to_mW(bloque) @ np.column_stack(en_bandas + [fuera]).astype(np.float64)
+
+        if self.piso_local:
+            self._contar_con_piso_local(bloque)
+        elif self.niveles_ruido is not None:
+            self._ocupados[inicio:fin] = np.count_nonzero(
+                bloque > self.niveles_ruido[:, None] + self.margen_db, axis=0)
+
+    def _contar_con_piso_local(self, bloque, final=False):
+        # Cuenta los bins pendientes que ya tienen `mitad` bins conocidos a la derecha
+        # (o todos, al final) con el piso calculado sobre el tramo y sus vecinos
+        mitad = self._ancho // 2
+        pendiente = bloque if self._pendiente is None else np.concatenate([self._pendiente, bloque], axis=1)
+        listos = pendiente.shape[1] if final else pendiente.shape[1] - mitad
+        if listos <= 0:
+            self._pendiente = pendiente
+            return
+        izquierda = self._izquierda
+        if izquierda is None:
+            # Primer tramo: se rellena por simetría, como `estimar_piso_local` con el barrido completo
+            izquierda = np.pad(pendiente, ((0, 0), (mitad, 0)), mode='symmetric')[:, :mitad]
+        if final:
+            conocidos = np.concatenate([izquierda, pendiente], axis=1) if self._izquierda is not None else pendiente
+            derecha = np.pad(conocidos, ((0, 0), (0, mitad)), mode='symmetric')[:, conocidos.shape[1]:]
+        else:
+            derecha = pendiente[:, listos:]
+        tramo = pendiente[:, :listos]
+        piso = estimar_piso_local(tramo, self._ancho, vecinos=(izquierda, derecha))
+        self._ocupados[self._contados:self._contados + listos] = np.count_nonzero(
+            tramo > piso + self.margen_db, axis=0)
+        self._contados += listos
+        vistos = np.concatenate([izquierda, tramo], axis=1)
+        self._izquierda = vistos[:, vistos.shape[1] - mitad:]
+        self._pendiente = pendiente[:, listos:]
+
+    def terminar(self, captura=None):
+        """
+        EstadisticasEspectro con todo lo leído. Con el nivel de ruido global y sin
+        `niveles_ruido`, los bins ocupados se cuentan sobre `captura` (la captura
+        leída, en memoria); sin ella se lanza ValueError.
+        """
+        n = self._leidos
+        frecuencias = self._frecuencias[:n] if self._frecuencias is not None else np.empty(0)
+        estadisticas = EstadisticasEspectro(frecuencias, self.bandas_plan, self.margen_db, self.umbral_snr_db)
+        if not n or not len(self._potencias):
+            return estadisticas
+        if self.piso_local:
+            if self._pendiente is not None and self._pendiente.shape[1]:
+                self._contar_con_piso_local(self._pendiente[:, :0], final=True)
+        elif self.niveles_ruido is None:
+            if captura is None or captura.n_bins != n:
+                raise ValueError("Con el nivel de ruido global hace falta la captura en memoria o `niveles_ruido`.")
+            barridos_por_bloque = max(1, VALORES_POR_BLOQUE // max(n, 1))
+            for inicio in range(0, captura.n_barridos, barridos_por_bloque):
+                bloque = captura.bloque(inicio, inicio + barridos_por_bloque)
+                self._ocupados += np.count_nonzero(
+                    bloque > estimar_nivel_ruido(bloque)[:, None] + self.margen_db, axis=0)
+        estadisticas._sumar(len(self._potencias), self._media[:n], self._m2[:n], self._maximo[:n],
+                            self._ocupados[:n], self._potencias)
+        return estadisticas
+
+
+def estadisticas_csv(ruta_archivo, plan=None, margen_db=MARGEN_OCUPACION_DB,
+                     umbral_snr_db=UMBRAL_SNR_INTERFERENCIA_DB, dtype=np.float32, piso_local=False,
+                     ancho_piso=ANCHO_PISO_BINS, progreso=None):
+    """
+    EstadisticasEspectro de una captura leída directamente del archivo, sin cargar
+    nunca la matriz: cada bloque de bins se acumula al convertirlo (ver
+    `AcumuladorLectura`). El nivel de ruido global de un barrido solo se conoce al
+    final del archivo, así que sin `piso_local` hay una primera lectura que guarda
+    los valores más bajos de cada barrido (la quinta parte, ver `_MenoresPorBarrido`)
+    y una segunda que acumula. `dtype` es la precisión con que se toman las
+    magnitudes, como en `leer_csv_especial`; `progreso(bins_leidos, total)` cuenta los
+    bins de todas las lecturas. Las señales se agregan aparte con `agregar_senales`.
+    """
+    lecturas = 1 if piso_local else 2
+
+    def avance(lectura):
+        if progreso is None:
+            return None
+        return lambda hechos, total: progreso(lectura * total + hechos, lecturas * total)
+
+    niveles_ruido = None
+    with perfil.etapa('ocupacion_csv', lecturas=lecturas) as medicion:
+        if not piso_local:
+            menores = []
+
+            def guardar_menores(inicio, total, frecuencias, magnitudes):
+                if not menores:
+                    menores.append(_MenoresPorBarrido(total))
+                menores[0].agregar(magnitudes)
+
+            leer_csv_especial(ruta_archivo, dtype, avance(0), guardar_menores, conservar=False)
+            niveles_ruido = menores[0].niveles() if menores else np.empty(0)
+        acumulador = AcumuladorLectura(plan, margen_db, umbral_snr_db, piso_local, ancho_piso, niveles_ruido)
+        leer_csv_especial(ruta_archivo, dtype, avance(lecturas - 1), acumulador, conservar=False)
+        estadisticas = acumulador.terminar()
+        medicion.salida(barridos=estadisticas.n_barridos, bins=len(estadisticas.frecuencias))
+    return estadisticas
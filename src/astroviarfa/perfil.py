@@ -0,0 +1,200 @@
+"""
+Instrumentación por etapas del análisis: tiempo real, tiempo de CPU, memoria
+máxima y tamaños de entrada y salida de cada etapa.
+
+    with perfil.etapa('detectar_picos', bins=n_bins, barridos=n_barridos) as medicion:
+        ...
+        medicion.salida(picos=len(indices))
+
+Desactivada (por defecto), `etapa` devuelve siempre el mismo objeto nulo y el costo
+es una comparación por etapa. Se activa con `activar()` o con la variable de
+entorno ASTROVIARFA_PERFIL (ruta de un archivo JSON lines), que también heredan
+los procesos del análisis por lotes. La memoria se mide con `tracemalloc`, que
+solo está en marcha mientras la instrumentación está activa; es la del proceso,
+así que con varias etapas en paralelo en distintos hilos se mezclan.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+# Variable de entorno con la ruta del archivo JSON lines donde se agregan los registros
+VARIABLE_ENTORNO = 'ASTROVIARFA_PERFIL'
+
+# Registros que se conservan en memoria para el panel de diagnóstico
+MAX_REGISTROS = 10_000
+
+registros = deque(maxlen=MAX_REGISTROS)
+
+_activo = False
+_ruta_jsonl = None
+_tracemalloc_propio = False
+_bloqueo = threading.Lock()
+_pilas = threading.local()
+
+
+class _MedicionNula:
+    """
+    Etapa sin medir: lo que devuelve `etapa` con la instrumentación desactivada.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+    def salida(self, **tamaños):
+        pass
+
+
+_NULA = _MedicionNula()
+
+
+class Medicion:
+    """
+    Medición de una etapa. Las etapas anidadas (en el mismo hilo) se registran por
+    separado y su memoria máxima cuenta también para la etapa que las contiene.
+    """
+    __slots__ = ('nombre', 'entrada', 'tamaños_salida', 'nivel', '_inicio', '_inicio_cpu', '_memoria_inicial',
+                 '_pico_hijas')
+
+    def __init__(self, nombre, entrada):
+        self.nombre = nombre
+        self.entrada = entrada
+        self.tamaños_salida = {}
+        self.nivel = 0
+        self._pico_hijas = 0
+
+    def salida(self, **tamaños):
+        """
+        Registra el tamaño del resultado de la etapa (p. ej. picos=..., filas=...).
+        """
+        self.tamaños_salida.update(tamaños)
+
+    def __enter__(self):
+        pila = _pila()
+        self.nivel = len(pila)
+        memoria_actual, pico = tracemalloc.get_traced_memory()
+        if pila:
+            # El pico acumulado hasta aquí pertenece a la etapa que contiene a esta
+            pila[-1]._pico_hijas = max(pila[-1]._pico_hijas, pico)
+        tracemalloc.reset_peak()
+        self._memoria_inicial = memoria_actual
+        pila.append(self)
+        self._inicio_cpu = time.thread_time()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        segundos = time.perf_counter() - self._inicio
+        cpu = time.thread_time() - self._inicio_cpu
+        pico = max(tracemalloc.get_traced_memory()[1], self._pico_hijas)
+        pila = _pila()
+        pila.pop()
+        if pila:
+            pila[-1]._pico_hijas = max(pila[-1]._pico_hijas, pico)
+        _registrar({
+            'etapa': self.nombre,
+            'inicio': time.time() - segundos,
+            'segundos': segundos,
+            'cpu_s': cpu,
+            'memoria_pico_bytes': max(pico - self._memoria_inicial, 0),
+            'entrada': self.entrada,
+            'salida': self.tamaños_salida,
+            'nivel': self.nivel,
+            'pid': os.getpid(),
+            'hilo': threading.current_thread().name,
+            'error': None if tipo is None else f"{tipo.__name__}: {valor}",
+        })
+        return False
+
+
+def _pila():
+    if not hasattr(_pilas, 'etapas'):
+        _pilas.etapas = []
+    return _pilas.etapas
+
+
+def _registrar(registro):
+    registros.append(registro)
+    if _ruta_jsonl is not None:
+        linea = json.dumps(registro, ensure_ascii=False, default=str) + '\n'
+        with _bloqueo, open(_ruta_jsonl, 'a', encoding='utf-8') as archivo:
+            archivo.write(linea)
+
+
+def etapa(nombre, **entrada):
+    """
+    Context manager que mide la etapa `nombre`; `entrada` describe el tamaño de los
+    datos de entrada (bins, barridos, ...). Sin instrumentación activa no mide nada.
+    """
+    if not _activo:
+        return _NULA
+    return Medicion(nombre, entrada)
+
+
+def activo():
+    return _activo
+
+
+def activar(ruta_jsonl=None):
+    """
+    Activa la instrumentación. Con `ruta_jsonl` cada registro se agrega además a ese
+    archivo, y la ruta se publica en ASTROVIARFA_PERFIL para los procesos hijos.
+    """
+    global _activo, _ruta_jsonl, _tracemalloc_propio
+    _ruta_jsonl = ruta_jsonl
+    if ruta_jsonl is not None:
+        os.environ[VARIABLE_ENTORNO] = ruta_jsonl
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _tracemalloc_propio = True
+    _activo = True
+
+
+def desactivar():
+    global _activo, _ruta_jsonl, _tracemalloc_propio
+    _activo = False
+    _ruta_jsonl = None
+    os.environ.pop(VARIABLE_ENTORNO, None)
+    # tracemalloc solo se detiene si lo inició `activar`
+    if _tracemalloc_propio:
+        tracemalloc.stop()
+        _tracemalloc_propio = False
+
+
+def limpiar():
+    registros.clear()
+
+
+def exportar_jsonl(ruta_archivo, registros_a_exportar=None):
+    """
+    Escribe los registros (por defecto, los guardados en memoria) como JSON lines.
+    """
+    with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
+        for registro in list(registros if registros_a_exportar is None else registros_a_exportar):
+            archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+
+
+def resumen(registros_a_resumir=None):
+    """
+    Tabla con el total por etapa (llamadas, segundos, CPU y memoria máxima), de la
+    etapa más lenta a la más rápida.
+    """
+    import pandas as pd
+
+    tabla = pd.DataFrame(list(registros if registros_a_resumir is None else registros_a_resumir),
+                         columns=['etapa', 'segundos', 'cpu_s', 'memoria_pico_bytes'])
+    return (tabla.groupby('etapa')
+            .agg(llamadas=('segundos', 'size'), segundos=('segundos', 'sum'), cpu_s=('cpu_s', 'sum'),
+                 memoria_pico_bytes=('memoria_pico_bytes', 'max'))
+            .sort_values('segundos', ascending=False)
+            .reset_index())
+
+
+if os.environ.get(VARIABLE_ENTORNO):
+    activar(os.environ[VARIABLE_ENTORNO])
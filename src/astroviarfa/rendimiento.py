@@ -0,0 +1,317 @@
+"""
+Pruebas de rendimiento sin interfaz gráfica:
+
+    python -m astroviarfa.rendimiento --bins 10000 100000 1000000 --barridos 1 10 100 -o rendimiento.json
+
+Para cada tamaño de la grilla se genera (una sola vez) una captura sintética y se
+mide cada etapa del análisis. El resultado es un JSON con el entorno y una medición
+por etapa y tamaño, y el exponente de escala de cada etapa (pendiente log-log del
+tiempo frente al número de valores). Con `--comparar anterior.json` se informan
+las etapas que se volvieron más lentas que la versión anterior.
+
+También se mide, en un proceso nuevo, el tiempo de `import astroviarfa` (etapa
+'importar') y qué dependencias pesadas carga: el núcleo solo debe cargar NumPy.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import scipy
+from scipy.signal import find_peaks
+
+from .almacen import AlmacenResultados
+from .caracteristicas import extraer_caracteristicas
+from .deteccion import MARGEN_PICO_DB, detectar_picos, estimar_nivel_ruido, umbral_cfar
+from .lector import leer_csv_especial
+from .lote import guardar_tabla
+from .filtrado import eliminar_ruido_wavelet
+from .motor import analizar_captura
+from .ocupacion import EstadisticasEspectro
+from .satelites import asignar_satelites
+from .sintetico import generar_captura
+from .tiempos import IndiceBarridos
+
+VERSION_FORMATO = 1
+
+BINS_POR_DEFECTO = [10_000, 100_000, 1_000_000]
+BARRIDOS_POR_DEFECTO = [1, 10, 100]
+REPETICIONES = 3
+
+# Una etapa es más lenta que la referencia si tarda más que este factor
+UMBRAL_REGRESION = 1.2
+
+# Las mediciones más cortas que esto no se comparan: dominan el ruido y la resolución del reloj
+MINIMO_COMPARABLE_S = 1e-3
+
+# Dependencias que `import astroviarfa` no debe cargar; se cargan al usar la etapa que las necesita
+MODULOS_PESADOS = ('pandas', 'scipy', 'matplotlib', 'tkinter', 'pywt', 'xlsxwriter', 'pyarrow')
+
+_CODIGO_IMPORTACION = """
+import json, sys, time
+inicio = time.perf_counter()
+import astroviarfa
+segundos = time.perf_counter() - inicio
+print(json.dumps({'segundos': segundos, 'modulos': [m for m in %r if m in sys.modules]}))
+"""
+
+
+def medir(funcion, repeticiones=REPETICIONES):
+    """
+    Ejecuta `funcion()` `repeticiones` veces y devuelve (último resultado, tiempos en s).
+    """
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return resultado, tiempos
+
+
+def medir_importacion(repeticiones=REPETICIONES):
+    """
+    Tiempo de `import astroviarfa` en un proceso nuevo (sin módulos ya cargados) y
+    dependencias pesadas que quedan cargadas. Devuelve un diccionario con 'tiempos'
+    y 'modulos_pesados'.
+    """
+    entorno_hijo = dict(os.environ)
+    directorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    entorno_hijo['PYTHONPATH'] = os.pathsep.join(filter(None, [directorio, entorno_hijo.get('PYTHONPATH')]))
+    tiempos, modulos = [], []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-c', _CODIGO_IMPORTACION % (MODULOS_PESADOS,)], env=entorno_hijo,
+                                capture_output=True, text=True, check=True).stdout
+        resultado = json.loads(salida.strip().splitlines()[-1])
+        tiempos.append(resultado['segundos'])
+        modulos = resultado['modulos']
+    return {'tiempos': tiempos, 'modulos_pesados': modulos}
+
+
+def _picos_por_barrido(magnitudes, niveles_ruido):
+    # Camino de la interfaz: `find_peaks` de SciPy sobre cada barrido
+    return [find_peaks(fila, height=nivel + MARGEN_PICO_DB)[0] for fila, nivel in zip(magnitudes, niveles_ruido)]
+
+
+def _exportar_excel(tabla, ruta_salida):
+    guardar_tabla(tabla, ruta_salida)
+    return os.path.getsize(ruta_salida)
+
+
+def medir_captura(ruta_archivo, directorio, repeticiones=REPETICIONES):
+    """
+    Mide cada etapa del análisis sobre una captura y devuelve un diccionario
+    {etapa: {'tiempos': [...], ...}}. Las etapas que no se pueden ejecutar
+    (p. ej. falta xlsxwriter) se registran con su error.
+    """
+    etapas = {}
+
+    def registrar(etapa, funcion, **extra):
+        try:
+            resultado, tiempos = medir(funcion, repeticiones)
+        except Exception as e:
+            etapas[etapa] = {'error': f"{type(e).__name__}: {e}"}
+            return None
+        etapas[etapa] = {'tiempos': tiempos, **extra}
+        return resultado
+
+    captura = registrar('leer_csv_especial', lambda: leer_csv_especial(ruta_archivo))
+    if captura is None:
+        return etapas
+    frecuencias = captura.frecuencias
+    magnitudes = captura.bloque()
+
+    registrar('indice_barridos', lambda: IndiceBarridos(captura.columnas[1:]))
+    # Sin PyWavelets la etapa queda registrada con su error
+    registrar('eliminar_ruido_wavelet', lambda: eliminar_ruido_wavelet(magnitudes))
+    registrar('umbral_cfar', lambda: umbral_cfar(magnitudes))
+    # Cada etapa de la cadena usa el resultado de la anterior: si una falla, las siguientes no se miden
+    niveles_ruido = registrar('estimar_nivel_ruido', lambda: estimar_nivel_ruido(magnitudes))
+    if niveles_ruido is not None:
+        registrar('find_peaks', lambda: _picos_por_barrido(magnitudes, niveles_ruido))
+        picos = registrar('detectar_picos', lambda: detectar_picos(magnitudes, niveles_ruido + MARGEN_PICO_DB))
+        if picos is not None:
+            filas, indices_picos = picos
+            caracteristicas = registrar(
+                'extraer_caracteristicas',
+                lambda: extraer_caracteristicas(frecuencias, magnitudes, indices_picos, niveles_ruido, filas=filas),
+                n_senales=int(len(indices_picos)))
+            if caracteristicas is not None:
+                registrar('asignar_satelites',
+                          lambda: asignar_satelites(caracteristicas['Frecuencia central [Hz]']))
+    registrar('ocupacion', lambda: EstadisticasEspectro(frecuencias).agregar_captura(captura))
+    tabla = registrar('analizar_captura', lambda: analizar_captura(captura))
+    if tabla is not None:
+        tabla['Satélite'] = asignar_satelites(tabla['Frecuencia central [Hz]'])
+        registrar('exportar_excel', lambda: _exportar_excel(tabla, os.path.join(directorio, 'rendimiento.xlsx')),
+                  n_filas=len(tabla))
+        tabla.insert(0, 'Archivo', ruta_archivo)
+        with AlmacenResultados(os.path.join(directorio, 'rendimiento.sqlite')) as almacen:
+            registrar('almacen_agregar', lambda: almacen.agregar(tabla, reemplazar=True), n_filas=len(tabla))
+            almacen.optimizar()
+            centro = float(np.median(tabla['Frecuencia central [Hz]'])) if len(tabla) else 0.0
+            registrar('almacen_consultar', lambda: len(almacen.consultar(frecuencia_min=centro - 1e5,
+                                                                         frecuencia_max=centro + 1e5, snr_max=10)))
+    return etapas
+
+
+def entorno():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+    }
+
+
+def exponentes_escala(mediciones):
+    """
+    Pendiente log-log del tiempo mínimo frente al número de valores de cada etapa
+    (1 = lineal). Solo para etapas medidas en al menos dos tamaños distintos.
+    """
+    exponentes = {}
+    for etapa in sorted({medicion['etapa'] for medicion in mediciones}):
+        puntos = sorted((m['valores'], m['segundos_min']) for m in mediciones
+                        if m['etapa'] == etapa and m['segundos_min'] > 0)
+        if len({valores for valores, _ in puntos}) < 2:
+            continue
+        x, y = np.log(np.array(puntos, dtype=np.float64)).T
+        exponentes[etapa] = round(float(np.polyfit(x, y, 1)[0]), 3)
+    return exponentes
+
+
+def ejecutar(bins, barridos, directorio, repeticiones=REPETICIONES, n_portadoras=8, inclinacion_db=0.0,
+             semilla=0, informar=None):
+    """
+    Mide todas las etapas en la grilla `bins` x `barridos` y devuelve el informe
+    (diccionario serializable a JSON). Las capturas generadas se reutilizan entre ejecuciones.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    mediciones = []
+    importacion = medir_importacion(repeticiones)
+    tiempos = importacion.pop('tiempos')
+    mediciones.append({'etapa': 'importar', 'n_bins': 0, 'n_barridos': 0, 'valores': 0, 'bytes_archivo': 0,
+                       'segundos_min': min(tiempos), 'segundos_mediana': float(np.median(tiempos)),
+                       'repeticiones': len(tiempos), **importacion})
+    if informar is not None:
+        informar(mediciones[-1])
+    for n_bins in bins:
+        for n_barridos in barridos:
+            ruta = os.path.join(directorio, f"sintetico_{n_bins}x{n_barridos}_p{n_portadoras}"
+                                            f"_i{inclinacion_db:g}_s{semilla}.csv")
+            if not os.path.exists(ruta):
+                generar_captura(ruta + '.tmp', n_bins, n_barridos, n_portadoras, inclinacion_db, semilla=semilla)
+                os.replace(ruta + '.tmp', ruta)
+            for etapa, datos in medir_captura(ruta, directorio, repeticiones).items():
+                medicion = {'etapa': etapa, 'n_bins': n_bins, 'n_barridos': n_barridos,
+                            'valores': n_bins * n_barridos, 'bytes_archivo': os.path.getsize(ruta)}
+                if 'error' in datos:
+                    medicion.update(segundos_min=None, segundos_mediana=None, error=datos['error'])
+                else:
+                    tiempos = datos.pop('tiempos')
+                    medicion.update(segundos_min=min(tiempos), segundos_mediana=float(np.median(tiempos)),
+                                    repeticiones=len(tiempos), **datos)
+                mediciones.append(medicion)
+                if informar is not None:
+                    informar(medicion)
+
+    validas = [m for m in mediciones if m['segundos_min'] is not None]
+    return {
+        'version': VERSION_FORMATO,
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'entorno': entorno(),
+        'parametros': {'repeticiones': repeticiones, 'n_portadoras': n_portadoras,
+                       'inclinacion_db': inclinacion_db, 'semilla': semilla},
+        'mediciones': mediciones,
+        'exponentes': exponentes_escala(validas),
+    }
+
+
+def comparar(informe, referencia, umbral=UMBRAL_REGRESION):
+    """
+    Devuelve las mediciones de `informe` que tardan más de `umbral` veces lo mismo
+    en `referencia`, como tuplas (etapa, n_bins, n_barridos, razón).
+    """
+    anteriores = {(m['etapa'], m['n_bins'], m['n_barridos']): m['segundos_min']
+                  for m in referencia['mediciones'] if m.get('segundos_min')}
+    regresiones = []
+    for medicion in informe['mediciones']:
+        anterior = anteriores.get((medicion['etapa'], medicion['n_bins'], medicion['n_barridos']))
+        if (anterior and medicion['segundos_min'] is not None
+                and max(anterior, medicion['segundos_min']) >= MINIMO_COMPARABLE_S):
+            razon = medicion['segundos_min'] / anterior
+            if razon > umbral:
+                regresiones.append((medicion['etapa'], medicion['n_bins'], medicion['n_barridos'], razon))
+        if medicion.get('modulos_pesados'):
+            # Que el núcleo cargue una dependencia pesada es una regresión aunque el tiempo no cambie
+            regresiones.append((medicion['etapa'], medicion['n_bins'], medicion['n_barridos'], float('inf')))
+    return regresiones
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='astroviarfa.rendimiento',
+        description="Mide el tiempo de cada etapa del análisis sobre capturas sintéticas de varios tamaños.",
+    )
+    parser.add_argument('--bins', type=int, nargs='+', default=BINS_POR_DEFECTO, help="Bins por barrido.")
+    parser.add_argument('--barridos', type=int, nargs='+', default=BARRIDOS_POR_DEFECTO,
+                        help="Barridos por captura.")
+    parser.add_argument('--portadoras', type=int, default=8, help="Portadoras en cada captura sintética.")
+    parser.add_argument('--inclinacion', type=float, default=0.0,
+                        help="Inclinación del piso de ruido a lo largo de la banda, en dB.")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES,
+                        help="Repeticiones de cada medición (se informa el mínimo y la mediana).")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--directorio', default=os.path.join(tempfile.gettempdir(), 'astroviarfa-rendimiento'),
+                        help="Directorio para las capturas sintéticas (se reutilizan entre ejecuciones).")
+    parser.add_argument('-o', '--salida', default='rendimiento.json', help="Archivo JSON con los resultados.")
+    parser.add_argument('--comparar', default=None, help="JSON de una ejecución anterior para detectar regresiones.")
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION,
+                        help="Factor de tiempo a partir del cual una etapa se considera una regresión.")
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+
+    def informar(medicion):
+        if medicion['segundos_min'] is None:
+            resumen = f"ERROR {medicion['error']}"
+        else:
+            resumen = f"{medicion['segundos_min'] * 1e3:10.2f} ms"
+        print(f"{medicion['n_bins']:>9} x {medicion['n_barridos']:<5} {medicion['etapa']:<25} {resumen}",
+              file=sys.stderr)
+
+    informe = ejecutar(args.bins, args.barridos, args.directorio, args.repeticiones, args.portadoras,
+                       args.inclinacion, args.semilla, informar)
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, ensure_ascii=False, indent=1)
+    for etapa, exponente in informe['exponentes'].items():
+        print(f"{etapa:<25} exponente de escala {exponente:.2f}", file=sys.stderr)
+    print(f"Resultados guardados en {args.salida}", file=sys.stderr)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            regresiones = comparar(informe, json.load(archivo), args.umbral)
+        for etapa, n_bins, n_barridos, razon in regresiones:
+            if razon == float('inf'):
+                print(f"REGRESIÓN {etapa}: `import astroviarfa` carga {', '.join(informe['mediciones'][0]['modulos_pesados'])}",
+                      file=sys.stderr)
+                continue
+            print(f"REGRESIÓN {etapa} ({n_bins} x {n_barridos}): {razon:.2f} veces más lento", file=sys.stderr)
+        return 1 if regresiones else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Asignación de las señales detectadas a satélites según su frecuencia central.
+
+Las bandas (nombre, inicio, fin, prioridad) vienen de un plan de bandas. El plan
+se compila en un índice de intervalos elementales ordenados, con los solapamientos
+ya resueltos, y todas las frecuencias se asignan con un único `np.searchsorted`.
+"""
+import csv
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from . import perfil
+
+Banda = namedtuple('Banda', ['nombre', 'inicio', 'fin', 'prioridad'])
+
+# Rangos de frecuencia de los satélites en Hz
+RANGO_MISC = (400e6, 450e6)
+RANGO_FACSAT = (430e6, 440e6)
+
+PLAN_POR_DEFECTO = [
+    Banda('EM MISC', *RANGO_MISC, 0),
+    Banda('EM FACSAT', *RANGO_FACSAT, 0),
+]
+
+SIN_SATELITE = 'Desconocido'
+
+# Columnas del archivo del plan de bandas (CSV con ';'; la prioridad es opcional)
+COLUMNAS_PLAN = ['nombre', 'inicio_hz', 'fin_hz', 'prioridad']
+
+
+def _resolver(bandas):
+    # Ganan las bandas de mayor prioridad; si empatan, se nombran todas en el orden del plan
+    if not bandas:
+        return SIN_SATELITE
+    prioridad = max(banda.prioridad for banda in bandas)
+    return ' & '.join(banda.nombre for banda in bandas if banda.prioridad == prioridad)
+
+
+class IndiceBandas:
+    """
+    Plan de bandas compilado. Los bordes de todas las bandas, ordenados, dividen el eje
+    en puntos (los propios bordes, porque las bandas son cerradas) y tramos abiertos
+    entre bordes consecutivos; cada uno guarda su etiqueta ya resuelta.
+    """
+    __slots__ = ('bandas', 'bordes', 'etiquetas_bordes', 'etiquetas_tramos')
+
+    def __init__(self, bandas):
+        self.bandas = list(bandas)
+        self.bordes = np.unique([valor for banda in self.bandas for valor in (banda.inicio, banda.fin)])
+
+        # Punto representativo de cada tramo abierto (los extremos no pertenecen a ninguna banda)
+        medios = (self.bordes[:-1] + self.bordes[1:]) / 2
+        self.etiquetas_bordes = np.array(
+            [_resolver([b for b in self.bandas if b.inicio <= x <= b.fin]) for x in self.bordes], dtype=object)
+        self.etiquetas_tramos = np.array(
+            [SIN_SATELITE] + [_resolver([b for b in self.bandas if b.inicio <= x <= b.fin]) for x in medios]
+            + [SIN_SATELITE], dtype=object)
+
+    def asignar(self, frecuencias):
+        """
+        Devuelve la etiqueta de cada frecuencia con una sola búsqueda binaria vectorizada.
+        """
+        frecuencias = np.asarray(frecuencias, dtype=np.float64)
+        if not len(self.bordes):
+            return np.full(frecuencias.shape, SIN_SATELITE, dtype=object)
+        posiciones = np.searchsorted(self.bordes, frecuencias, side='left')
+        en_borde = self.bordes[np.minimum(posiciones, len(self.bordes) - 1)] == frecuencias
+        return np.where(en_borde,
+                        self.etiquetas_bordes[np.minimum(posiciones, len(self.bordes) - 1)],
+                        self.etiquetas_tramos[posiciones])
+
+
+def _numero(texto):
+    return float(texto.strip().replace(',', '.'))
+
+
+def leer_plan_bandas(ruta_archivo):
+    """
+    Lee un plan de bandas en CSV separado por ';' con las columnas
+    nombre;inicio_hz;fin_hz[;prioridad]. Las líneas que empiezan con '#' se ignoran.
+    """
+    bandas = []
+    with open(ruta_archivo, encoding='utf-8-sig', newline='') as archivo:
+        filas = csv.DictReader((linea for linea in archivo if not linea.lstrip().startswith('#')), delimiter=';')
+        faltantes = set(COLUMNAS_PLAN[:3]) - set(filas.fieldnames or [])
+        if faltantes:
+            raise ValueError(f"Faltan columnas en el plan de bandas: {', '.join(sorted(faltantes))}")
+        for numero, fila in enumerate(filas, start=2):
+            try:
+                banda = Banda(fila['nombre'].strip(), _numero(fila['inicio_hz']), _numero(fila['fin_hz']),
+                              _numero(fila.get('prioridad') or '0'))
+            except (AttributeError, ValueError):
+                raise ValueError(f"Línea {numero} del plan de bandas no válida: {fila}") from None
+            if banda.inicio > banda.fin:
+                raise ValueError(f"Línea {numero} del plan de bandas: el inicio es mayor que el fin.")
+            bandas.append(banda)
+    return bandas
+
+
+class PlanBandas:
+    """
+    Plan de bandas leído de un archivo (o el plan por defecto si `ruta` es None).
+    Antes de cada asignación comprueba si el archivo cambió y, si es así, vuelve a
+    compilar el índice, de modo que editar el archivo surte efecto sin reiniciar.
+    """
+    __slots__ = ('ruta', 'indice', '_firma')
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta
+        self.indice = None
+        self._firma = None
+        self.recargar()
+
+    def recargar(self):
+        """
+        Vuelve a compilar el índice si el archivo cambió. Devuelve True si se recompiló.
+        Si el archivo modificado no es válido, se lanza el error y se conserva el índice anterior.
+        """
+        if self.ruta is None:
+            if self.indice is None:
+                self.indice = IndiceBandas(PLAN_POR_DEFECTO)
+                return True
+            return False
+        estado = os.stat(self.ruta)
+        firma = (estado.st_size, estado.st_mtime_ns)
+        if firma == self._firma:
+            return False
+        self.indice = IndiceBandas(leer_plan_bandas(self.ruta))
+        self._firma = firma
+        return True
+
+    def asignar(self, frecuencias):
+        self.recargar()
+        return self.indice.asignar(frecuencias)
+
+
+# Planes ya compilados por ruta, para no releer el archivo en cada llamada
+_planes = {}
+
+
+def obtener_plan(plan=None):
+    """
+    Devuelve un PlanBandas a partir de un PlanBandas, una ruta o None (plan por defecto).
+    """
+    if isinstance(plan, PlanBandas):
+        return plan
+    if plan not in _planes:
+        _planes[plan] = PlanBandas(plan)
+    return _planes[plan]
+
+
+def olvidar_planes():
+    """
+    Descarta los planes compilados por `obtener_plan` (p. ej. entre pruebas): la
+    próxima asignación vuelve a leer cada archivo.
+    """
+    _planes.clear()
+
+
+def asignar_satelites(frecuencias_centrales, plan=None):
+    """
+    Devuelve el satélite de cada señal a partir de su frecuencia central, para
+    todas las señales a la vez. `plan` es un PlanBandas, la ruta de un archivo de
+    plan de bandas o None para los rangos por defecto.
+    """
+    with perfil.etapa('asignar_satelites', senales=len(frecuencias_centrales)):
+        return obtener_plan(plan).asignar(frecuencias_centrales)
@@ -0,0 +1,239 @@
+"""
+Seguimiento de señales entre barridos.
+
+Cada barrido nuevo entrega sus picos (frecuencia central, potencia y ancho de
+banda). Los picos se ordenan por frecuencia y cada uno se asocia a la pista activa
+más cercana con una búsqueda binaria sobre las frecuencias de las pistas, siempre
+que la distancia no supere la tolerancia; si dos picos eligen la misma pista gana
+el más cercano y el otro abre una pista nueva. Las estadísticas de cada pista se
+actualizan de forma incremental, así que el costo por barrido es O(P log P) y no
+hace falta guardar las tablas de características de todos los barridos.
+
+Las pistas envejecen según el número real de cada barrido: los barridos sin
+detecciones (que no figuran en la tabla de características) también cuentan como
+barridos sin la señal.
+"""
+import numpy as np
+
+from .tiempos import segundos_barridos
+
+# Distancia máxima entre la frecuencia de un pico y la última de una pista para asociarlos
+TOLERANCIA_HZ = 25e3
+
+# Barridos seguidos sin detección tras los que una pista se cierra
+MAX_BARRIDOS_PERDIDA = 3
+
+CAPACIDAD_INICIAL = 64
+
+_CAMPOS = [
+    'barrido_inicial', 'barrido_final', 'detecciones',
+    't_inicial', 't_final', 'f_inicial', 'f_final', 'f_min', 'f_max',
+    'potencia_media', 'potencia_m2', 'potencia_max', 'suma_ancho',
+    # Sumas centradas en (t_inicial, f_inicial) para la recta de la deriva
+    'suma_t', 'suma_f', 'suma_tt', 'suma_tf',
+]
+
+
+class SeguidorSenales:
+    """
+    Asocia los picos de barridos sucesivos en pistas y acumula por pista la
+    deriva de frecuencia (pendiente de la recta frecuencia-tiempo), la potencia
+    (media, desvío y máximo con Welford), el ancho de banda medio y la duración.
+
+    Los instantes de los barridos se pasan en segundos; si no se indican se usa el
+    número de barrido, y la deriva y la duración quedan en unidades de barrido.
+    `n_barridos` es el número del barrido siguiente al último incorporado.
+    """
+    __slots__ = ('tolerancia_hz', 'max_barridos_perdida', 'n_barridos', 'n_pistas', 'unidad', '_datos',
+                 '_activas')
+
+    def __init__(self, tolerancia_hz=TOLERANCIA_HZ, max_barridos_perdida=MAX_BARRIDOS_PERDIDA):
+        self.tolerancia_hz = tolerancia_hz
+        self.max_barridos_perdida = max_barridos_perdida
+        self.n_barridos = 0
+        self.n_pistas = 0
+        self.unidad = None
+        self._datos = {campo: np.zeros(CAPACIDAD_INICIAL) for campo in _CAMPOS}
+        # Pistas activas, ordenadas por su última frecuencia
+        self._activas = np.empty(0, dtype=np.int64)
+
+    def _reservar(self, n_nuevas):
+        capacidad = len(self._datos['detecciones'])
+        if self.n_pistas + n_nuevas <= capacidad:
+            return
+        while capacidad < self.n_pistas + n_nuevas:
+            capacidad *= 2
+        for campo, valores in self._datos.items():
+            ampliado = np.zeros(capacidad)
+            ampliado[:self.n_pistas] = valores[:self.n_pistas]
+            self._datos[campo] = ampliado
+
+    def _asociar(self, frecuencias):
+        """
+        Pista asociada a cada pico (frecuencias ya ordenadas), o -1 si ninguna está
+        dentro de la tolerancia o la ganó un pico más cercano.
+        """
+        pistas = np.full(len(frecuencias), -1, dtype=np.int64)
+        if not len(self._activas) or not len(frecuencias):
+            return pistas
+        f_pistas = self._datos['f_final'][self._activas]
+        derecha = np.clip(np.searchsorted(f_pistas, frecuencias), 0, len(f_pistas) - 1)
+        izquierda = np.maximum(derecha - 1, 0)
+        usar_izquierda = np.abs(frecuencias - f_pistas[izquierda]) < np.abs(frecuencias - f_pistas[derecha])
+        candidata = np.where(usar_izquierda, izquierda, derecha)
+        distancia = np.abs(frecuencias - f_pistas[candidata])
+
+        # Cada pista se queda con el pico más cercano
+        dentro = np.flatnonzero(distancia <= self.tolerancia_hz)
+        orden = dentro[np.argsort(distancia[dentro], kind='stable')]
+        _, primeros = np.unique(candidata[orden], return_index=True)
+        ganadores = orden[primeros]
+        pistas[ganadores] = self._activas[candidata[ganadores]]
+        return pistas
+
+    def actualizar(self, frecuencias, potencias, anchos_banda, instante=None, barrido=None):
+        """
+        Incorpora los picos de un barrido y devuelve la pista de cada uno (en el
+        orden recibido). `barrido` es el número del barrido en la captura (por
+        defecto, el siguiente al anterior); los barridos salteados envejecen las
+        pistas como barridos sin detección.
+        """
+        frecuencias = np.asarray(frecuencias, dtype=np.float64)
+        potencias = np.asarray(potencias, dtype=np.float64)
+        anchos_banda = np.asarray(anchos_banda, dtype=np.float64)
+        unidad = 'barrido' if instante is None else 's'
+        if self.unidad is None:
+            self.unidad = unidad
+        elif unidad != self.unidad:
+            raise ValueError("No se pueden mezclar barridos con y sin instante en un mismo seguimiento.")
+        if barrido is None:
+            barrido = self.n_barridos
+        elif barrido < self.n_barridos:
+            raise ValueError(f"El barrido {barrido} llega después del barrido {self.n_barridos - 1}.")
+        barrido = int(barrido)
+        t = float(barrido if instante is None else instante)
+        self.n_barridos = barrido + 1
+
+        d = self._datos
+        # Se descartan las pistas que ya superaron el límite de barridos seguidos sin detección
+        perdidos = barrido - d['barrido_final'][self._activas] - 1
+        self._activas = self._activas[perdidos <= self.max_barridos_perdida]
+
+        orden = np.argsort(frecuencias, kind='stable')
+        f = frecuencias[orden]
+        pistas = self._asociar(f)
+
+        # Los picos sin pista abren pistas nuevas
+        nuevos = np.flatnonzero(pistas < 0)
+        self._reservar(len(nuevos))
+        pistas[nuevos] = self.n_pistas + np.arange(len(nuevos))
+        self.n_pistas += len(nuevos)
+        d['barrido_inicial'][pistas[nuevos]] = barrido
+        d['t_inicial'][pistas[nuevos]] = t
+        d['f_inicial'][pistas[nuevos]] = f[nuevos]
+        d['f_min'][pistas[nuevos]] = f[nuevos]
+        d['f_max'][pistas[nuevos]] = f[nuevos]
+        d['potencia_max'][pistas[nuevos]] = -np.inf
+
+        self._acumular(pistas, f, potencias[orden], anchos_banda[orden], barrido, t)
+
+        # Pistas activas: las detectadas ahora y las que no superaron el límite de barridos sin detección
+        vigentes = self._activas[barrido - d['barrido_final'][self._activas] <= self.max_barridos_perdida]
+        activas = np.union1d(vigentes, pistas)
+        self._activas = activas[np.argsort(d['f_final'][activas], kind='stable')]
+
+        resultado = np.empty_like(pistas)
+        resultado[orden] = pistas
+        return resultado
+
+    def _acumular(self, pistas, f, potencias, anchos_banda, barrido, t):
+        d = self._datos
+        d['barrido_final'][pistas] = barrido
+        d['t_final'][pistas] = t
+        d['f_final'][pistas] = f
+        d['f_min'][pistas] = np.minimum(d['f_min'][pistas], f)
+        d['f_max'][pistas] = np.maximum(d['f_max'][pistas], f)
+
+        # Welford para la potencia
+        d['detecciones'][pistas] += 1
+        n = d['detecciones'][pistas]
+        delta = potencias - d['potencia_media'][pistas]
+        d['potencia_media'][pistas] += delta / n
+        d['potencia_m2'][pistas] += delta * (potencias - d['potencia_media'][pistas])
+        d['potencia_max'][pistas] = np.maximum(d['potencia_max'][pistas], potencias)
+        d['suma_ancho'][pistas] += anchos_banda
+
+        dt = t - d['t_inicial'][pistas]
+        df = f - d['f_inicial'][pistas]
+        d['suma_t'][pistas] += dt
+        d['suma_f'][pistas] += df
+        d['suma_tt'][pistas] += dt * dt
+        d['suma_tf'][pistas] += dt * df
+
+    def procesar_tabla(self, tabla, instantes=None):
+        """
+        Sigue las señales de una tabla de características con varios barridos (la de
+        `analizar_captura` o `procesar_archivo`), barrido por barrido en orden de
+        'Índice de barrido', y devuelve la pista de cada fila. `instantes` da los
+        segundos de cada índice de barrido (p. ej. `captura.indice.segundos()`); si
+        no se indica se toman del nombre de la columna 'Barrido'. Si algún barrido no
+        tiene instante, la deriva y la duración quedan en unidades de barrido.
+        """
+        pistas = np.empty(len(tabla), dtype=np.int64)
+        indices = tabla['Índice de barrido'].to_numpy()
+        if instantes is not None:
+            segundos = np.asarray(instantes, dtype=np.float64)[indices]
+        elif 'Barrido' in tabla:
+            segundos = segundos_barridos(tabla['Barrido'].to_numpy())
+        else:
+            segundos = None
+        if segundos is not None and (self.unidad == 'barrido' or np.isnan(segundos).any()):
+            segundos = None
+
+        orden = np.argsort(indices, kind='stable')
+        limites = np.flatnonzero(np.diff(indices[orden])) + 1
+        columnas = [tabla[columna].to_numpy() for columna in
+                    ('Frecuencia central [Hz]', 'Amplitud/ Potencia [dBm]', 'Ancho de banda (BW) [Hz]')]
+        for filas in np.split(orden, limites) if len(orden) else []:
+            instante = None if segundos is None else segundos[filas[0]]
+            pistas[filas] = self.actualizar(*(valores[filas] for valores in columnas), instante=instante,
+                                            barrido=indices[filas[0]])
+        return pistas
+
+    def tabla(self):
+        """
+        Estadísticas de todas las pistas (activas y cerradas).
+        """
+        import pandas as pd
+
+        n = self.n_pistas
+        d = {campo: valores[:n] for campo, valores in self._datos.items()}
+        detecciones = d['detecciones']
+        unidad = self.unidad or 'barrido'
+
+        # Pendiente de mínimos cuadrados de la frecuencia frente al tiempo
+        varianza_t = d['suma_tt'] - d['suma_t'] ** 2 / np.maximum(detecciones, 1)
+        covarianza = d['suma_tf'] - d['suma_t'] * d['suma_f'] / np.maximum(detecciones, 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            deriva = np.where(varianza_t > 0, covarianza / varianza_t, 0.0)
+            desvio = np.sqrt(np.where(detecciones > 1, d['potencia_m2'] / (detecciones - 1), 0.0))
+        activas = np.zeros(n, dtype=bool)
+        activas[self._activas] = True
+
+        return pd.DataFrame({
+            'Pista': np.arange(n) + 1,
+            'Barrido inicial': d['barrido_inicial'].astype(np.int64),
+            'Barrido final': d['barrido_final'].astype(np.int64),
+            'Detecciones': detecciones.astype(np.int64),
+            f'Duración [{unidad}]': d['t_final'] - d['t_inicial'],
+            'Frecuencia inicial [Hz]': d['f_inicial'],
+            'Frecuencia final [Hz]': d['f_final'],
+            'Frecuencia mínima [Hz]': d['f_min'],
+            'Frecuencia máxima [Hz]': d['f_max'],
+            f'Deriva [Hz/{unidad}]': deriva,
+            'Potencia media [dBm]': d['potencia_media'],
+            'Desvío de potencia [dB]': desvio,
+            'Potencia máxima [dBm]': d['potencia_max'],
+            'Ancho de banda medio [Hz]': d['suma_ancho'] / np.maximum(detecciones, 1),
+            'Activa': activas,
+        })
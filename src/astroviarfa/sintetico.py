@@ -0,0 +1,109 @@
+"""
+Capturas sintéticas con el formato de tres secciones del analizador, para medir
+el rendimiento y probar el análisis sin depender de archivos reales.
+
+El espectro es un piso de ruido (con una inclinación opcional a lo largo de la
+banda) más portadoras de forma gaussiana que se suman en potencia lineal. Cada
+barrido repite las portadoras con un desvanecimiento aleatorio y ruido nuevo.
+"""
+import datetime
+
+import numpy as np
+
+from .lector import CODIFICACION, SEPARADOR, VALORES_POR_BLOQUE
+
+PISO_RUIDO_DBM = -100.0
+DESVIO_RUIDO_DB = 1.5
+
+# Rangos de las portadoras: potencia de pico (dBm) y ancho a -3 dB (Hz)
+POTENCIA_PORTADORAS_DBM = (-35.0, -10.0)
+ANCHO_PORTADORAS_HZ = (20e3, 200e3)
+DESVANECIMIENTO_DB = 1.0
+
+# Las magnitudes se escriben con dos decimales dentro de este rango (dBm)
+RANGO_ESCRITURA_DBM = (-200.0, 50.0)
+
+# Fecha y hora del primer barrido y separación entre barridos: con menos de un
+# segundo entre barridos se repiten los nombres, como en las capturas reales
+INICIO_BARRIDOS = datetime.datetime(2024, 9, 27, 23, 29, 31)
+INTERVALO_BARRIDOS_S = 0.5
+
+
+def nombre_barrido(instante):
+    """
+    Fecha y hora con el formato del analizador, p. ej. '11:29:31 p. m. 27/09/2024'.
+    """
+    hora = instante.hour % 12 or 12
+    periodo = 'a. m.' if instante.hour < 12 else 'p. m.'
+    return f"{hora}:{instante:%M:%S} {periodo} {instante:%d/%m/%Y}"
+
+
+def nombres_barridos(n_barridos, inicio=INICIO_BARRIDOS, intervalo_s=INTERVALO_BARRIDOS_S):
+    return [nombre_barrido(inicio + datetime.timedelta(seconds=i * intervalo_s)) for i in range(n_barridos)]
+
+
+def _textos_centesimas(decimal):
+    # Texto de cada valor con dos decimales en RANGO_ESCRITURA_DBM: formatear con una
+    # tabla es decenas de veces más rápido que `to_csv(float_format=...)`
+    minimo, maximo = (round(v * 100) for v in RANGO_ESCRITURA_DBM)
+    return np.array([f"{v / 100:.2f}".replace('.', decimal) for v in range(minimo, maximo + 1)], dtype=object)
+
+
+def generar_captura(ruta_archivo, n_bins=10_000, n_barridos=10, n_portadoras=8, inclinacion_db=0.0,
+                    coma_decimal=True, frec_inicio=400e6, frec_fin=450e6, semilla=0):
+    """
+    Escribe una captura sintética de `n_barridos` barridos de `n_bins` bins entre
+    `frec_inicio` y `frec_fin` con `n_portadoras` portadoras. `inclinacion_db` es
+    la diferencia del piso de ruido entre el final y el inicio de la banda. Con
+    `coma_decimal=False` los números se escriben con punto decimal, como en los
+    equipos con otra configuración regional.
+    Devuelve un DataFrame con las portadoras generadas (centro, ancho y potencia).
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(semilla)
+    frecuencias = np.linspace(frec_inicio, frec_fin, n_bins)
+    portadoras = pd.DataFrame({
+        'Frecuencia central [Hz]': np.sort(rng.uniform(frec_inicio, frec_fin, n_portadoras)),
+        'Ancho de banda [Hz]': rng.uniform(*ANCHO_PORTADORAS_HZ, n_portadoras),
+        'Potencia [dBm]': rng.uniform(*POTENCIA_PORTADORAS_DBM, n_portadoras),
+    })
+    # Desvanecimiento de cada portadora en cada barrido
+    desvanecimiento = rng.normal(0, DESVANECIMIENTO_DB, (n_portadoras, n_barridos))
+    decimal = ',' if coma_decimal else '.'
+    textos = _textos_centesimas(decimal)
+    desplazamiento = -round(RANGO_ESCRITURA_DBM[0] * 100)
+
+    with open(ruta_archivo, 'w', encoding=CODIFICACION, newline='') as archivo:
+        archivo.write(f"Instrument{SEPARADOR}Sintetico\nDate{SEPARADOR}{INICIO_BARRIDOS:%d/%m/%Y}\n"
+                      f"Mode{SEPARADOR}Spectrum\n\n")
+        centro = f"{(frec_inicio + frec_fin) / 2:.1f}".replace('.', decimal)
+        span = f"{frec_fin - frec_inicio:.1f}".replace('.', decimal)
+        archivo.write(f"Center Freq [Hz]{SEPARADOR}Span [Hz]{SEPARADOR}Sweeps\n"
+                      f"{centro}{SEPARADOR}{span}{SEPARADOR}{n_barridos}\n\n")
+        archivo.write(SEPARADOR.join(['Sweep'] + nombres_barridos(n_barridos)) + '\n')
+        archivo.write(SEPARADOR.join(['Trace'] + ['Trace 1'] * n_barridos) + '\n')
+        archivo.write(SEPARADOR.join(['Frequency [Hz]'] + ['Magnitude [dBm]'] * n_barridos) + '\n')
+
+        filas_por_bloque = max(1, VALORES_POR_BLOQUE // max(n_barridos, 1))
+        for inicio in range(0, n_bins, filas_por_bloque):
+            f = frecuencias[inicio:inicio + filas_por_bloque]
+            piso = PISO_RUIDO_DBM + inclinacion_db * ((f - frec_inicio) / (frec_fin - frec_inicio) - 0.5)
+            potencia = 10 ** ((piso[:, None] + rng.normal(0, DESVIO_RUIDO_DB, (len(f), n_barridos))) / 10)
+
+            # Solo se evalúan las portadoras en los bins a menos de 4 anchos de su centro
+            for centro, ancho, pico, fade in zip(portadoras['Frecuencia central [Hz]'],
+                                                 portadoras['Ancho de banda [Hz]'],
+                                                 portadoras['Potencia [dBm]'], desvanecimiento):
+                tramo = slice(np.searchsorted(f, centro - 4 * ancho), np.searchsorted(f, centro + 4 * ancho))
+                if tramo.start == tramo.stop:
+                    continue
+                # Gaussiana con -3 dB a ±ancho/2 del centro
+                forma_db = -12 * ((f[tramo] - centro) / ancho) ** 2
+                potencia[tramo] += 10 ** ((pico + forma_db[:, None] + fade[None, :]) / 10)
+
+            centesimas = np.rint(np.clip(10 * np.log10(potencia), *RANGO_ESCRITURA_DBM) * 100).astype(np.int64)
+            filas = textos[centesimas + desplazamiento].tolist()
+            archivo.writelines(f"{frecuencia:.1f}".replace('.', decimal) + SEPARADOR + SEPARADOR.join(fila) + '\n'
+                               for frecuencia, fila in zip(f, filas))
+    return portadoras
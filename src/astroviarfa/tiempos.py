@@ -0,0 +1,189 @@
+"""
+Índice temporal de los barridos de una captura.
+
+Los nombres de los barridos son la fecha y hora del analizador, p. ej.
+'11:29:31 p. m. 27/09/2024', con los sufijos '.1', '.2', ... que agrega la
+lectura cuando varios barridos caen en el mismo segundo. El analizador no da más
+resolución, así que esos duplicados comparten el instante de su segundo: las
+búsquedas por tiempo los devuelven juntos, en el orden del archivo, y solo el
+sufijo los distingue (en `IndiceBarridos.posicion`). Se interpretan una sola
+vez al leer la captura y quedan en un arreglo datetime64 ordenado, así que buscar
+el barrido más cercano a un instante es una búsqueda binaria y seleccionar los
+barridos entre dos instantes devuelve una vista de la matriz de magnitudes (si los
+barridos están en orden cronológico en el archivo, que es lo habitual).
+"""
+import datetime
+import re
+
+import numpy as np
+
+UNIDAD = 'ms'
+
+_NAT = np.datetime64('NaT', UNIDAD)
+
+# Hora (con 'a. m.'/'p. m.' opcional), fecha dd/mm/aaaa y sufijo de duplicado opcional
+_PATRON = re.compile(
+    r'^\s*(\d{1,2}):(\d{2}):(\d{2})\s*(?:([ap])\.?\s*m\.?)?\s+(\d{1,2})/(\d{1,2})/(\d{4})(?:\.(\d+))?\s*$',
+    re.IGNORECASE,
+)
+
+
+def interpretar_nombre_barrido(nombre):
+    """
+    Devuelve (instante, sufijo) del nombre de un barrido: el instante como
+    datetime64 y el número del sufijo de duplicado (0 si no tiene). Si el nombre no
+    es una fecha y hora reconocible el instante es NaT.
+    """
+    coincidencia = _PATRON.match(nombre)
+    if coincidencia is None:
+        return _NAT, 0
+    hora, minuto, segundo, periodo, dia, mes, año, sufijo = coincidencia.groups()
+    hora = int(hora)
+    if periodo is not None:
+        hora = hora % 12 + (12 if periodo.lower() == 'p' else 0)
+    try:
+        instante = datetime.datetime(int(año), int(mes), int(dia), hora, int(minuto), int(segundo))
+    except ValueError:
+        return _NAT, 0
+    return np.datetime64(instante, UNIDAD), int(sufijo or 0)
+
+
+def como_instante(valor):
+    """
+    Instante de una consulta: nombre de barrido, texto ISO, datetime o datetime64.
+    """
+    if isinstance(valor, str):
+        instante, _ = interpretar_nombre_barrido(valor)
+        if np.isnat(instante):
+            instante = np.datetime64(valor.strip(), UNIDAD)
+        return instante
+    return np.datetime64(valor, UNIDAD)
+
+
+def a_segundos(instantes):
+    """
+    Segundos desde 1970 de un arreglo datetime64 (hora local del analizador, sin
+    zona), con NaN en lugar de NaT.
+    """
+    instantes = np.asarray(instantes).astype(f'datetime64[{UNIDAD}]')
+    return np.where(np.isnat(instantes), np.nan, instantes.astype(np.int64) / 1e3)
+
+
+def segundos_barridos(nombres):
+    """
+    Segundos desde 1970 del instante de cada barrido según su nombre (NaN si no es
+    una fecha y hora). Cada nombre distinto se interpreta una sola vez.
+    """
+    nombres, inversos = np.unique(np.asarray(nombres, dtype=object).astype(str), return_inverse=True)
+    instantes = np.array([interpretar_nombre_barrido(nombre)[0] for nombre in nombres], dtype=f'datetime64[{UNIDAD}]')
+    return a_segundos(instantes)[inversos]
+
+
+class IndiceBarridos:
+    """
+    Instantes de los barridos (en el orden de la matriz de magnitudes) y su orden
+    cronológico. Los duplicados de un mismo segundo comparten el instante. Los barridos cuyo nombre no es una fecha y hora quedan con NaT y
+    fuera de las búsquedas por tiempo.
+    """
+    __slots__ = ('nombres', 'instantes', 'sufijos', 'orden', '_ordenados', '_contiguo', '_normalizados')
+
+    def __init__(self, nombres):
+        self.nombres = list(nombres)
+        # Los duplicados comparten el texto base, que se interpreta una sola vez
+        interpretados = {}
+        instantes = np.empty(len(self.nombres), dtype=f'datetime64[{UNIDAD}]')
+        sufijos = np.zeros(len(self.nombres), dtype=np.int64)
+        for posicion, nombre in enumerate(self.nombres):
+            instante, sufijo = interpretar_nombre_barrido(nombre)
+            base = nombre if np.isnat(instante) or not sufijo else nombre.rsplit('.', 1)[0]
+            if base not in interpretados:
+                interpretados[base] = instante
+            instantes[posicion] = interpretados[base]
+            sufijos[posicion] = sufijo
+        self.instantes = instantes
+        self.sufijos = sufijos
+
+        validos = np.flatnonzero(~np.isnat(instantes))
+        # A igual instante, el orden del archivo (que es el de los sufijos)
+        self.orden = validos[np.argsort(instantes[validos], kind='stable')]
+        self._ordenados = instantes[self.orden]
+        self._contiguo = bool(np.all(np.diff(self.orden) == 1))
+        self._normalizados = None
+
+    def __len__(self):
+        return len(self.nombres)
+
+    @property
+    def inicio(self):
+        return self._ordenados[0] if len(self._ordenados) else _NAT
+
+    @property
+    def fin(self):
+        return self._ordenados[-1] if len(self._ordenados) else _NAT
+
+    def segundos(self):
+        """
+        Segundos desde 1970 de cada barrido, en el orden de la matriz (NaN si su
+        nombre no es una fecha y hora).
+        """
+        return a_segundos(self.instantes)
+
+    def posicion(self, nombre):
+        """
+        Posición en la matriz del barrido `nombre` (fecha y hora con su sufijo, como
+        la ingresa el usuario), o None si no hay ninguno con ese instante y sufijo.
+        Los nombres que no son una fecha y hora se comparan como texto normalizado.
+        """
+        instante, sufijo = interpretar_nombre_barrido(nombre)
+        if np.isnat(instante):
+            # lector importa este módulo, así que la importación inversa va aquí
+            from .lector import normalizar_columna
+
+            if self._normalizados is None:
+                self._normalizados = {}
+                for posicion, otro in enumerate(self.nombres):
+                    self._normalizados.setdefault(normalizar_columna(otro), posicion)
+            return self._normalizados.get(normalizar_columna(nombre))
+        izquierda = np.searchsorted(self._ordenados, instante, side='left')
+        derecha = np.searchsorted(self._ordenados, instante, side='right')
+        if izquierda + sufijo >= derecha:
+            return None
+        return int(self.orden[izquierda + sufijo])
+
+    def mas_cercano(self, instante):
+        """
+        Posición en la matriz del barrido más cercano a `instante` (nombre de
+        barrido, texto ISO, datetime o datetime64), o None si el índice está vacío.
+        Con dos igual de cercanos, el anterior; entre duplicados de un mismo segundo,
+        el primero.
+        """
+        if not len(self._ordenados):
+            return None
+        instante = como_instante(instante)
+        derecha = min(int(np.searchsorted(self._ordenados, instante)), len(self._ordenados) - 1)
+        izquierda = max(derecha - 1, 0)
+        if abs(self._ordenados[izquierda] - instante) <= abs(self._ordenados[derecha] - instante):
+            derecha = izquierda
+        return int(self.orden[np.searchsorted(self._ordenados, self._ordenados[derecha], 'left')])
+
+    def rango(self, desde=None, hasta=None):
+        """
+        Barridos con instante entre `desde` y `hasta` (ambos incluidos; None = sin
+        límite), en orden cronológico: un `slice` de la matriz si esos barridos están
+        seguidos en el archivo, o un arreglo de posiciones si no.
+        """
+        izquierda = 0 if desde is None else int(np.searchsorted(self._ordenados, como_instante(desde), 'left'))
+        derecha = (len(self._ordenados) if hasta is None
+                   else int(np.searchsorted(self._ordenados, como_instante(hasta), 'right')))
+        derecha = max(derecha, izquierda)
+        if self._contiguo:
+            primero = int(self.orden[izquierda]) if izquierda < len(self.orden) else len(self.nombres)
+            return slice(primero, primero + derecha - izquierda)
+        return self.orden[izquierda:derecha]
+
+    def seleccionar(self, magnitudes, desde=None, hasta=None):
+        """
+        Filas de `magnitudes` (barridos x bins) entre `desde` y `hasta`. Es una vista
+        sin copia cuando `rango` devuelve un `slice`.
+        """
+        return magnitudes[self.rango(desde, hasta)]
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# El paquete está en src/ y no se instala
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from astroviarfa.almacen import AlmacenResultados
+
+
+def _tabla(archivo, filas):
+    # filas: (barrido, frecuencia central en MHz, SNR, satélite)
+    return pd.DataFrame({
+        'Archivo': archivo,
+        'Barrido': [barrido for barrido, _, _, _ in filas],
+        'Señal': range(1, len(filas) + 1),
+        'Frecuencia central [Hz]': [mhz * 1e6 for _, mhz, _, _ in filas],
+        'Relación señal-ruido (SNR) [dB]': [snr for _, _, snr, _ in filas],
+        'Satélite': [satelite for _, _, _, satelite in filas],
+    })
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    with AlmacenResultados(str(tmp_path / 'resultados.sqlite')) as almacen:
+        # Guardadas fuera de orden para comprobar el orden de las consultas
+        almacen.agregar(_tabla('b.csv', [
+            ('10:00:02 a. m. 01/09/2024', 437.0, 5.0, 'EM FACSAT'),
+            ('10:00:01 a. m. 01/09/2024', 437.2, 20.0, 'EM FACSAT'),
+        ]))
+        almacen.agregar(_tabla('a.csv', [
+            ('10:00:01 a. m. 01/09/2024', 437.05, 8.0, 'EM FACSAT'),
+            ('10:00:03 p. m. 02/09/2024', 410.0, 12.0, 'EM MISC'),
+            ('10:00:00 a. m. 01/09/2024', 437.1, np.nan, 'EM FACSAT'),
+        ]))
+        yield almacen
+
+
+def test_agregar_y_consultar_en_orden(almacen):
+    assert len(almacen) == 5
+    assert almacen.archivos() == ['a.csv', 'b.csv']
+    tabla = almacen.consultar()
+    assert list(tabla['Frecuencia central [Hz]'] / 1e6) == pytest.approx([437.1, 437.05, 437.2, 437.0, 410.0])
+    assert list(tabla['Instante']) == list(pd.to_datetime([
+        '2024-09-01 10:00:00', '2024-09-01 10:00:01', '2024-09-01 10:00:01', '2024-09-01 10:00:02',
+        '2024-09-02 22:00:03']))
+    assert tabla['Señal'].dtype == 'Int64'
+    assert tabla['Relación señal-ruido (SNR) [dB]'].isna().sum() == 1
+    assert tabla['Pista'].isna().all()
+
+
+def test_filtros(almacen):
+    def frecuencias(**filtros):
+        tabla = almacen.consultar(**filtros)
+        assert almacen.contar(**filtros) == len(tabla)
+        return list(tabla['Frecuencia central [Hz]'] / 1e6)
+
+    assert frecuencias(frecuencia_min=436.99e6, frecuencia_max=437.06e6) == pytest.approx([437.05, 437.0])
+    assert frecuencias(snr_max=10) == pytest.approx([437.05, 437.0])
+    assert frecuencias(snr_min=10, satelite='EM FACSAT') == pytest.approx([437.2])
+    assert frecuencias(desde='10:00:01 a. m. 01/09/2024', hasta='2024-09-01T10:00:02') == pytest.approx(
+        [437.05, 437.2, 437.0])
+    assert frecuencias(desde='2024-09-02') == pytest.approx([410.0])
+    assert frecuencias(archivo='b.csv') == pytest.approx([437.2, 437.0])
+    assert frecuencias(frecuencia_min=np.float64(500e6)) == []
+
+
+def test_limite_despues_de_ordenar(almacen):
+    tabla = almacen.consultar(satelite='EM FACSAT', limite=2)
+    assert list(tabla['Frecuencia central [Hz]'] / 1e6) == pytest.approx([437.1, 437.05])
+
+
+def test_reemplazar_los_archivos_de_la_tabla(almacen):
+    almacen.agregar(_tabla('a.csv', [('10:00:05 a. m. 01/09/2024', 437.3, 9.0, 'EM FACSAT')]), reemplazar=True)
+    assert almacen.contar(archivo='a.csv') == 1
+    assert almacen.contar(archivo='b.csv') == 2
+    almacen.agregar(_tabla('a.csv', [('10:00:05 a. m. 01/09/2024', 437.3, 9.0, 'EM FACSAT')]))
+    assert almacen.contar(archivo='a.csv') == 2
+    assert almacen.eliminar_archivo('b.csv') == 2
+    assert almacen.archivos() == ['a.csv']
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pytest
+
+from astroviarfa.cache import cargar_de_cache, clave_captura, leer_csv_con_cache, recortar_cache
+from astroviarfa.lector import leer_csv_especial
+from astroviarfa.sintetico import generar_captura
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    ruta = tmp_path / 'captura.csv'
+    generar_captura(ruta, n_bins=500, n_barridos=3)
+    return str(ruta)
+
+
+def _leer(ruta, directorio, **opciones):
+    # Devuelve la captura y si hubo que convertir el CSV (el progreso solo se informa al leerlo)
+    avisos = []
+    captura = leer_csv_con_cache(ruta, directorio, progreso=lambda hechos, total: avisos.append(hechos), **opciones)
+    return captura, bool(avisos)
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.int16])
+def test_fallo_y_despues_acierto_con_memory_mapping(ruta, tmp_path, dtype):
+    directorio = str(tmp_path / 'cache')
+    esperada = leer_csv_especial(ruta, dtype)
+
+    primera, leida = _leer(ruta, directorio, dtype=dtype)
+    assert leida
+    segunda, leida = _leer(ruta, directorio, dtype=dtype)
+    assert not leida
+    assert isinstance(segunda.datos, np.memmap) and isinstance(segunda.frecuencias, np.memmap)
+    assert not segunda.datos.flags.writeable
+    np.testing.assert_array_equal(segunda.datos, esperada.datos)
+    np.testing.assert_array_equal(segunda.frecuencias, esperada.frecuencias)
+    np.testing.assert_array_equal(segunda.magnitudes, esperada.magnitudes)
+    assert segunda.columnas == esperada.columnas and segunda.metadatos == esperada.metadatos
+    assert segunda.paso == esperada.paso
+    assert segunda.df2.equals(esperada.df2)
+    np.testing.assert_array_equal(segunda.indice.segundos(), esperada.indice.segundos())
+
+
+def test_la_clave_cambia_con_el_tamaño_la_fecha_y_el_tipo(ruta, tmp_path):
+    clave = clave_captura(ruta)
+    assert clave_captura(ruta) == clave
+    assert clave_captura(ruta, dtype=np.int16) != clave
+
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10 ** 9))
+    assert clave_captura(ruta) != clave
+
+    # Por contenido la clave no depende de la ruta ni de la fecha, pero sí de los bytes
+    por_contenido = clave_captura(ruta, por_contenido=True)
+    copia = str(tmp_path / 'copia.csv')
+    shutil.copyfile(ruta, copia)
+    assert clave_captura(copia, por_contenido=True) == por_contenido
+    with open(copia, 'ab') as archivo:
+        archivo.write(b'\n')
+    assert clave_captura(copia, por_contenido=True) != por_contenido
+
+    # Un archivo modificado no reutiliza la entrada anterior
+    directorio = str(tmp_path / 'cache')
+    _leer(ruta, directorio)
+    with open(ruta, 'ab') as archivo:
+        archivo.write(b'\n')
+    _, leida = _leer(ruta, directorio)
+    assert leida
+
+
+def test_se_eliminan_las_entradas_usadas_hace_mas_tiempo(tmp_path):
+    directorio = str(tmp_path / 'cache')
+    rutas = []
+    for i in range(3):
+        rutas.append(str(tmp_path / f'captura_{i}.csv'))
+        generar_captura(rutas[-1], n_bins=500, n_barridos=3, semilla=i)
+        leer_csv_con_cache(rutas[-1], directorio)
+    claves = [clave_captura(ruta) for ruta in rutas]
+    entradas = [os.path.join(directorio, clave) for clave in claves]
+    tamaño = sum(os.path.getsize(os.path.join(entradas[0], archivo)) for archivo in os.listdir(entradas[0]))
+
+    # Último uso: la entrada 1 es la más antigua y la 0 la más reciente
+    for segundos, entrada in zip([300, 100, 200], entradas):
+        os.utime(os.path.join(entrada, 'meta.json'), (segundos, segundos))
+    assert cargar_de_cache(claves[1], directorio) is not None  # el acierto la vuelve la más reciente
+    recortar_cache(directorio, limite_bytes=2 * tamaño + tamaño // 2)
+    assert sorted(os.listdir(directorio)) == sorted([claves[0], claves[1]])
+
+    recortar_cache(directorio, limite_bytes=0)
+    assert os.listdir(directorio) == []
+
+
+def test_una_escritura_interrumpida_no_se_usa(ruta, tmp_path):
+    directorio = str(tmp_path / 'cache')
+    os.makedirs(directorio)
+    clave = clave_captura(ruta)
+    # Un proceso terminó en medio de `guardar_en_cache`: quedó el directorio temporal sin renombrar
+    temporal = tempfile.mkdtemp(prefix=f".{clave}-", dir=directorio)
+    np.save(os.path.join(temporal, 'frecuencias.npy'), np.zeros(10))
+    assert cargar_de_cache(clave, directorio) is None
+
+    captura, leida = _leer(ruta, directorio)
+    assert leida
+    np.testing.assert_array_equal(captura.datos, leer_csv_especial(ruta).datos)
+    _, leida = _leer(ruta, directorio)
+    assert not leida
+
+    # Tampoco se sirve una entrada con un archivo dañado
+    with open(os.path.join(directorio, clave, 'magnitudes.npy'), 'wb') as archivo:
+        archivo.write(b'no es un npy')
+    assert cargar_de_cache(clave, directorio) is None
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+
+from astroviarfa.caracteristicas import extraer_caracteristicas
+from astroviarfa.deteccion import dBm_to_mW, estimar_nivel_ruido
+
+
+def _caracteristicas_bin_a_bin(frecuencias, magnitudes, indices_picos, noise_level):
+    # Recorrido original, pico por pico y bin a bin
+    filas = []
+    for i, indice_pico in enumerate(indices_picos):
+        mag_peak = magnitudes[indice_pico]
+        threshold = mag_peak - 3
+        idx_left = indice_pico
+        while idx_left > 0 and magnitudes[idx_left] > threshold:
+            idx_left -= 1
+        idx_right = indice_pico
+        while idx_right < len(magnitudes) - 1 and magnitudes[idx_right] > threshold:
+            idx_right += 1
+        frec_lower, frec_upper = frecuencias[idx_left], frecuencias[idx_right]
+        en_banda = np.where((frecuencias >= frec_lower) & (frecuencias <= frec_upper))[0]
+        filas.append({
+            'Señal': i + 1,
+            'Frecuencia menor [Hz]': frec_lower,
+            'Frecuencia mayor [Hz]': frec_upper,
+            'Frecuencia central [Hz]': (frec_upper + frec_lower) / 2,
+            'Ancho de banda (BW) [Hz]': frec_upper - frec_lower,
+            'Amplitud/ Potencia [dBm]': mag_peak,
+            'Nivel de ruido [dBm]': noise_level,
+            'Relación señal-ruido (SNR) [dB]': mag_peak - noise_level,
+            'Potencia de canal [dBm]': 10 * np.log10(np.sum(dBm_to_mW(magnitudes[en_banda]))),
+        })
+    return filas
+
+
+def _espectro(rng, n_bins=5000):
+    # Piso de ruido con portadoras fuertes y débiles, redondeado a 0,01 dB como el analizador
+    bins = np.arange(n_bins)
+    potencia = 10 ** ((-100 + rng.normal(0, 1.5, n_bins)) / 10)
+    for centro, ancho, pico in zip(rng.uniform(0, n_bins, 12), rng.uniform(3, 80, 12), rng.uniform(-90, -10, 12)):
+        potencia += 10 ** ((pico - 12 * ((bins - centro) / ancho) ** 2) / 10)
+    return np.round(10 * np.log10(potencia), 2)
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_coincide_con_el_recorrido_bin_a_bin(semilla):
+    rng = np.random.default_rng(semilla)
+    frecuencias = np.linspace(400e6, 450e6, 5000)
+    magnitudes = _espectro(rng)
+    nivel = estimar_nivel_ruido(magnitudes)
+    # Margen bajo: muchos picos, incluidos los del ruido y los de los extremos de las portadoras
+    picos, _ = find_peaks(magnitudes, height=nivel + 3)
+
+    obtenidas = extraer_caracteristicas(frecuencias, magnitudes, picos, nivel)
+    esperadas = _caracteristicas_bin_a_bin(frecuencias, magnitudes, picos, nivel)
+    assert len(picos) > 100
+    for columna, valores in obtenidas.items():
+        referencia = np.array([fila[columna] for fila in esperadas])
+        if columna == 'Potencia de canal [dBm]':
+            np.testing.assert_allclose(valores, referencia, rtol=1e-13)
+        else:
+            np.testing.assert_array_equal(valores, referencia)
+
+
+def test_matriz_por_filas_igual_a_cada_barrido():
+    rng = np.random.default_rng(7)
+    frecuencias = np.linspace(400e6, 450e6, 3000)
+    matriz = np.stack([_espectro(rng, 3000) for _ in range(4)])
+    niveles = estimar_nivel_ruido(matriz)
+    filas, picos = [], []
+    for fila, barrido in enumerate(matriz):
+        encontrados, _ = find_peaks(barrido, height=niveles[fila] + 10)
+        filas.append(np.full(len(encontrados), fila))
+        picos.append(encontrados)
+    filas, picos = np.concatenate(filas), np.concatenate(picos)
+
+    juntas = extraer_caracteristicas(frecuencias, matriz, picos, niveles, filas=filas)
+    for fila, barrido in enumerate(matriz):
+        sola = extraer_caracteristicas(frecuencias, barrido, picos[filas == fila], niveles[fila])
+        for columna, valores in sola.items():
+            np.testing.assert_array_equal(juntas[columna][filas == fila], valores)
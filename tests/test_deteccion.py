@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+
+from astroviarfa.deteccion import FRACCION_ORDEN_OS, dBm_to_mW, detectar_picos, factor_cfar, umbral_cfar
+
+
+def _matriz(semilla=0, n_barridos=5, n_bins=4000):
+    # Redondeada a 1 dB para que haya mesetas (picos planos) además de picos simples
+    rng = np.random.default_rng(semilla)
+    return np.round(-100 + rng.normal(0, 3, (n_barridos, n_bins)))
+
+
+def _find_peaks_por_fila(matriz, alturas):
+    filas, picos = [], []
+    for fila, (barrido, altura) in enumerate(zip(matriz, alturas)):
+        encontrados, _ = find_peaks(barrido, height=altura)
+        filas.append(np.full(len(encontrados), fila))
+        picos.append(encontrados)
+    return np.concatenate(filas), np.concatenate(picos)
+
+
+@pytest.mark.parametrize('tipo_altura', ['escalar', 'por_barrido', 'por_bin'])
+def test_detectar_picos_igual_a_find_peaks(tipo_altura):
+    matriz = _matriz()
+    rng = np.random.default_rng(1)
+    if tipo_altura == 'escalar':
+        altura, alturas = -98.0, [-98.0] * len(matriz)
+    elif tipo_altura == 'por_barrido':
+        altura = alturas = rng.uniform(-101, -96, len(matriz))
+    else:
+        altura = alturas = -100 + rng.normal(0, 2, matriz.shape)
+
+    filas, picos = detectar_picos(matriz, altura)
+    esperadas_filas, esperados_picos = _find_peaks_por_fila(matriz, alturas)
+    np.testing.assert_array_equal(filas, esperadas_filas)
+    np.testing.assert_array_equal(picos, esperados_picos)
+
+
+def _ruido_cfar_directo(barrido, guarda, entrenamiento, metodo):
+    # Celdas de entrenamiento de cada bin sobre el barrido extendido por simetría
+    borde = guarda + entrenamiento
+    relleno = np.pad(barrido, borde, mode='symmetric')
+    n_celdas = 2 * entrenamiento
+    orden = max(1, min(n_celdas, int(round(FRACCION_ORDEN_OS * n_celdas))))
+    ruido = np.empty(len(barrido))
+    for i in range(len(barrido)):
+        centro = i + borde
+        celdas = np.concatenate([relleno[centro - borde:centro - guarda], relleno[centro + guarda + 1:centro + borde + 1]])
+        if metodo == 'ca':
+            ruido[i] = 10 * np.log10(np.mean(dBm_to_mW(celdas)))
+        else:
+            ruido[i] = np.sort(celdas)[orden - 1]
+    return ruido
+
+
+@pytest.mark.parametrize('metodo', ['ca', 'os'])
+def test_umbral_cfar_igual_al_calculo_directo(metodo):
+    matriz = _matriz(n_barridos=3, n_bins=600)
+    guarda, entrenamiento, pfa = 4, 16, 1e-3
+    umbral, ruido = umbral_cfar(matriz, guarda, entrenamiento, pfa, metodo)
+    for fila, barrido in enumerate(matriz):
+        esperado = _ruido_cfar_directo(barrido, guarda, entrenamiento, metodo)
+        np.testing.assert_allclose(ruido[fila], esperado, rtol=0, atol=1e-9)
+        # Un barrido solo da lo mismo que su fila de la matriz
+        umbral_fila, ruido_fila = umbral_cfar(barrido, guarda, entrenamiento, pfa, metodo)
+        np.testing.assert_array_equal(ruido_fila, ruido[fila])
+        np.testing.assert_array_equal(umbral_fila, umbral[fila])
+
+
+@pytest.mark.parametrize('metodo', ['ca', 'os'])
+def test_probabilidad_de_falsa_alarma(metodo):
+    # Ruido de potencia exponencial: la fracción de bins sobre el umbral se acerca a `pfa`
+    rng = np.random.default_rng(3)
+    matriz = 10 * np.log10(rng.exponential(1.0, (20, 20_000)))
+    pfa = 1e-2
+    umbral, _ = umbral_cfar(matriz, guarda=2, entrenamiento=32, pfa=pfa, metodo=metodo)
+    assert np.mean(matriz > umbral) == pytest.approx(pfa, rel=0.1)
+
+
+def test_factor_os_cumple_la_pfa():
+    n_celdas, orden, pfa = 64, 48, 1e-4
+    factor = factor_cfar(n_celdas, pfa, 'os', orden)
+    i = np.arange(orden)
+    assert np.prod((n_celdas - i) / (n_celdas - i + factor)) == pytest.approx(pfa, rel=1e-9)
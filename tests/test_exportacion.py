@@ -0,0 +1,24 @@
+import re
+import zipfile
+
+import pandas as pd
+import pytest
+
+from astroviarfa.exportacion import FORMATO_FECHA_EXCEL, exportar_tabla
+
+
+def test_excel_escribe_las_fechas_con_formato(tmp_path):
+    pytest.importorskip('xlsxwriter')
+    ruta = tmp_path / 'resultados.xlsx'
+    tabla = pd.DataFrame({'Instante': pd.to_datetime(['2024-09-27 23:29:31', '2024-09-27 23:29:32']),
+                          'Relación señal-ruido (SNR) [dB]': [12.5, 8.0]})
+    exportar_tabla(tabla, str(ruta))
+
+    with zipfile.ZipFile(ruta) as libro:
+        estilos = libro.read('xl/styles.xml').decode()
+        hoja = libro.read('xl/worksheets/sheet1.xml').decode()
+    formato = re.search(r'<numFmt numFmtId="(\d+)" formatCode="([^"]+)"', estilos)
+    assert formato is not None and formato.group(2) == FORMATO_FECHA_EXCEL
+    # Las celdas de la columna A (salvo el encabezado) usan un estilo, el del formato de fecha
+    celdas = re.findall(r'<c r="A([23])"( s="\d+")?', hoja)
+    assert len(celdas) == 2 and all(estilo for _, estilo in celdas)
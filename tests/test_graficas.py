@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from astroviarfa.graficas import PiramideMinMax, indices_en_rango
+
+
+@pytest.mark.parametrize('n_bins', [1, 2, 7, 1000, 1029])
+def test_niveles_conservan_el_minimo_y_maximo_de_cada_bloque(n_bins):
+    # Valores enteros para que haya empates: se queda la primera posición, como argmin/argmax
+    magnitudes = np.random.default_rng(n_bins).integers(-110, -60, n_bins).astype(float)
+    piramide = PiramideMinMax(np.arange(n_bins), magnitudes)
+    assert len(piramide.niveles) == int(np.ceil(np.log2(n_bins)))
+    for nivel, (indices_min, indices_max) in enumerate(piramide.niveles, start=1):
+        tamaño = 2 ** nivel
+        assert len(indices_min) == len(indices_max) == -(-n_bins // tamaño)
+        for bloque, (minimo, maximo) in enumerate(zip(indices_min, indices_max)):
+            valores = magnitudes[bloque * tamaño:(bloque + 1) * tamaño]
+            assert minimo == bloque * tamaño + np.argmin(valores)
+            assert maximo == bloque * tamaño + np.argmax(valores)
+
+
+def test_muestras_incluyen_los_extremos_del_tramo():
+    magnitudes = np.random.default_rng(0).normal(-100, 3, 10_000)
+    magnitudes[4321] = -20.0
+    piramide = PiramideMinMax(np.arange(len(magnitudes)), magnitudes)
+    assert list(piramide.muestras(10, 20, 100)) == list(range(10, 20))
+    for inicio, fin in [(0, 10_000), (3000, 5000), (4321, 4322 + 900)]:
+        indices = piramide.muestras(inicio, fin, 200)
+        assert len(indices) <= 200 + 4
+        assert np.all(np.diff(indices) >= 0)
+        # El pico está en todos los tramos; los bloques de los bordes pueden tomar bins de afuera
+        visibles = magnitudes[inicio:fin]
+        assert magnitudes[indices].max() == visibles.max()
+        assert magnitudes[indices].min() <= visibles.min()
+
+
+def test_indices_en_rango_en_los_bordes():
+    frecuencias = np.array([400e6, 410e6, 420e6, 430e6])
+    assert indices_en_rango(frecuencias, 410e6, 420e6) == slice(1, 3)
+    assert indices_en_rango(frecuencias, 405e6, 425e6) == slice(1, 3)
+    assert indices_en_rango(frecuencias, 400e6, 430e6) == slice(0, 4)
+    assert indices_en_rango(frecuencias, 0, 1e12) == slice(0, 4)
+    assert indices_en_rango(frecuencias, 430e6, 430e6) == slice(3, 4)
+    assert frecuencias[indices_en_rango(frecuencias, 431e6, 500e6)].size == 0
+    assert frecuencias[indices_en_rango(frecuencias, 0, 399e6)].size == 0
+    assert frecuencias[indices_en_rango(frecuencias, 415e6, 412e6)].size == 0
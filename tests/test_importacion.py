@@ -0,0 +1,19 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from astroviarfa.rendimiento import MODULOS_PESADOS
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+
+@pytest.mark.parametrize('modulo', ['astroviarfa', '_main'])
+def test_importar_no_carga_dependencias_pesadas(modulo):
+    # En un proceso nuevo, para que no influya lo que ya importaron otras pruebas
+    codigo = f"import json, sys; import {modulo}; print(json.dumps([m for m in {MODULOS_PESADOS!r} if m in sys.modules]))"
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get('PYTHONPATH')])))
+    salida = subprocess.run([sys.executable, '-c', codigo], env=entorno, capture_output=True, text=True, check=True)
+    assert json.loads(salida.stdout) == []
@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from astroviarfa.lector import CODIGO_NAN, cuantizar, descuantizar, leer_csv_especial
+from astroviarfa.sintetico import generar_captura
+
+
+@pytest.mark.parametrize('coma_decimal', [True, False])
+def test_lee_coma_y_punto_decimal(tmp_path, coma_decimal):
+    ruta = tmp_path / 'captura.csv'
+    generar_captura(ruta, n_bins=3000, n_barridos=4, coma_decimal=coma_decimal)
+    captura = leer_csv_especial(ruta)
+
+    np.testing.assert_allclose(captura.frecuencias, np.linspace(400e6, 450e6, 3000), atol=0.05)
+    assert captura.magnitudes.shape == (4, 3000)
+    assert np.isfinite(captura.magnitudes).all()
+    assert captura.df2['Center Freq [Hz]'].iloc[0] == pytest.approx(425e6)
+
+
+def test_ambos_formatos_dan_la_misma_captura(tmp_path):
+    capturas = []
+    for coma_decimal in (True, False):
+        ruta = tmp_path / f'captura_{coma_decimal}.csv'
+        generar_captura(ruta, n_bins=3000, n_barridos=4, coma_decimal=coma_decimal)
+        capturas.append(leer_csv_especial(ruta))
+    coma, punto = capturas
+    np.testing.assert_array_equal(coma.frecuencias, punto.frecuencias)
+    np.testing.assert_array_equal(coma.magnitudes, punto.magnitudes)
+
+
+@pytest.mark.parametrize('coma_decimal', [True, False])
+def test_separador_decimal_con_filas_enteras_al_principio(tmp_path, coma_decimal):
+    ruta = tmp_path / 'captura.csv'
+    generar_captura(ruta, n_bins=3000, n_barridos=4, coma_decimal=coma_decimal)
+    with open(ruta, encoding='utf-8') as archivo:
+        lineas = archivo.read().split('\n')
+    # Las primeras filas de datos (después de las dos secciones y las tres líneas de encabezado) con enteros
+    primera = [numero for numero, linea in enumerate(lineas) if linea.startswith('Frequency [Hz]')][0] + 1
+    for numero in range(primera, primera + 3):
+        campos = lineas[numero].split(';')
+        lineas[numero] = ';'.join([campos[0].replace(',0', '').replace('.0', ''), *['-100'] * 4])
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write('\n'.join(lineas))
+
+    generar_captura(tmp_path / 'referencia.csv', n_bins=3000, n_barridos=4)
+    referencia = leer_csv_especial(tmp_path / 'referencia.csv')
+    captura = leer_csv_especial(ruta)
+    np.testing.assert_array_equal(captura.frecuencias, referencia.frecuencias)
+    np.testing.assert_array_equal(captura.magnitudes[:, :3], -100)
+    np.testing.assert_array_equal(captura.magnitudes[:, 3:], referencia.magnitudes[:, 3:])
+    assert captura.df2['Center Freq [Hz]'].iloc[0] == pytest.approx(425e6)
+
+
+def test_cuantizacion_int16_sin_perdidas_con_dos_decimales():
+    # Todos los valores con dos decimales del rango representable
+    centesimas = np.arange(-42767, 22768)
+    magnitudes = centesimas / 100
+    codigos = cuantizar(magnitudes)
+    assert codigos.dtype == np.int16
+    np.testing.assert_array_equal(np.round(descuantizar(codigos) * 100).astype(np.int64), centesimas)
+    np.testing.assert_allclose(descuantizar(codigos), magnitudes, rtol=0, atol=1e-9)
+
+
+def test_cuantizacion_int16_nan_y_recorte():
+    codigos = cuantizar(np.array([np.nan, -1000.0, 1000.0, -100.0]))
+    assert codigos[0] == CODIGO_NAN
+    valores = descuantizar(codigos)
+    assert np.isnan(valores[0])
+    assert valores[1] == pytest.approx(-427.67) and valores[2] == pytest.approx(227.67)
+    assert valores[3] == -100.0
+
+
+def test_lectura_int16_igual_a_float32(tmp_path):
+    ruta = tmp_path / 'captura.csv'
+    generar_captura(ruta, n_bins=3000, n_barridos=4)
+    flotante = leer_csv_especial(ruta)
+    cuantizada = leer_csv_especial(ruta, np.int16)
+
+    assert cuantizada.cuantizada and cuantizada.datos.dtype == np.int16
+    assert cuantizada.datos.nbytes * 2 == flotante.datos.nbytes
+    np.testing.assert_array_equal(cuantizada.datos, cuantizar(flotante.datos))
+    np.testing.assert_allclose(cuantizada.bloque(), flotante.bloque(), rtol=0, atol=1e-5)
+    np.testing.assert_array_equal(cuantizada.magnitudes, flotante.magnitudes)
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+
+from astroviarfa.lote import iterar_lote, procesar_lote
+from astroviarfa.satelites import PlanBandas
+from astroviarfa.sintetico import generar_captura
+
+
+class _PlanQueTermina(PlanBandas):
+    # Termina el proceso de golpe, como un corte por falta de memoria, al asignar las señales
+    # de la captura de 490-500 MHz; con las demás se comporta como el plan por defecto
+    __slots__ = ()
+
+    def asignar(self, frecuencias):
+        if np.any(np.asarray(frecuencias) > 480e6):
+            os._exit(1)
+        return super().asignar(frecuencias)
+
+
+@pytest.fixture(scope='module')
+def rutas(tmp_path_factory):
+    directorio = tmp_path_factory.mktemp('lote')
+    rutas = [str(directorio / f'captura_{i}.csv') for i in range(3)]
+    for semilla, ruta in enumerate(rutas):
+        generar_captura(ruta, n_bins=1000, n_barridos=2, semilla=semilla)
+    return rutas
+
+
+@pytest.mark.parametrize('chunksize', [1, 2])
+def test_lote_en_paralelo_igual_que_secuencial(rutas, chunksize):
+    secuencial = list(iterar_lote(rutas, trabajadores=1))
+    paralelo = list(iterar_lote(rutas, trabajadores=2, chunksize=chunksize))
+    assert [ruta for ruta, _, _ in paralelo] == rutas
+    for (_, esperada, _), (_, tabla, error) in zip(secuencial, paralelo):
+        assert error is None
+        assert tabla.equals(esperada)
+
+
+@pytest.mark.parametrize('chunksize', [1, 2])
+def test_un_proceso_que_termina_no_interrumpe_el_lote(rutas, tmp_path, chunksize):
+    culpable = str(tmp_path / 'culpable.csv')
+    generar_captura(culpable, n_bins=1000, n_barridos=2, frec_inicio=490e6, frec_fin=500e6)
+    entradas = [rutas[0], culpable, *rutas[1:], 'no_existe.csv']
+    secuencial = dict((ruta, tabla) for ruta, tabla, _ in iterar_lote(rutas, trabajadores=1))
+
+    resultados = list(iterar_lote(entradas, trabajadores=2, chunksize=chunksize, plan_bandas=_PlanQueTermina()))
+    assert [ruta for ruta, _, _ in resultados] == entradas
+    errores = {ruta: error for ruta, _, error in resultados if error is not None}
+    assert set(errores) == {culpable, 'no_existe.csv'}
+    assert errores[culpable].startswith('BrokenProcessPool')
+    # Los demás archivos, incluso los que compartían pool o grupo con el culpable, se analizan completos
+    for ruta, tabla, error in resultados:
+        if ruta in secuencial:
+            assert tabla.equals(secuencial[ruta])
+
+    resultado = procesar_lote(entradas, trabajadores=2, plan_bandas=_PlanQueTermina())
+    assert set(resultado.errores) == {culpable, 'no_existe.csv'}
+    assert set(resultado.tabla['Archivo']) == set(rutas)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from astroviarfa.lector import leer_csv_especial
+from astroviarfa.monitor import MonitorArchivo
+from astroviarfa.motor import analizar_captura
+from astroviarfa.sintetico import generar_captura
+
+
+def _escribir(ruta, contenido):
+    with open(ruta, 'wb') as archivo:
+        archivo.write(contenido)
+
+
+def _truncado(contenido, fraccion=0.6):
+    return contenido[:int(len(contenido) * fraccion)]
+
+
+def test_espera_la_primera_escritura_completa(tmp_path):
+    completa = tmp_path / 'completa.csv'
+    generar_captura(completa, n_bins=2000, n_barridos=3)
+    contenido = completa.read_bytes()
+    ruta = tmp_path / 'en_vivo.csv'
+
+    monitor = MonitorArchivo(str(ruta))
+    _escribir(ruta, _truncado(contenido))
+    assert monitor.actualizar() is None
+    _escribir(ruta, contenido)
+    assert monitor.actualizar() is None  # el archivo acaba de cambiar
+    tabla = monitor.actualizar()
+
+    assert len(monitor.frecuencias) == 2000
+    esperada = analizar_captura(leer_csv_especial(completa))
+    pd.testing.assert_frame_equal(tabla.drop(columns=['Archivo', 'Satélite']), esperada)
+
+
+def test_reintenta_los_barridos_escritos_a_medias(tmp_path):
+    ruta = tmp_path / 'en_vivo.csv'
+    generar_captura(ruta, n_bins=2000, n_barridos=3)
+    monitor = MonitorArchivo(str(ruta))
+    assert monitor.actualizar() is None
+    assert monitor.n_barridos == 0
+    monitor.actualizar()
+    assert monitor.n_barridos == 3
+
+    completa = tmp_path / 'completa.csv'
+    generar_captura(completa, n_bins=2000, n_barridos=5)
+    contenido = completa.read_bytes()
+    _escribir(ruta, _truncado(contenido))
+    assert monitor.actualizar() is None
+    assert monitor.n_barridos == 3 and len(monitor.frecuencias) == 2000
+
+    _escribir(ruta, contenido)
+    tabla = monitor.actualizar()
+    assert monitor.n_barridos == 5
+    esperada = analizar_captura(leer_csv_especial(completa))
+    esperada = esperada[esperada['Índice de barrido'] >= 3].reset_index(drop=True)
+    np.testing.assert_array_equal(tabla['Frecuencia central [Hz]'], esperada['Frecuencia central [Hz]'])
+    np.testing.assert_array_equal(tabla['Índice de barrido'], esperada['Índice de barrido'])
+
+
+def test_barridos_nuevos_cuantizados_en_int16(tmp_path):
+    ruta = tmp_path / 'en_vivo.csv'
+    generar_captura(ruta, n_bins=2000, n_barridos=3)
+    monitor = MonitorArchivo(str(ruta), dtype=np.int16)
+    assert monitor.actualizar() is None
+    tabla = monitor.actualizar()
+
+    esperada = analizar_captura(leer_csv_especial(ruta, np.int16))
+    pd.testing.assert_frame_equal(tabla.drop(columns=['Archivo', 'Satélite']), esperada)
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from astroviarfa.deteccion import estimar_nivel_ruido
+from astroviarfa.lector import CapturaCSV, leer_csv_especial
+from astroviarfa.motor import analizar_captura
+from astroviarfa.sintetico import generar_captura
+
+
+@pytest.fixture(scope='module')
+def captura(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp('capturas') / 'sintetica.csv'
+    generar_captura(ruta, n_bins=4000, n_barridos=6)
+    return leer_csv_especial(ruta)
+
+
+def test_wavelet_encuentra_la_portadora_con_poco_snr():
+    pytest.importorskip('pywt')
+    # Un barrido con ruido de 2 dB de desvío y una portadora ancha 12 dB sobre el piso
+    generador = np.random.default_rng(7)
+    n_bins, centro = 4096, 2600
+    frecuencias = np.linspace(400e6, 450e6, n_bins)
+    ruido = -100 + generador.normal(0, 2, n_bins)
+    portadora = -100 + 12 * np.exp(-0.5 * ((np.arange(n_bins) - centro) / 25) ** 2)
+    magnitudes = 10 * np.log10(10 ** (ruido / 10) + 10 ** (portadora / 10))
+    captura = CapturaCSV(None, None, ['Frequency [Hz]', 'barrido'], None, frecuencias,
+                         magnitudes.astype(np.float32)[None, :])
+
+    sin_filtrar = analizar_captura(captura, margen_pico=8)
+    con_wavelet = analizar_captura(captura, margen_pico=8, wavelet='db4')
+    # Sin filtrar, los picos del ruido superan el margen; sin ruido solo queda la portadora
+    assert len(sin_filtrar) > 1
+    assert len(con_wavelet) == 1
+    assert abs(con_wavelet['Frecuencia central [Hz]'].iloc[0] - frecuencias[centro]) < 50e3
+
+    # Amplitud y SNR medidos sobre el barrido original, contra el ruido del barrido original
+    original = captura.barrido(0)
+    amplitud = con_wavelet['Amplitud/ Potencia [dBm]'].iloc[0]
+    assert amplitud in original
+    np.testing.assert_allclose(con_wavelet['Relación señal-ruido (SNR) [dB]'].iloc[0],
+                               amplitud - estimar_nivel_ruido(original))
+
+
+def test_progreso_por_bloques_y_cancelacion(captura):
+    avisos = []
+    tabla = analizar_captura(captura, barridos_por_bloque=2,
+                             progreso=lambda hechos, total: avisos.append((hechos, total)))
+    assert avisos == [(2, 6), (4, 6), (6, 6)]
+    pd.testing.assert_frame_equal(tabla, analizar_captura(captura))
+
+    class Cancelado(Exception):
+        pass
+
+    def cancelar(hechos, total):
+        raise Cancelado()
+
+    with pytest.raises(Cancelado):
+        analizar_captura(captura, barridos_por_bloque=2, progreso=cancelar)
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+import astroviarfa.lector as lector
+from astroviarfa.deteccion import estimar_nivel_ruido
+from astroviarfa.lector import leer_csv_especial
+from astroviarfa.lote import procesar_archivo
+from astroviarfa.ocupacion import AcumuladorLectura, EstadisticasEspectro, _MenoresPorBarrido, estadisticas_csv
+from astroviarfa.sintetico import generar_captura
+
+
+@pytest.fixture(scope='module')
+def ruta(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp('ocupacion') / 'sintetica.csv'
+    generar_captura(ruta, n_bins=3000, n_barridos=12, n_portadoras=5, semilla=3)
+    return ruta
+
+
+def _comparar(obtenidas, esperadas):
+    assert obtenidas.n_barridos == esperadas.n_barridos
+    np.testing.assert_array_equal(obtenidas.frecuencias, esperadas.frecuencias)
+    np.testing.assert_array_equal(obtenidas.ocupados, esperadas.ocupados)
+    np.testing.assert_array_equal(obtenidas.maximo, esperadas.maximo)
+    np.testing.assert_allclose(obtenidas.media, esperadas.media, rtol=1e-12)
+    np.testing.assert_allclose(obtenidas.m2, esperadas.m2, rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(obtenidas.potencia_banda, esperadas.potencia_banda, rtol=1e-9)
+
+
+def test_combinar_parciales_igual_que_una_pasada(ruta):
+    captura = leer_csv_especial(ruta)
+    magnitudes = captura.bloque()
+    completa = EstadisticasEspectro(captura.frecuencias)
+    completa.actualizar(magnitudes)
+
+    primera, segunda = EstadisticasEspectro(captura.frecuencias), EstadisticasEspectro(captura.frecuencias)
+    primera.actualizar(magnitudes[:5], estimar_nivel_ruido(magnitudes[:5]))
+    for fila in magnitudes[5:]:
+        segunda.actualizar(fila)
+    _comparar(primera.combinar(segunda), completa)
+
+    # El mapa consultado da la misma ocupación, el mismo max-hold y la misma media y varianza
+    esperado = completa.ocupacion()
+    obtenido = primera.ocupacion()
+    np.testing.assert_array_equal(obtenido['Ocupación [%]'], esperado['Ocupación [%]'])
+    np.testing.assert_array_equal(obtenido['Máximo [dBm]'], magnitudes.max(axis=0))
+    np.testing.assert_allclose(obtenido['Media [dBm]'], magnitudes.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(obtenido['Desvío [dB]'], magnitudes.std(axis=0, ddof=1), rtol=1e-9)
+
+
+@pytest.mark.parametrize('piso_local', [False, True])
+@pytest.mark.parametrize('dtype', [np.float32, np.int16])
+def test_acumular_al_leer_igual_que_sobre_la_captura(ruta, monkeypatch, piso_local, dtype):
+    # Bloques de unos 200 bins, más angostos que la ventana del piso local
+    monkeypatch.setattr(lector, 'VALORES_POR_BLOQUE', 13 * 200)
+    captura = leer_csv_especial(ruta, dtype)
+    esperadas = EstadisticasEspectro(captura.frecuencias)
+    esperadas.agregar_captura(captura, piso_local=piso_local, ancho_piso=501)
+
+    acumulador = AcumuladorLectura(piso_local=piso_local, ancho_piso=501)
+    _comparar(acumulador.terminar(leer_csv_especial(ruta, dtype, al_leer_bloque=acumulador)), esperadas)
+
+    avisos = []
+    sin_matriz = estadisticas_csv(ruta, dtype=dtype, piso_local=piso_local, ancho_piso=501,
+                                  progreso=lambda hechos, total: avisos.append((hechos, total)))
+    _comparar(sin_matriz, esperadas)
+    lecturas = 1 if piso_local else 2
+    assert avisos[-1] == (lecturas * captura.n_bins, lecturas * captura.n_bins)
+
+
+def test_lectura_sin_conservar_la_matriz(ruta):
+    bloques = []
+    captura = leer_csv_especial(ruta, al_leer_bloque=lambda inicio, total, frecuencias, magnitudes: bloques.append(
+        (inicio, total, len(frecuencias), magnitudes.shape, magnitudes.dtype)), conservar=False)
+    assert captura.datos.shape == (12, 0) and len(captura.frecuencias) == 3000
+    assert bloques[0][:2] == (0, 3000) and bloques[0][4] == np.float32
+    assert sum(n for _, _, n, _, _ in bloques) == 3000
+    assert all(forma == (12, n) for _, _, n, forma, _ in bloques)
+
+
+def test_lote_acumula_al_leer(ruta):
+    tabla, ocupacion = procesar_archivo(str(ruta), estadisticas=True)
+    captura = leer_csv_especial(ruta)
+    esperadas = EstadisticasEspectro(captura.frecuencias)
+    esperadas.agregar_captura(captura)
+    esperadas.agregar_senales(tabla)
+    _comparar(ocupacion, esperadas)
+    np.testing.assert_array_equal(ocupacion.senales, esperadas.senales)
+    np.testing.assert_array_equal(ocupacion.interferencias, esperadas.interferencias)
+
+
+def test_nivel_de_ruido_con_los_menores_de_cada_barrido():
+    generador = np.random.default_rng(1)
+    for _ in range(200):
+        n_bins = int(generador.integers(2, 400))
+        # Pocos valores distintos: muchos empates alrededor del percentil
+        magnitudes = generador.integers(0, generador.integers(1, 6), (3, n_bins)).astype(np.float64)
+        menores = _MenoresPorBarrido(n_bins)
+        paso = int(generador.integers(1, 50))
+        for inicio in range(0, n_bins, paso):
+            menores.agregar(magnitudes[:, inicio:inicio + paso])
+        np.testing.assert_array_equal(menores.niveles(), estimar_nivel_ruido(magnitudes))
@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from astroviarfa import perfil
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+MEGA = 2 ** 20
+
+
+@pytest.fixture
+def perfil_limpio():
+    activo = perfil.activo()
+    perfil.desactivar()
+    perfil.limpiar()
+    yield
+    perfil.desactivar()
+    perfil.limpiar()
+    if activo:
+        perfil.activar(os.environ.get(perfil.VARIABLE_ENTORNO))
+
+
+def test_desactivado_devuelve_siempre_la_medicion_nula(perfil_limpio):
+    with perfil.etapa('a', bins=10) as medicion:
+        medicion.salida(picos=1)
+    assert medicion is perfil._NULA
+    assert perfil.etapa('b') is perfil._NULA
+    assert len(perfil.registros) == 0
+
+
+def test_etapas_anidadas_y_errores(perfil_limpio, tmp_path):
+    ruta = str(tmp_path / 'perfil.jsonl')
+    perfil.activar(ruta)
+    assert os.environ[perfil.VARIABLE_ENTORNO] == ruta
+    with perfil.etapa('externa', barridos=2) as externa:
+        with perfil.etapa('interna'):
+            bloque = bytearray(4 * MEGA)
+        del bloque
+        externa.salida(filas=3)
+    with pytest.raises(ZeroDivisionError):
+        with perfil.etapa('falla'):
+            1 / 0
+    perfil.desactivar()
+    assert perfil.VARIABLE_ENTORNO not in os.environ
+
+    interna, externa, falla = perfil.registros
+    assert (interna['etapa'], interna['nivel'], externa['etapa'], externa['nivel']) == ('interna', 1, 'externa', 0)
+    assert interna['memoria_pico_bytes'] >= 4 * MEGA
+    assert externa['memoria_pico_bytes'] >= 4 * MEGA  # el pico de la etapa interna cuenta para la externa
+    assert externa['entrada'] == {'barridos': 2} and externa['salida'] == {'filas': 3}
+    assert externa['segundos'] >= interna['segundos']
+    assert falla['error'].startswith('ZeroDivisionError')
+    with open(ruta, encoding='utf-8') as archivo:
+        assert [json.loads(linea)['etapa'] for linea in archivo] == ['interna', 'externa', 'falla']
+    assert list(perfil.resumen()['etapa'].sort_values()) == ['externa', 'falla', 'interna']
+
+
+def test_variable_de_entorno_activa_la_medicion(tmp_path):
+    # En un proceso nuevo: la variable se lee al importar el módulo
+    ruta = str(tmp_path / 'perfil.jsonl')
+    codigo = ("from astroviarfa import perfil\n"
+              "with perfil.etapa('reservar', bytes=8 * 2 ** 20) as medicion:\n"
+              "    bloque = bytearray(8 * 2 ** 20)\n"
+              "    medicion.salida(bytes=len(bloque))\n")
+    entorno = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC, os.environ.get('PYTHONPATH')])))
+    entorno[perfil.VARIABLE_ENTORNO] = ruta
+    subprocess.run([sys.executable, '-c', codigo], env=entorno, check=True)
+
+    with open(ruta, encoding='utf-8') as archivo:
+        (registro,) = [json.loads(linea) for linea in archivo]
+    assert registro['etapa'] == 'reservar'
+    assert registro['entrada'] == registro['salida'] == {'bytes': 8 * MEGA}
+    assert registro['segundos'] >= 0 and registro['cpu_s'] >= 0
+    assert registro['memoria_pico_bytes'] >= 8 * MEGA
+    assert registro['error'] is None
@@ -0,0 +1,59 @@
+import pytest
+
+from astroviarfa import rendimiento
+from astroviarfa.sintetico import generar_captura
+
+
+def _medicion(etapa, n_bins, segundos, n_barridos=1, **extra):
+    return {'etapa': etapa, 'n_bins': n_bins, 'n_barridos': n_barridos, 'valores': n_bins * n_barridos,
+            'segundos_min': segundos, **extra}
+
+
+def test_exponentes_escala():
+    mediciones = [
+        _medicion('lineal', 1000, 0.01), _medicion('lineal', 10_000, 0.1), _medicion('lineal', 100_000, 1.0),
+        _medicion('cuadratica', 1000, 0.001), _medicion('cuadratica', 10_000, 0.1),
+        _medicion('un_tamaño', 1000, 0.5), _medicion('un_tamaño', 1000, 0.6),
+        _medicion('sin_tiempo', 1000, 0.0), _medicion('sin_tiempo', 10_000, 0.1),
+    ]
+    assert rendimiento.exponentes_escala(mediciones) == {'cuadratica': pytest.approx(2.0),
+                                                         'lineal': pytest.approx(1.0)}
+
+
+def test_comparar():
+    referencia = {'mediciones': [
+        _medicion('importar', 0, 0.1), _medicion('leer', 1000, 0.010), _medicion('leer', 10_000, 0.1),
+        _medicion('rapida', 1000, 1e-5), _medicion('fallaba', 1000, None, error='ImportError: x'),
+    ]}
+    informe = {'mediciones': [
+        _medicion('importar', 0, 0.1, modulos_pesados=['pandas']),
+        _medicion('leer', 1000, 0.013),  # 1,3 veces: regresión
+        _medicion('leer', 10_000, 0.11),  # 1,1 veces: dentro del umbral
+        _medicion('rapida', 1000, 5e-5),  # demasiado corta para compararse
+        _medicion('fallaba', 1000, 0.5),  # sin referencia
+        _medicion('leer', 1000, None, n_barridos=10, error='MemoryError: '),
+        _medicion('nueva', 1000, 0.2),
+    ]}
+    regresiones = rendimiento.comparar(informe, referencia)
+    assert [regresion[:3] for regresion in regresiones] == [('importar', 0, 1), ('leer', 1000, 1)]
+    assert regresiones[0][3] == float('inf')
+    assert regresiones[1][3] == pytest.approx(1.3)
+    assert rendimiento.comparar(informe, referencia, umbral=1.05)[2][:3] == ('leer', 10_000, 1)
+
+
+@pytest.mark.parametrize('etapa_rota', ['estimar_nivel_ruido', 'detectar_picos', 'extraer_caracteristicas'])
+def test_una_etapa_que_falla_no_detiene_la_medicion(tmp_path, monkeypatch, etapa_rota):
+    def fallar(*args, **kwargs):
+        raise RuntimeError('rota')
+
+    monkeypatch.setattr(rendimiento, etapa_rota, fallar)
+    ruta = str(tmp_path / 'captura.csv')
+    generar_captura(ruta, n_bins=2000, n_barridos=3, n_portadoras=2, semilla=0)
+    etapas = rendimiento.medir_captura(ruta, str(tmp_path), repeticiones=1)
+
+    assert etapas[etapa_rota] == {'error': 'RuntimeError: rota'}
+    cadena = ['estimar_nivel_ruido', 'detectar_picos', 'extraer_caracteristicas', 'asignar_satelites']
+    for etapa in cadena[cadena.index(etapa_rota) + 1:]:
+        assert etapa not in etapas
+    for etapa in cadena[:cadena.index(etapa_rota)] + ['leer_csv_especial', 'umbral_cfar', 'analizar_captura']:
+        assert 'tiempos' in etapas[etapa]
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+
+from astroviarfa.satelites import (SIN_SATELITE, Banda, IndiceBandas, PlanBandas, asignar_satelites,
+                                   obtener_plan, olvidar_planes)
+
+
+@pytest.fixture(autouse=True)
+def sin_planes_compilados():
+    olvidar_planes()
+    yield
+    olvidar_planes()
+
+
+def _asignar_satelite_original(frec_central):
+    # La asignación de la versión original, señal por señal
+    rango_misc = (400e6, 450e6)
+    rango_facsat = (430e6, 440e6)
+    if rango_misc[0] <= frec_central <= rango_misc[1]:
+        if rango_facsat[0] <= frec_central <= rango_facsat[1]:
+            return 'EM MISC & EM FACSAT'
+        return 'EM MISC'
+    if rango_facsat[0] <= frec_central <= rango_facsat[1]:
+        return 'EM FACSAT'
+    return 'Desconocido'
+
+
+def _escribir_plan(ruta, filas):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write('nombre;inicio_hz;fin_hz;prioridad\n')
+        archivo.writelines(f'{fila}\n' for fila in filas)
+
+
+def test_plan_por_defecto_igual_que_la_asignacion_original():
+    bordes = [400e6, 430e6, 440e6, 450e6]
+    frecuencias = np.concatenate([bordes, np.nextafter(bordes, 0), np.nextafter(bordes, np.inf),
+                                  np.random.default_rng(0).uniform(390e6, 460e6, 1000)])
+    esperadas = [_asignar_satelite_original(frecuencia) for frecuencia in frecuencias]
+    assert list(asignar_satelites(frecuencias)) == esperadas
+
+
+def test_prioridad_y_empates():
+    indice = IndiceBandas([
+        Banda('Ancha', 0, 100, 0),
+        Banda('Angosta', 40, 60, 1),
+        Banda('Vecina', 50, 150, 0),
+        Banda('Otra', 120, 150, 0),
+    ])
+    frecuencias = [-1, 0, 20, 40, 45, 50, 60, 61, 100, 110, 120, 150, 151]
+    assert list(indice.asignar(frecuencias)) == [
+        SIN_SATELITE, 'Ancha', 'Ancha',
+        'Angosta', 'Angosta', 'Angosta', 'Angosta',  # la de mayor prioridad gana, bordes incluidos
+        'Ancha & Vecina', 'Ancha & Vecina',  # empate: todas, en el orden del plan
+        'Vecina', 'Vecina & Otra', 'Vecina & Otra', SIN_SATELITE,
+    ]
+
+
+def test_indice_igual_que_resolver_cada_frecuencia():
+    generador = np.random.default_rng(3)
+    inicios = generador.integers(0, 90, 12).astype(float)
+    bandas = [Banda(f'B{i}', inicio, inicio + generador.integers(0, 20), int(generador.integers(0, 3)))
+              for i, inicio in enumerate(inicios)]
+    indice = IndiceBandas(bandas)
+    frecuencias = np.concatenate([indice.bordes, np.arange(-5, 115, 0.25)])
+    for frecuencia, etiqueta in zip(frecuencias, indice.asignar(frecuencias)):
+        dentro = [banda for banda in bandas if banda.inicio <= frecuencia <= banda.fin]
+        if not dentro:
+            assert etiqueta == SIN_SATELITE
+            continue
+        prioridad = max(banda.prioridad for banda in dentro)
+        assert etiqueta == ' & '.join(banda.nombre for banda in dentro if banda.prioridad == prioridad)
+
+
+def test_recarga_al_cambiar_el_archivo(tmp_path):
+    ruta = str(tmp_path / 'plan.csv')
+    _escribir_plan(ruta, ['A;100;200;0'])
+    plan = obtener_plan(ruta)
+    assert obtener_plan(ruta) is plan
+    assert list(plan.asignar([150])) == ['A']
+    assert not plan.recargar()
+
+    # Otro tamaño
+    _escribir_plan(ruta, ['A;100;200;0', 'B;140;160;1'])
+    assert list(asignar_satelites([150, 120], ruta)) == ['B', 'A']
+
+    # Mismo tamaño, otra fecha de modificación
+    _escribir_plan(ruta, ['A;100;200;0', 'C;140;160;1'])
+    estado = os.stat(ruta)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10 ** 9))
+    assert list(plan.asignar([150])) == ['C']
+
+    # Un archivo inválido no reemplaza el índice anterior
+    _escribir_plan(ruta, ['A;300;200;0'])
+    with pytest.raises(ValueError):
+        plan.asignar([150])
+    assert list(plan.indice.asignar([150])) == ['C']
+
+    # Sin los planes compilados, el archivo se vuelve a leer desde cero
+    _escribir_plan(ruta, ['D;100;200;0'])
+    olvidar_planes()
+    assert obtener_plan(ruta) is not plan
+    assert list(asignar_satelites([150], ruta)) == ['D']
+    assert obtener_plan(PlanBandas(ruta)) is not obtener_plan(ruta)
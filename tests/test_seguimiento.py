@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from astroviarfa.seguimiento import MAX_BARRIDOS_PERDIDA, SeguidorSenales
+from astroviarfa.sintetico import nombres_barridos
+
+
+def _tabla(barridos, frecuencias, nombres=None):
+    return pd.DataFrame({
+        'Barrido': [nombres[b] for b in barridos] if nombres else [f"barrido {b}" for b in barridos],
+        'Índice de barrido': barridos,
+        'Frecuencia central [Hz]': frecuencias,
+        'Amplitud/ Potencia [dBm]': -30.0,
+        'Ancho de banda (BW) [Hz]': 10e3,
+    })
+
+
+def test_barridos_consecutivos_forman_una_pista():
+    seguidor = SeguidorSenales()
+    pistas = seguidor.procesar_tabla(_tabla([0, 1, 2, 3], [437e6 + 100 * b for b in range(4)]))
+    assert (pistas == 0).all()
+    resumen = seguidor.tabla()
+    assert resumen['Duración [barrido]'].iloc[0] == 3
+    assert resumen['Deriva [Hz/barrido]'].iloc[0] == pytest.approx(100)
+
+
+def test_los_barridos_sin_detecciones_envejecen_las_pistas():
+    # Entre 0, 10 y 20 hay más de MAX_BARRIDOS_PERDIDA barridos sin la señal
+    seguidor = SeguidorSenales()
+    pistas = seguidor.procesar_tabla(_tabla([0, 10, 20], [437e6, 437e6 + 1e3, 437e6 + 2e3]))
+    assert list(pistas) == [0, 1, 2]
+    assert not seguidor.tabla()['Activa'].iloc[:2].any()
+
+
+def test_deriva_y_duracion_con_barridos_salteados():
+    hueco = MAX_BARRIDOS_PERDIDA + 1
+    barridos = [0, hueco, 2 * hueco]
+    seguidor = SeguidorSenales()
+    pistas = seguidor.procesar_tabla(_tabla(barridos, [437e6 + 100 * b for b in barridos]))
+    assert (pistas == 0).all()
+    resumen = seguidor.tabla()
+    assert resumen['Duración [barrido]'].iloc[0] == 2 * hueco
+    assert resumen['Deriva [Hz/barrido]'].iloc[0] == pytest.approx(100)
+
+
+def test_deriva_en_hz_por_segundo_con_los_instantes_de_los_barridos():
+    # Un barrido por segundo: los nombres de la columna 'Barrido' dan los instantes
+    nombres = nombres_barridos(9, intervalo_s=1.0)
+    barridos = [0, 4, 8]
+    seguidor = SeguidorSenales()
+    seguidor.procesar_tabla(_tabla(barridos, [437e6 + 50 * b for b in barridos], nombres))
+    resumen = seguidor.tabla()
+    assert resumen['Duración [s]'].iloc[0] == pytest.approx(8)
+    assert resumen['Deriva [Hz/s]'].iloc[0] == pytest.approx(50)
+
+    # Los mismos instantes pasados explícitamente, como `captura.indice.segundos()`
+    explicito = SeguidorSenales()
+    explicito.procesar_tabla(_tabla(barridos, [437e6 + 50 * b for b in barridos]), np.arange(9) * 2.0)
+    assert explicito.tabla()['Deriva [Hz/s]'].iloc[0] == pytest.approx(25)
+
+
+def test_los_barridos_deben_llegar_en_orden():
+    seguidor = SeguidorSenales()
+    seguidor.actualizar([437e6], [-30.0], [10e3], barrido=5)
+    with pytest.raises(ValueError):
+        seguidor.actualizar([437e6], [-30.0], [10e3], barrido=3)
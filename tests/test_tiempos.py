@@ -0,0 +1,73 @@
+import datetime
+
+import numpy as np
+
+from astroviarfa.tiempos import IndiceBarridos, interpretar_nombre_barrido, segundos_barridos
+
+
+def _instante(texto):
+    return np.datetime64(texto, 'ms')
+
+
+def test_interpretar_nombre_barrido():
+    assert interpretar_nombre_barrido('11:29:31 p. m. 27/09/2024') == (_instante('2024-09-27T23:29:31'), 0)
+    assert interpretar_nombre_barrido('12:00:05 a. m. 27/09/2024.2') == (_instante('2024-09-27T00:00:05'), 2)
+    assert interpretar_nombre_barrido('12:00:05 p.m. 27/09/2024') == (_instante('2024-09-27T12:00:05'), 0)
+    assert interpretar_nombre_barrido('1:02:03 PM 7/9/2024') == (_instante('2024-09-07T13:02:03'), 0)
+    assert interpretar_nombre_barrido('17:02:03 7/9/2024') == (_instante('2024-09-07T17:02:03'), 0)
+    for nombre in ('Barrido 1', '25:00:00 27/09/2024', '10:00:00 a. m. 31/02/2024'):
+        instante, sufijo = interpretar_nombre_barrido(nombre)
+        assert np.isnat(instante) and sufijo == 0
+
+
+def test_los_duplicados_comparten_el_instante():
+    nombres = ['10:00:00 a. m. 01/09/2024', '10:00:00 a. m. 01/09/2024.1', '10:00:00 a. m. 01/09/2024.2',
+               '10:00:01 a. m. 01/09/2024']
+    indice = IndiceBarridos(nombres)
+    assert list(indice.sufijos) == [0, 1, 2, 0]
+    assert list(indice.instantes[:3]) == [_instante('2024-09-01T10:00:00')] * 3
+    assert list(segundos_barridos(nombres)) == list(indice.segundos())
+    # El sufijo solo distingue al buscar por nombre; por tiempo vuelven todos, en el orden del archivo
+    assert [indice.posicion(nombre) for nombre in nombres] == [0, 1, 2, 3]
+    assert indice.posicion('10:00:00 a. m. 01/09/2024.3') is None
+    assert indice.rango('2024-09-01T10:00:00', '2024-09-01T10:00:00') == slice(0, 3)
+    assert indice.mas_cercano('2024-09-01T10:00:00.400') == 0
+
+
+def test_posicion_por_nombre():
+    indice = IndiceBarridos(['10:00:01 a. m. 01/09/2024', 'Sin fecha', '10:00:00 a. m. 01/09/2024'])
+    assert indice.posicion('10:00:00 AM 01/09/2024') == 2
+    assert indice.posicion('10:00:01 a. m. 1/9/2024') == 0
+    assert indice.posicion('  sin   fecha ') == 1
+    assert indice.posicion('10:00:02 a. m. 01/09/2024') is None
+    assert indice.posicion('Otro') is None
+
+
+def test_mas_cercano():
+    indice = IndiceBarridos(['10:00:00 a. m. 01/09/2024', '10:00:10 a. m. 01/09/2024', 'Sin fecha',
+                             '10:00:20 a. m. 01/09/2024'])
+    assert indice.mas_cercano('2024-09-01T09:00') == 0
+    assert indice.mas_cercano('2024-09-01T10:00:04') == 0
+    assert indice.mas_cercano('2024-09-01T10:00:05') == 0  # empate: el anterior
+    assert indice.mas_cercano(datetime.datetime(2024, 9, 1, 10, 0, 6)) == 1
+    assert indice.mas_cercano('10:00:16 a. m. 01/09/2024') == 3
+    assert indice.mas_cercano('2024-09-02') == 3
+    assert IndiceBarridos(['Sin fecha']).mas_cercano('2024-09-01') is None
+
+
+def test_rango_contiguo_y_desordenado():
+    contiguo = IndiceBarridos([f'10:00:0{segundo} a. m. 01/09/2024' for segundo in range(5)])
+    assert contiguo.rango() == slice(0, 5)
+    assert contiguo.rango('2024-09-01T10:00:01', '2024-09-01T10:00:03') == slice(1, 4)
+    assert contiguo.rango('2024-09-01T10:00:01.5', '2024-09-01T10:00:01.9') == slice(2, 2)
+    assert contiguo.rango(desde='2024-09-02') == slice(5, 5)
+    assert contiguo.rango(hasta='2024-08-31') == slice(0, 0)
+    magnitudes = np.arange(10.0).reshape(5, 2)
+    assert np.shares_memory(contiguo.seleccionar(magnitudes, '2024-09-01T10:00:03'), magnitudes)
+
+    desordenado = IndiceBarridos(['10:00:02 a. m. 01/09/2024', '10:00:00 a. m. 01/09/2024', 'Sin fecha',
+                                  '10:00:01 a. m. 01/09/2024'])
+    assert list(desordenado.rango()) == [1, 3, 0]
+    assert list(desordenado.rango('2024-09-01T10:00:01')) == [3, 0]
+    assert desordenado.inicio == _instante('2024-09-01T10:00:00')
+    assert desordenado.fin == _instante('2024-09-01T10:00:02')